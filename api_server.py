@@ -3,10 +3,15 @@ FastAPI Server for Travel Assistant
 Provides REST API endpoints for travel planning
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import asyncio
 import os
+import time
 
 # Load environment variables FIRST
 load_dotenv()
@@ -23,16 +28,71 @@ print(f"  GOOGLE_MAPS_KEY: {'SET ✓' if os.getenv('GOOGLE_MAPS_KEY') else 'NOT
 print(f"  RAPIDAPI_KEY: {'SET ✓' if os.getenv('RAPIDAPI_KEY') else 'NOT SET ✗'}")
 
 # Import routes
-from routes import flight_api, hotel_api, tarvel_api, advice_api
+from routes import flight_api, hotel_api, tarvel_api, advice_api, compare_api, history_api, admin_api, plan_api
+from crew.pool import crew_pool_stats
+from middleware.admission import AdmissionControlMiddleware, admission_controller
+from middleware.compression import CompressionMiddleware
+from middleware.deadline import DeadlineMiddleware
+from middleware.popularity import PopularityMiddleware
+from middleware.response_cache import ResponseCacheMiddleware
+from services.plan_store import plan_store
+from services.sessions import SESSION_IDLE_TIMEOUT, get_session, start_session, touch_session
+from services.warmer import WARMER_ENABLED, cache_warmer
+from services.warmup import WARMUP_ENABLED, warmup
+from tools.advice_store import advice_store
+from tools.gemini import fallback_batcher
+from tools.prompt_cache import prompt_cache
+from utils.responses import FastJSONResponse, public_error
+from utils.cache import all_cache_stats
+from utils.deadline import REQUEST_DEADLINE, DeadlineExceeded, deadline_scope
+from utils.http_client import http_stats
+from utils.memory import memory_budget, start_tracing
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background services with the server and stop them on shutdown"""
+    start_tracing()
+    # Warm up in the background; /ready answers 503 until it finishes
+    if WARMUP_ENABLED:
+        warmup.start(app)
+    else:
+        warmup.skip()
+    if WARMER_ENABLED:
+        cache_warmer.start()
+    yield
+    await warmup.stop()
+    cache_warmer.stop()
+    plan_store.flush()
 
 # Create FastAPI app
 app = FastAPI(
     title="Travel Assistant API",
     description="AI-powered travel planning API with flights, hotels, attractions, and advice",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Bound concurrency per router and shed overload with 503 + Retry-After.
+# Added first (innermost) so cache hits never take an admission slot.
+app.add_middleware(AdmissionControlMiddleware)
+
+# Start the request deadline before admission so queueing time counts
+# against it; tools and HTTP calls shrink their timeouts to what is left
+app.add_middleware(DeadlineMiddleware)
+
+# Cache GET responses per route so repeat queries skip the crew entirely
+app.add_middleware(ResponseCacheMiddleware)
+
+# Count requests per destination outside the cache, so hits keep a
+# destination hot for the background cache warmer
+app.add_middleware(PopularityMiddleware)
+
+# Compress large payloads (brotli/gzip) after the cache, so cached bodies
+# are stored once and encoded per client
+app.add_middleware(CompressionMiddleware)
+
+# Add CORS middleware (added last so it wraps every other middleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +100,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Cache-Control", "X-Cache"],
 )
 
 # Include routers
@@ -47,6 +108,130 @@ app.include_router(flight_api.router)
 app.include_router(hotel_api.router)
 app.include_router(tarvel_api.router)
 app.include_router(advice_api.router)
+app.include_router(compare_api.router)
+app.include_router(plan_api.router)
+app.include_router(history_api.router)
+app.include_router(admin_api.router)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    """Return 504 when a request runs out of its time budget"""
+    return JSONResponse(
+        status_code=504,
+        content={"detail": "Request deadline exceeded", "path": request.url.path}
+    )
+
+async def _stream_sections(websocket: WebSocket, sections):
+    """Run a turn's sections concurrently and stream each one as it is ready.
+
+    Each turn takes a slot on the /ws/session admission gate, since
+    WebSockets bypass AdmissionControlMiddleware; a shed turn gets an
+    error message instead.
+
+    Returns:
+        The full answer text, or None if the turn was shed
+    """
+    start = time.perf_counter()
+
+    async def run(section, fn, reused):
+        try:
+            return section, reused, await run_in_threadpool(fn)
+        except Exception as e:
+            # Upstream exception text can carry request URLs with API keys
+            print(f"[DEBUG] Session section {section} failed: {e}")
+            return section, reused, f"Error: {section} data is temporarily unavailable ({public_error(e)})"
+
+    parts = []
+    gate = admission_controller.gate_for("/ws/session")
+    with deadline_scope(REQUEST_DEADLINE):
+        if not await admission_controller.acquire(gate):
+            await websocket.send_json({
+                "type": "error",
+                "detail": "Server is busy, please retry later",
+                "retry_after": admission_controller.retry_after(gate)
+            })
+            return None
+        admitted = time.monotonic()
+        try:
+            for finished in asyncio.as_completed([run(*step) for step in sections]):
+                section, reused, result = await finished
+                text = []
+                if isinstance(result, str):
+                    text.append(result)
+                    await websocket.send_json({"type": "chunk", "section": section, "text": result, "reused": reused})
+                else:
+                    async for chunk in iterate_in_threadpool(result):
+                        text.append(chunk)
+                        await websocket.send_json({"type": "chunk", "section": section, "text": chunk, "reused": reused})
+                parts.append(f"[{section}] " + "".join(text))
+        finally:
+            admission_controller.release(gate, time.monotonic() - admitted)
+
+    await websocket.send_json({
+        "type": "done",
+        "reused": [section for section, _, reused in sections if reused],
+        "fetched": [section for section, _, reused in sections if not reused],
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    })
+    return "\n".join(parts)
+
+@app.websocket("/ws/session")
+async def session_socket(websocket: WebSocket, session_id: str = None):
+    """
+    Conversational planning session over a WebSocket.
+    
+    Send {"type": "start", "destination": ..., "flight_date"/"checkin_date"/"checkout_date": ...}
+    to open a session, then {"text": "cheaper hotels"}, {"text": "what about the day after"}
+    and so on. Follow-ups reuse the session's destination, dates and fetched records;
+    answers stream back as "chunk" messages followed by "done". Reconnect with
+    ?session_id=... to resume a session that hasn't idled out.
+    """
+    await websocket.accept()
+    session = get_session(session_id)
+    if session is not None:
+        await websocket.send_json({"type": "session", "resumed": True, **session.describe()})
+    
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive_json(), timeout=SESSION_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await websocket.close(code=1000, reason="Session idle timeout")
+                return
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            
+            if message.get("type") == "start" or session is None:
+                if not message.get("destination"):
+                    await websocket.send_json({"type": "error", "detail": "Start a session with a destination"})
+                    continue
+                try:
+                    session = start_session(
+                        message["destination"],
+                        message.get("flight_date"),
+                        message.get("checkin_date"),
+                        message.get("checkout_date")
+                    )
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "detail": f"{e} (dates must be YYYY-MM-DD)"})
+                    continue
+                await websocket.send_json({"type": "session", "resumed": False, **session.describe()})
+                text, sections = "Plan my trip", session.opening_sections()
+            else:
+                text = str(message.get("text", ""))
+                sections = session.plan_turn(text)
+            
+            answer = await _stream_sections(websocket, sections)
+            if answer is None:
+                continue
+            session.remember(text, answer)
+            touch_session(session)
+    except WebSocketDisconnect:
+        pass
 
 @app.get("/")
 def read_root():
@@ -58,7 +243,10 @@ def read_root():
             "flights": "/flights/?destination=DXB&flight_date=2025-12-10",
             "hotels": "/hotels/?destination=Dubai&checkin_date=2025-12-10&checkout_date=2025-12-15",
             "tour": "/tour/?destination=Dubai",
-            "advice": "/advice/?destination=Dubai"
+            "advice": "/advice/?destination=Dubai",
+            "compare": "/compare/?destinations=Dubai,Paris,Rome&flight_date=2025-12-10",
+            "plan": "/plan/?destination=Dubai&flight_date=2025-12-10",
+            "history": "/history/?destination=Dubai&section=hotels"
         },
         "docs": "/docs",
         "redoc": "/redoc"
@@ -66,9 +254,34 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    """Health check endpoint"""
+    """Liveness: the process is up and answering"""
     return {"status": "healthy", "service": "Travel Assistant API"}
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness: 200 only once startup warm-up has finished, 503 before"""
+    body = {"ready": warmup.ready, "warmup": warmup.stats()}
+    if not warmup.ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+@app.get("/metrics")
+def metrics():
+    """Runtime metrics for caches and other in-process components"""
+    return {
+        "caches": all_cache_stats(),
+        "memory": memory_budget.stats(),
+        "admission": admission_controller.stats(),
+        "upstreams": http_stats(),
+        "crew_pools": crew_pool_stats(),
+        "advice_store": advice_store.stats(),
+        "warmer": cache_warmer.stats(),
+        "plan_store": plan_store.stats(),
+        "prompt_cache": prompt_cache.stats(),
+        "gemini_batching": fallback_batcher.stats(),
+        "warmup": warmup.stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
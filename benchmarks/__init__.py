@@ -0,0 +1 @@
+"""Benchmarks for travel assistant"""
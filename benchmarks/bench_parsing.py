@@ -0,0 +1,141 @@
+"""
+Parsing Benchmark
+Compares parse time and peak memory per upstream response for a full
+json.loads versus field-selective streaming extraction
+
+Usage:
+    python -m benchmarks.bench_parsing
+"""
+
+import io
+import json
+import random
+import time
+import tracemalloc
+
+from tools.check_flights import FLIGHT_FIELDS, FLIGHT_LIMIT, parse_flight
+from tools.check_hotels import HOTEL_FIELDS, parse_hotel
+from utils.json_stream import JSON_STREAM_MIN_BYTES, extract_document, extract_stream, ijson
+
+
+def booking_page(hotels=100, seed=7):
+    """A searchHotels page shaped like Booking's: photos, badges, nested prices."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(hotels):
+        price = round(rng.uniform(40, 600), 2)
+        items.append({
+            "hotel_id": 100000 + i,
+            "accessibilityLabel": f"Hotel {i}. " + "Close to the beach, free WiFi, pool. " * 8,
+            "property": {
+                "name": f"Hotel {i}",
+                "reviewScore": round(rng.uniform(5, 9.8), 1),
+                "reviewScoreWord": rng.choice(["Good", "Very good", "Superb"]),
+                "reviewCount": rng.randint(10, 5000),
+                "photoUrls": [f"https://cf.bstatic.com/xdata/images/hotel/square500/{i}{p}.jpg" for p in range(12)],
+                "badges": [{"id": f"badge-{b}", "text": "Genius discount available"} for b in range(3)],
+                "latitude": 25 + rng.random(), "longitude": 55 + rng.random(),
+                "priceBreakdown": {
+                    "grossPrice": {"value": price, "currency": "USD"},
+                    "strikethroughPrice": {"value": round(price * 1.2, 2), "currency": "USD"},
+                    "excludedPrice": {"value": round(price * 0.1, 2), "currency": "USD"},
+                    "benefitBadges": [{"text": "Free cancellation", "variant": "constructive"}],
+                    "taxExceptions": [],
+                },
+                "checkin": {"fromTime": "14:00", "untilTime": "00:00"},
+                "checkout": {"fromTime": "00:00", "untilTime": "12:00"},
+            },
+        })
+    return {"status": True, "message": "Success", "data": {"hotels": items, "meta": [{"title": f"{hotels} properties"}]}}
+
+
+def aviationstack_page(flights=100, seed=7):
+    rng = random.Random(seed)
+    airport = lambda code: {
+        "airport": f"{code} International", "timezone": "Asia/Dubai", "iata": code, "icao": "O" + code,
+        "terminal": str(rng.randint(1, 3)), "gate": f"A{rng.randint(1, 40)}", "delay": None,
+        "scheduled": "2025-12-10T10:00:00+00:00", "estimated": "2025-12-10T10:05:00+00:00",
+        "actual": None, "estimated_runway": None, "actual_runway": None,
+    }
+    items = [{
+        "flight_date": "2025-12-10",
+        "flight_status": "scheduled",
+        "departure": airport(rng.choice(["LHR", "CDG", "JFK", "BOM"])),
+        "arrival": airport("DXB"),
+        "airline": {"name": rng.choice(["Emirates", "flydubai", "Qatar Airways"]), "iata": "EK", "icao": "UAE"},
+        "flight": {"number": str(i), "iata": f"EK{i}", "icao": f"UAE{i}", "codeshared": None},
+        "aircraft": None, "live": None,
+    } for i in range(flights)]
+    return {"pagination": {"limit": flights, "offset": 0, "count": flights, "total": 10 * flights}, "data": items}
+
+
+def full_parse_hotels(body):
+    data = json.loads(body)
+    return [parse_hotel(h) for h in (data.get("data") or {}).get("hotels") or []]
+
+
+def fallback_hotels(body):
+    items, _ = extract_document(json.loads(body), "data.hotels", HOTEL_FIELDS)
+    return [parse_hotel(h) for h in items]
+
+
+def stream_hotels(body):
+    items, _ = extract_stream(io.BytesIO(body), "data.hotels", HOTEL_FIELDS)
+    return [parse_hotel(h) for h in items]
+
+
+def full_parse_flights(body):
+    return [parse_flight(f) for f in json.loads(body).get("data", [])[:FLIGHT_LIMIT]]
+
+
+def stream_flights(body):
+    items, _ = extract_stream(io.BytesIO(body), "data", FLIGHT_FIELDS, limit=FLIGHT_LIMIT)
+    return [parse_flight(f) for f in items]
+
+
+def measure(fn, body, repeat=20):
+    """(milliseconds per parse, peak traced KiB, result)."""
+    fn(body)  # first call pays one-off imports and buffers
+    tracemalloc.start()
+    result = fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(body)
+    return (time.perf_counter() - start) / repeat * 1000, peak / 1024, result
+
+
+def report(title, body, variants):
+    print(f"\n{title} ({len(body) / 1024:.0f} KiB)")
+    print(f"  {'parser':<24}{'ms':>8}{'peak KiB':>11}{'records':>9}")
+    baseline = None
+    for name, fn in variants:
+        ms, peak_kib, records = measure(fn, body)
+        baseline = records if baseline is None else baseline
+        same = "" if records == baseline else "  (differs!)"
+        print(f"  {name:<24}{ms:8.2f}{peak_kib:11.0f}{len(records):9d}{same}")
+
+
+def main():
+    if ijson is None:
+        print("ijson not installed: tools fall back to a full parse (pip install ijson)")
+    else:
+        print(f"Tools stream bodies of {JSON_STREAM_MIN_BYTES // 1024} KiB and up (JSON_STREAM_MIN_BYTES)")
+
+    for hotels in (20, 100, 400):
+        body = json.dumps(booking_page(hotels)).encode()
+        variants = [("json.loads (before)", full_parse_hotels), ("json + select (fallback)", fallback_hotels)]
+        if ijson is not None:
+            variants.append((f"ijson {ijson.backend}", stream_hotels))
+        report(f"Booking searchHotels, {hotels} hotels", body, variants)
+
+    body = json.dumps(aviationstack_page(100)).encode()
+    variants = [("json.loads (before)", full_parse_flights)]
+    if ijson is not None:
+        variants.append((f"ijson, stop at {FLIGHT_LIMIT}", stream_flights))
+    report("AviationStack /flights, 100 flights", body, variants)
+
+
+if __name__ == "__main__":
+    main()
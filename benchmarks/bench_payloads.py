@@ -0,0 +1,77 @@
+"""
+Payload Benchmark
+Compares JSON serialization time and bytes-on-wire for API responses
+
+Usage:
+    python -m benchmarks.bench_payloads
+"""
+
+import json
+import random
+import time
+
+from utils.compression import compress_body, supported_encodings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+WORDS = (
+    "flight hotel museum tower desert safari marina souk beach mall "
+    "airline departure arrival terminal rating price review breakfast "
+    "culture etiquette dress code ramadan taxi metro tip safety"
+).split()
+
+
+def sample_payload(paragraphs=60, seed=7):
+    """A full-plan sized response: {"destination": ..., "data": <long text>}."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(paragraphs):
+        words = " ".join(rng.choice(WORDS) for _ in range(60))
+        lines.append(f"{i + 1}. {words.capitalize()}.")
+    return {"destination": "Dubai", "data": "\n\n".join(lines)}
+
+
+def stdlib_dumps(payload):
+    # Same settings as starlette's JSONResponse.render
+    return json.dumps(
+        payload,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def time_it(fn, payload, repeat=2000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(payload)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    payload = sample_payload()
+
+    print("Serialization (microseconds per response)")
+    print(f"  json (stdlib):  {time_it(stdlib_dumps, payload):8.1f}")
+    if orjson is not None:
+        print(f"  orjson:         {time_it(orjson.dumps, payload):8.1f}")
+    else:
+        print("  orjson:         not installed")
+
+    body = stdlib_dumps(payload)
+    print("\nBytes on wire")
+    print(f"  identity:       {len(body):8d}")
+    for encoding in supported_encodings():
+        start = time.perf_counter()
+        compressed = compress_body(body, encoding)
+        elapsed = (time.perf_counter() - start) * 1e3
+        ratio = len(compressed) / len(body)
+        print(f"  {encoding:<15} {len(compressed):8d}  ({ratio:.0%}, {elapsed:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
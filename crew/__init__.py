@@ -1,5 +1,7 @@
 """Crew package initialization"""
 
 from .crew import travel_crew_setup
+from .pool import get_crew_pool, crew_pool_stats
+from .plan_graph import plan_graph
 
-__all__ = ['travel_crew_setup']
+__all__ = ['travel_crew_setup', 'get_crew_pool', 'crew_pool_stats', 'plan_graph']
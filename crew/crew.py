@@ -14,6 +14,11 @@ load_dotenv()
 # Import agents and tasks
 from agents import flight_agent, hotel_agent, tour_agent, advice_agent
 from tasks import task_flights, task_hotels, task_tour, task_advice
+from utils.deadline import check_deadline
+
+# Verbose crews print and keep full agent transcripts; turn off in
+# long-running servers to keep memory flat
+CREW_VERBOSE = os.getenv("CREW_VERBOSE", "1") not in ("0", "false", "no")
 
 def travel_crew_setup():
     """
@@ -27,5 +32,40 @@ def travel_crew_setup():
         agents=[flight_agent, hotel_agent, tour_agent, advice_agent],
         tasks=[task_flights, task_hotels, task_tour, task_advice],
         process=Process.sequential,
-        verbose=True
+        verbose=CREW_VERBOSE,
+        step_callback=check_deadline
     )
+
+def single_agent_crew_setup(agent, task):
+    """
+    Setup a crew that runs a single agent on a single task.
+    
+    Args:
+        agent: The CrewAI agent
+        task: The task assigned to that agent
+    
+    Returns:
+        Crew: Configured CrewAI crew
+    """
+    return Crew(
+        agents=[agent],
+        tasks=[task],
+        verbose=CREW_VERBOSE,
+        step_callback=check_deadline  # abort the agent loop once the deadline passes
+    )
+
+def flight_crew_setup():
+    """Crew with just the flight agent and task."""
+    return single_agent_crew_setup(flight_agent, task_flights)
+
+def hotel_crew_setup():
+    """Crew with just the hotel agent and task."""
+    return single_agent_crew_setup(hotel_agent, task_hotels)
+
+def tour_crew_setup():
+    """Crew with just the tour agent and task."""
+    return single_agent_crew_setup(tour_agent, task_tour)
+
+def advice_crew_setup():
+    """Crew with just the advice agent and task."""
+    return single_agent_crew_setup(advice_agent, task_advice)
@@ -0,0 +1,185 @@
+"""
+Plan Graph
+Models a travel plan as independent sections, each memoized on only the
+inputs it depends on, so an edited request recomputes just what changed
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+
+from crew.pool import get_crew_pool
+from services.plan_store import plan_store
+from utils.cache import TTLCache
+from utils.normalize import canonical_destination
+from utils.responses import is_error_text
+
+# Section -> the inputs it depends on (and passes to its crew)
+PLAN_SECTIONS = {
+    "flights": ("destination", "flight_date"),
+    "hotels": ("destination", "checkin_date", "checkout_date", "max_price", "min_review_score"),
+    "tour": ("destination",),
+    "advice": ("destination",),
+}
+
+SECTION_TITLES = {
+    "flights": "✈️  FLIGHTS",
+    "hotels": "🏨 HOTELS",
+    "tour": "🗺️  ATTRACTIONS",
+    "advice": "💡 TRAVEL ADVICE",
+}
+
+# How long a computed section is reused (seconds), following how fast the
+# underlying data changes
+PLAN_SECTION_TTLS = {
+    "flights": int(os.getenv("PLAN_TTL_FLIGHTS", 10 * 60)),
+    "hotels": int(os.getenv("PLAN_TTL_HOTELS", 30 * 60)),
+    "tour": int(os.getenv("PLAN_TTL_TOUR", 6 * 3600)),
+    "advice": int(os.getenv("PLAN_TTL_ADVICE", 3 * 24 * 3600)),
+}
+
+_sections = TTLCache(
+    "plan_sections",
+    max_entries=int(os.getenv("PLAN_SECTIONS_MAX_ENTRIES", 2048)),
+)
+
+
+def section_key(section, inputs):
+    """Memo key for a section: its name plus only the inputs it depends on."""
+    values = []
+    for name in PLAN_SECTIONS[section]:
+        value = inputs.get(name)
+        if name == "destination":
+            value = canonical_destination(value)
+        values.append("" if value is None else str(value).strip())
+    return (section,) + tuple(values)
+
+
+class TravelPlan:
+    """Section outputs of one plan, with which ones were reused."""
+
+    def __init__(self, inputs, sections, reused, computed, elapsed):
+        self.inputs = inputs
+        self.sections = sections
+        self.reused = reused
+        self.computed = computed
+        self.elapsed = elapsed
+
+    def to_dict(self):
+        return {
+            "inputs": self.inputs,
+            "sections": self.sections,
+            "reused": self.reused,
+            "computed": self.computed,
+            "elapsed_s": round(self.elapsed, 3),
+        }
+
+    def __str__(self):
+        return "\n\n".join(
+            f"===== {SECTION_TITLES.get(name, name.upper())} =====\n{text}"
+            for name, text in self.sections.items()
+        )
+
+
+class PlanGraph:
+    """Computes plan sections through the crew pools, memoizing each one.
+
+    Lookups go memory first, then the persistent plan store (so recent
+    results survive restarts). Missing sections run concurrently on their
+    single-agent crews. A section already being computed by another caller
+    is awaited rather than rerun.
+    """
+
+    def __init__(self, sections=PLAN_SECTIONS, cache=_sections, ttls=PLAN_SECTION_TTLS):
+        self.sections = sections
+        self.cache = cache
+        self.ttls = ttls
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key, section, inputs):
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        ttl = self.ttls.get(section)
+        if not ttl:
+            return None
+        try:
+            stored = plan_store.latest(section, inputs, self.sections[section], max_age=ttl)
+        except Exception as e:
+            print(f"[DEBUG] Plan store read failed: {e}")
+            return None
+        if stored is None:
+            return None
+        content, age = stored
+        # Keep it only for what is left of the section's TTL
+        self.cache.set(key, content, ttl=max(ttl - age, 1))
+        return content
+
+    def _compute(self, section, inputs):
+        crew_inputs = {name: inputs.get(name) or "" for name in self.sections[section]}
+        return str(get_crew_pool(section).kickoff(inputs=crew_inputs))
+
+    def _run(self, key, section, inputs, future):
+        try:
+            text = self._compute(section, inputs)
+            # Error fallbacks are served once but never reused
+            if not is_error_text(text):
+                self.cache.set(key, text, ttl=self.ttls.get(section))
+                plan_store.record(section, inputs, self.sections[section], content=text)
+            future.set_result(text)
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def compute(self, inputs, sections=None, refresh=()):
+        """Build a plan, reusing every memoized section whose inputs are unchanged.
+
+        Args:
+            inputs: Dict with destination, flight_date, checkin_date,
+                checkout_date and optionally max_price, min_review_score
+            sections: Section names to include (default: all)
+            refresh: Section names to recompute even if memoized
+
+        Returns:
+            TravelPlan
+        """
+        start = time.perf_counter()
+        sections = list(sections or self.sections)
+        texts, reused, computed, futures = {}, [], [], {}
+
+        for section in sections:
+            key = section_key(section, inputs)
+            cached = None if section in refresh else self._lookup(key, section, inputs)
+            if cached is not None:
+                texts[section] = cached
+                reused.append(section)
+                continue
+            with self._lock:
+                future = self._inflight.get(key)
+                owner = future is None
+                if owner:
+                    future = self._inflight[key] = Future()
+            futures[section] = (key, future, owner)
+            computed.append(section)
+
+        owned = [(s, k, f) for s, (k, f, owner) in futures.items() if owner]
+        if owned:
+            with ThreadPoolExecutor(max_workers=len(owned)) as pool:
+                for section, key, future in owned:
+                    pool.submit(copy_context().run, self._run, key, section, inputs, future)
+        for section, (_, future, _) in futures.items():
+            texts[section] = future.result()
+
+        ordered = {section: texts[section] for section in sections}
+        return TravelPlan(inputs, ordered, reused, computed, time.perf_counter() - start)
+
+    def invalidate(self, section, inputs):
+        self.cache.delete(section_key(section, inputs))
+
+
+plan_graph = PlanGraph()
@@ -0,0 +1,184 @@
+"""
+Single-Shot Planner
+Builds a full plan without agents: the four data sources are queried
+concurrently and deterministically, then one Gemini call (or a plain
+template) turns the results into the final plan
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from crew.plan_graph import SECTION_TITLES
+from tools.advice_store import advice_store
+from tools.check_flights import (
+    fetch_current_flights, flights_unavailable, format_current_flights, format_flight_window, search_flight_window
+)
+from tools.check_hotels import booking_unavailable, format_hotels, parse_limit, search_hotels
+from tools.gemini import gemini_generate
+from tools.google_place import TOUR_TOP_N, format_attractions, search_attractions
+
+# Engines accepted by run_travel_assistant: the agent crews (via the plan
+# graph), one synthesis call over fetched data, or the template only
+PLAN_ENGINES = ("crew", "single", "template")
+PLAN_ENGINE = os.getenv("PLAN_ENGINE", "crew")
+
+
+# ----- data sources (no LLM fallbacks, so a plan costs at most one call) -----
+
+def gather_flights(inputs):
+    if flights_unavailable():
+        return None
+    window = search_flight_window(inputs["destination"], inputs["flight_date"], 0)
+    if not window:
+        return None
+    if not window["date_filtered"]:
+        # Free tier: the board (already cached by the window search) rarely
+        # has flights departing on the requested day, so show all of it
+        records = fetch_current_flights(window["airport"])
+        if not records:
+            return None
+        return format_current_flights(window["destination"], window["airport"], window["airport_name"],
+                                      records, inputs["flight_date"])
+    if not any(window["days"].values()):
+        return None
+    return format_flight_window(window)
+
+
+def gather_hotels(inputs):
+    if booking_unavailable(inputs["destination"]):
+        return None
+    dest_name, records = search_hotels(
+        inputs["destination"], inputs["checkin_date"], inputs["checkout_date"],
+        max_price=parse_limit(inputs.get("max_price")),
+        min_review_score=parse_limit(inputs.get("min_review_score"))
+    )
+    if not records:
+        return None
+    return format_hotels(dest_name, records, inputs["checkin_date"], inputs["checkout_date"])
+
+
+def gather_tour(inputs):
+    places = search_attractions(inputs["destination"], top_n=TOUR_TOP_N)
+    return format_attractions(inputs["destination"], places) if places else None
+
+
+def gather_advice(inputs):
+    # Only precomputed advice; generating it here would be a second LLM call
+    return advice_store.get(inputs["destination"])
+
+
+SOURCES = {
+    "flights": gather_flights,
+    "hotels": gather_hotels,
+    "tour": gather_tour,
+    "advice": gather_advice,
+}
+
+
+def _safe(source, inputs):
+    try:
+        return source(inputs)
+    except Exception as e:
+        print(f"[DEBUG] Planner source {source.__name__} failed: {e}")
+        return None
+
+
+def gather_sections(inputs):
+    """Run every data source concurrently.
+
+    Returns:
+        Dict of section name to formatted text, or None where no live data
+        was available
+    """
+    with ThreadPoolExecutor(max_workers=len(SOURCES)) as pool:
+        futures = {
+            name: pool.submit(copy_context().run, _safe, source, inputs)
+            for name, source in SOURCES.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+# ----- rendering -----
+
+def render_template(inputs, sections):
+    """Deterministic plan text straight from the section data."""
+    header = (
+        f"Travel plan for {inputs['destination']}\n"
+        f"Flight: {inputs['flight_date']} | Hotel: {inputs['checkin_date']} to {inputs['checkout_date']}"
+    )
+    blocks = [header]
+    for name, text in sections.items():
+        blocks.append(f"===== {SECTION_TITLES[name]} =====\n{text or 'No live data available right now.'}")
+    return "\n\n".join(blocks)
+
+
+def synthesis_prompt(inputs, sections):
+    data = "\n\n".join(
+        f"### {name.upper()}\n{text if text else '(no live data - give brief general guidance and say it is general)'}"
+        for name, text in sections.items()
+    )
+    return (
+        f"You are a travel planner. Write one concise, well-organized travel plan for a trip to "
+        f"{inputs['destination']} (flight on {inputs['flight_date']}, hotel from {inputs['checkin_date']} "
+        f"to {inputs['checkout_date']}). Use only the data below for flights, hotels and attractions; "
+        f"do not invent flight numbers, hotel names or prices. Cover flights, hotels, top attractions "
+        f"and 3 travel tips, and end with a short recommendation.\n\n{data}"
+    )
+
+
+class SingleShotPlan:
+    """Final plan text plus the section data it was built from."""
+
+    def __init__(self, inputs, sections, text, engine, llm_calls, elapsed):
+        self.inputs = inputs
+        self.sections = sections
+        self.text = text
+        self.engine = engine
+        self.llm_calls = llm_calls
+        self.elapsed = elapsed
+
+    def to_dict(self):
+        return {
+            "inputs": self.inputs,
+            "engine": self.engine,
+            "plan": self.text,
+            "sections": self.sections,
+            "live_sections": [name for name, text in self.sections.items() if text],
+            "llm_calls": self.llm_calls,
+            "elapsed_s": round(self.elapsed, 3),
+        }
+
+    def __str__(self):
+        return self.text
+
+
+def single_shot_plan(inputs, synthesize=True):
+    """Plan from concurrently fetched data with at most one LLM call.
+
+    Args:
+        inputs: Dict with destination, flight_date, checkin_date,
+            checkout_date and optionally max_price, min_review_score
+        synthesize: Ask Gemini to write the plan; False renders the template
+
+    Returns:
+        SingleShotPlan
+    """
+    start = time.perf_counter()
+    sections = gather_sections(inputs)
+
+    text, llm_calls, engine = None, 0, "template"
+    if synthesize:
+        llm_calls = 1
+        text = gemini_generate(synthesis_prompt(inputs, sections), family="plan_synthesis",
+                               scope=inputs["destination"])
+        if text.startswith("[Gemini Error]"):
+            print(f"[DEBUG] Synthesis failed, rendering template: {text}")
+            text = None
+        else:
+            engine = "single"
+    if text is None:
+        text = render_template(inputs, sections)
+
+    return SingleShotPlan(inputs, sections, text, engine, llm_calls, time.perf_counter() - start)
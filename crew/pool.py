@@ -0,0 +1,152 @@
+"""
+Crew Pool
+Builds each crew template once and hands every execution its own isolated
+copy, so concurrent kickoffs never share mutable Agent/Task objects
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from crew.crew import (
+    flight_crew_setup,
+    hotel_crew_setup,
+    tour_crew_setup,
+    advice_crew_setup,
+)
+from utils.deadline import DeadlineExceeded, timeout_for
+
+# Max concurrent executions per crew kind (should match admission limits)
+CREW_POOL_SIZE = int(os.getenv("CREW_POOL_SIZE", 8))
+
+# Longest a caller waits for a free crew when there is no request deadline
+CREW_POOL_WAIT_TIMEOUT = float(os.getenv("CREW_POOL_WAIT_TIMEOUT", 60))
+
+# Copies keep task outputs and agent state from past runs; replace a copy
+# after this many executions so long-running workers don't keep growing
+CREW_MAX_RUNS_PER_COPY = int(os.getenv("CREW_MAX_RUNS_PER_COPY", 50))
+
+# One pool per section crew. Full plans go through the plan graph, which
+# runs these section crews, so the four-agent travel crew isn't pooled.
+CREW_TEMPLATES = {
+    "flights": flight_crew_setup,
+    "hotels": hotel_crew_setup,
+    "tour": tour_crew_setup,
+    "advice": advice_crew_setup,
+}
+
+
+class CrewPool:
+    """Pool of ready-to-run copies of one crew template.
+
+    The template (agents + tasks) is built once. Each acquire() hands out an
+    idle copy, or makes a new one with Crew.copy(), which is far cheaper
+    than building agents from scratch. A copy is used by one execution at
+    a time and goes back to the pool afterwards.
+    """
+
+    def __init__(self, name, template_factory, size=CREW_POOL_SIZE, max_runs=CREW_MAX_RUNS_PER_COPY):
+        self.name = name
+        self.size = size
+        self.max_runs = max_runs
+        self._template_factory = template_factory
+        self._template = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self.created = 0
+        self.in_use = 0
+        self.executions = 0
+        self.discarded = 0
+        self.recycled = 0
+        self.waits = deque(maxlen=1000)
+
+    def template(self):
+        """The template crew, built on first use."""
+        if self._template is None:
+            with self._lock:
+                if self._template is None:
+                    self._template = self._template_factory()
+        return self._template
+
+    def _new_instance(self):
+        crew = self.template().copy()
+        with self._lock:
+            self.created += 1
+        return crew
+
+    def prewarm(self, count=1):
+        """Build the template and park `count` ready copies in the pool."""
+        count = min(count, self.size)
+        while self._idle.qsize() < count:
+            self._idle.put((self._new_instance(), 0))
+
+    @contextmanager
+    def acquire(self):
+        """Borrow an isolated crew instance for one execution."""
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=timeout_for(CREW_POOL_WAIT_TIMEOUT)):
+            raise DeadlineExceeded(f"no free '{self.name}' crew within the deadline")
+        self.waits.append(time.monotonic() - start)
+
+        try:
+            crew, runs = self._idle.get_nowait()
+        except queue.Empty:
+            crew, runs = self._new_instance(), 0
+
+        with self._lock:
+            self.in_use += 1
+        healthy = False
+        try:
+            yield crew
+            healthy = True
+        finally:
+            with self._lock:
+                self.in_use -= 1
+                self.executions += 1
+                if not healthy:
+                    self.discarded += 1
+                elif runs + 1 >= self.max_runs:
+                    self.recycled += 1
+            # A crew that raised mid-run may hold half-updated state, and a
+            # well-used one has accumulated outputs; both are dropped
+            if healthy and runs + 1 < self.max_runs:
+                self._idle.put((crew, runs + 1))
+            self._slots.release()
+
+    def kickoff(self, inputs):
+        """Run one execution of this crew with the given inputs."""
+        with self.acquire() as crew:
+            return crew.kickoff(inputs=inputs)
+
+    def stats(self):
+        waits = sorted(self.waits)
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "idle": self._idle.qsize(),
+            "created": self.created,
+            "executions": self.executions,
+            "discarded": self.discarded,
+            "recycled": self.recycled,
+            "wait_ms": {
+                "mean": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                "p95": round(waits[int(len(waits) * 0.95) - 1] * 1000, 2) if len(waits) >= 20 else None,
+                "max": round(waits[-1] * 1000, 2) if waits else 0.0,
+            },
+        }
+
+
+crew_pools = {name: CrewPool(name, factory) for name, factory in CREW_TEMPLATES.items()}
+
+
+def get_crew_pool(name):
+    """Pool for a crew kind: 'flights', 'hotels', 'tour' or 'advice'."""
+    return crew_pools[name]
+
+
+def crew_pool_stats():
+    return {name: pool.stats() for name, pool in crew_pools.items()}
@@ -15,14 +15,16 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 os.environ["GEMINI_API_KEY"] = GEMINI_API_KEY
 os.environ["GOOGLE_API_KEY"] = GEMINI_API_KEY
 
-# Import crew setup
-from crew import travel_crew_setup
+# Import the memoized plan graph and the single-shot planner
+from crew import plan_graph
+from crew.planner import PLAN_ENGINE, PLAN_ENGINES, single_shot_plan
 
 # =========================
 # MAIN FUNCTION
 # =========================
 
-def run_travel_assistant(destination, flight_date=None, checkin_date=None, checkout_date=None):
+def run_travel_assistant(destination, flight_date=None, checkin_date=None, checkout_date=None,
+                         engine=PLAN_ENGINE):
     """
     Run the travel assistant with dates.
     
@@ -31,10 +33,17 @@ def run_travel_assistant(destination, flight_date=None, checkin_date=None, check
         flight_date: Flight date in YYYY-MM-DD format (default: tomorrow)
         checkin_date: Hotel check-in date in YYYY-MM-DD format (default: tomorrow)
         checkout_date: Hotel check-out date in YYYY-MM-DD format (default: 2 days after check-in)
+        engine: 'crew' (agents), 'single' (one LLM call) or 'template' (no LLM call)
     
     Returns:
         Travel plan with flights, hotels, attractions, and advice
+
+    Raises:
+        ValueError: if engine is not one of PLAN_ENGINES
     """
+    if engine not in PLAN_ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(PLAN_ENGINES)}")
+
     # Set default dates if not provided
     if not flight_date:
         flight_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
@@ -48,15 +57,22 @@ def run_travel_assistant(destination, flight_date=None, checkin_date=None, check
     print(f"📅 Flight Date: {flight_date}")
     print(f"🏨 Hotel: {checkin_date} to {checkout_date}\n")
     
-    # Setup and run the crew
-    travel_crew = travel_crew_setup()
-    
-    result = travel_crew.kickoff(inputs={
+    inputs = {
         "destination": destination,
         "flight_date": flight_date,
         "checkin_date": checkin_date,
-        "checkout_date": checkout_date
-    })
+        "checkout_date": checkout_date,
+        # No hotel filters in a full plan; the hotel task expects the keys
+        "max_price": "",
+        "min_review_score": ""
+    }
+    if engine == "crew":
+        # Compute the plan section by section; sections whose inputs haven't
+        # changed since an earlier plan are reused instead of rerun
+        result = plan_graph.compute(inputs)
+    else:
+        # Fetch all tool data concurrently, then at most one LLM call
+        result = single_shot_plan(inputs, synthesize=engine == "single")
     
     print("\n===== FINAL TRAVEL PLAN =====\n")
     print(result)
@@ -0,0 +1 @@
+"""HTTP middleware package for travel assistant API"""
@@ -0,0 +1,259 @@
+"""
+Admission Control Middleware
+Bounds concurrency and queue depth per router and sheds excess load with
+503 + Retry-After, so slow upstreams can't starve /health and friends
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from itertools import count
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from utils.deadline import remaining
+from utils.normalize import normalize_path
+
+# Per-router limits. Lower priority value = admitted first when slots free
+# up; advice and tour are single cheap tool calls, flights and hotels fan
+# out to several upstreams.
+ROUTE_LIMITS = {
+    "/advice": {
+        "concurrency": int(os.getenv("ADMISSION_ADVICE_CONCURRENCY", 8)),
+        "queue_depth": int(os.getenv("ADMISSION_ADVICE_QUEUE", 16)),
+        "priority": 1,
+    },
+    "/tour": {
+        "concurrency": int(os.getenv("ADMISSION_TOUR_CONCURRENCY", 8)),
+        "queue_depth": int(os.getenv("ADMISSION_TOUR_QUEUE", 16)),
+        "priority": 1,
+    },
+    "/hotels": {
+        "concurrency": int(os.getenv("ADMISSION_HOTELS_CONCURRENCY", 6)),
+        "queue_depth": int(os.getenv("ADMISSION_HOTELS_QUEUE", 12)),
+        "priority": 2,
+    },
+    "/flights": {
+        "concurrency": int(os.getenv("ADMISSION_FLIGHTS_CONCURRENCY", 6)),
+        "queue_depth": int(os.getenv("ADMISSION_FLIGHTS_QUEUE", 12)),
+        "priority": 2,
+    },
+    # Fans out to flights and hotels for every destination compared
+    "/compare": {
+        "concurrency": int(os.getenv("ADMISSION_COMPARE_CONCURRENCY", 2)),
+        "queue_depth": int(os.getenv("ADMISSION_COMPARE_QUEUE", 4)),
+        "priority": 3,
+    },
+    # Four tool sources fetched concurrently plus one Gemini call
+    "/plan": {
+        "concurrency": int(os.getenv("ADMISSION_PLAN_CONCURRENCY", 4)),
+        "queue_depth": int(os.getenv("ADMISSION_PLAN_QUEUE", 8)),
+        "priority": 2,
+    },
+    # One slot per session turn; WebSockets bypass the HTTP middleware, so
+    # the session handler acquires this gate itself
+    "/ws/session": {
+        "concurrency": int(os.getenv("ADMISSION_SESSION_CONCURRENCY", 4)),
+        "queue_depth": int(os.getenv("ADMISSION_SESSION_QUEUE", 8)),
+        "priority": 2,
+    },
+}
+
+# Total requests allowed to run at once across all gated routes. Keep this
+# below the threadpool size (40 by default) so ungated endpoints such as
+# /health always find a free worker thread.
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", 24))
+
+# Longest a request may wait in the queue before being shed
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 10))
+
+
+class _RouteGate:
+    """Concurrency/queue accounting for one router prefix."""
+
+    def __init__(self, prefix, concurrency, queue_depth, priority):
+        self.prefix = prefix
+        self.concurrency = concurrency
+        self.queue_depth = queue_depth
+        self.priority = priority
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.service_time = 1.0  # EWMA of handler duration, seconds
+        self.queue_delays = deque(maxlen=1000)
+
+    def stats(self):
+        delays = sorted(self.queue_delays)
+        p95 = delays[min(len(delays) - 1, int(len(delays) * 0.95))] if delays else 0.0
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue_depth,
+            "priority": self.priority,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_service_time_s": round(self.service_time, 3),
+            "queue_delay_ms": {
+                "mean": round(sum(delays) / len(delays) * 1000, 2) if delays else 0.0,
+                "p95": round(p95 * 1000, 2),
+                "max": round(delays[-1] * 1000, 2) if delays else 0.0,
+            },
+        }
+
+
+class AdmissionController:
+    """Priority admission queue shared by all gated routes.
+
+    Runs entirely on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, limits=None, max_inflight=ADMISSION_MAX_INFLIGHT,
+                 queue_timeout=ADMISSION_QUEUE_TIMEOUT):
+        limits = ROUTE_LIMITS if limits is None else limits
+        self.gates = {
+            prefix: _RouteGate(prefix, **config) for prefix, config in limits.items()
+        }
+        self.max_inflight = max_inflight
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self._waiters = []  # [priority, seq, gate, future]
+        self._seq = count()
+
+    def gate_for(self, path):
+        """Gate for a normalized path, or None for ungated endpoints."""
+        for prefix, gate in self.gates.items():
+            if path == prefix or path.startswith(prefix + "/"):
+                return gate
+        return None
+
+    def _can_run(self, gate):
+        return gate.active < gate.concurrency and self.inflight < self.max_inflight
+
+    def _admit(self, gate, waited):
+        gate.active += 1
+        gate.admitted += 1
+        gate.queue_delays.append(waited)
+        self.inflight += 1
+
+    def _dispatch(self):
+        """Admit queued requests in priority order while capacity allows."""
+        self._waiters.sort(key=lambda waiter: (waiter[0], waiter[1]))
+        still_waiting = []
+        for waiter in self._waiters:
+            gate, future = waiter[2], waiter[3]
+            if future.done():
+                # Cancelled by a timeout that hasn't reached _forget yet;
+                # dropping it here is the only place it leaves the queue
+                gate.waiting -= 1
+                continue
+            if self._can_run(gate):
+                gate.waiting -= 1
+                future.set_result(True)
+                self.inflight += 1
+                gate.active += 1
+            else:
+                still_waiting.append(waiter)
+        self._waiters = still_waiting
+
+    async def acquire(self, gate):
+        """Wait for a slot on gate. Returns False if the request is shed."""
+        start = time.monotonic()
+        # After every release the queue is drained as far as capacity allows,
+        # so a runnable newcomer never jumps ahead of a runnable waiter
+        if self._can_run(gate):
+            self._admit(gate, 0.0)
+            return True
+        if gate.waiting >= gate.queue_depth:
+            gate.rejected += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = [gate.priority, next(self._seq), gate, future]
+        self._waiters.append(waiter)
+        gate.waiting += 1
+        # Never wait in the queue past the request's own deadline
+        left = remaining()
+        timeout = self.queue_timeout if left is None else max(min(self.queue_timeout, left), 0)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            gate.timed_out += 1
+            gate.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away while queued; give the slot back if we got one
+            if future.done() and not future.cancelled():
+                self.release(gate, 0.0)
+            else:
+                self._forget(waiter)
+            raise
+        gate.admitted += 1
+        gate.queue_delays.append(time.monotonic() - start)
+        return True
+
+    def _forget(self, waiter):
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+            waiter[2].waiting -= 1
+
+    def release(self, gate, service_time):
+        gate.active -= 1
+        self.inflight -= 1
+        if service_time:
+            gate.service_time = 0.8 * gate.service_time + 0.2 * service_time
+        self._dispatch()
+
+    def retry_after(self, gate):
+        """Seconds a shed client should wait, from queue length and service time."""
+        backlog = (gate.waiting + gate.active + 1) / max(gate.concurrency, 1)
+        return max(1, math.ceil(backlog * gate.service_time))
+
+    def stats(self):
+        return {
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "queue_timeout_s": self.queue_timeout,
+            "routes": {prefix: gate.stats() for prefix, gate in self.gates.items()},
+        }
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionControlMiddleware(BaseHTTPMiddleware):
+    """Fail fast with 503 instead of queueing unboundedly in the threadpool."""
+
+    def __init__(self, app, controller=None):
+        super().__init__(app)
+        self.controller = controller or admission_controller
+
+    async def dispatch(self, request, call_next):
+        gate = self.controller.gate_for(normalize_path(request.url.path))
+        if gate is None:
+            return await call_next(request)
+
+        if not await self.controller.acquire(gate):
+            retry_after = self.controller.retry_after(gate)
+            return JSONResponse(
+                status_code=503,
+                content={
+                    "detail": "Server is busy, please retry later",
+                    "route": gate.prefix,
+                    "retry_after": retry_after,
+                },
+                headers={"Retry-After": str(retry_after)},
+            )
+
+        start = time.monotonic()
+        try:
+            return await call_next(request)
+        finally:
+            self.controller.release(gate, time.monotonic() - start)
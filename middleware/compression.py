@@ -0,0 +1,60 @@
+"""
+Compression Middleware
+Negotiates brotli/gzip with the client and compresses responses above a
+size threshold
+"""
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from utils.compression import (
+    COMPRESSION_MIN_BYTES,
+    compress_body,
+    is_compressible,
+    negotiate_encoding,
+)
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """Compress JSON/text responses for clients that accept br or gzip."""
+
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_BYTES):
+        super().__init__(app)
+        self.minimum_size = minimum_size
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        content_type = response.headers.get("content-type", "")
+        if (
+            encoding is None
+            or response.status_code in (204, 304)
+            or "content-encoding" in response.headers
+            or not is_compressible(content_type)
+        ):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name.lower() != "content-length"
+        }
+        vary = headers.get("vary")
+        headers["vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+        if len(body) >= self.minimum_size:
+            body = compress_body(body, encoding)
+            headers["content-encoding"] = encoding
+            # The compressed bytes differ from the identity body, so the
+            # validator can only be weak
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["etag"] = f"W/{etag}"
+
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=headers,
+            media_type=content_type,
+        )
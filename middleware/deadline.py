@@ -0,0 +1,32 @@
+"""
+Deadline Middleware
+Starts a per-request deadline that flows through the crew into every tool
+"""
+
+import os
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from utils.deadline import REQUEST_DEADLINE, deadline_scope
+
+# Upper bound on a client-requested budget
+MAX_REQUEST_DEADLINE = float(os.getenv("MAX_REQUEST_DEADLINE", 120))
+
+
+def request_budget(request):
+    """Budget in seconds from the X-Request-Timeout header, or the default."""
+    header = request.headers.get("x-request-timeout")
+    if header:
+        try:
+            return min(max(float(header), 0.0), MAX_REQUEST_DEADLINE)
+        except ValueError:
+            pass
+    return REQUEST_DEADLINE
+
+
+class DeadlineMiddleware(BaseHTTPMiddleware):
+    """Run each request under a deadline (X-Request-Timeout seconds or REQUEST_DEADLINE)."""
+
+    async def dispatch(self, request, call_next):
+        with deadline_scope(request_budget(request)):
+            return await call_next(request)
@@ -0,0 +1,25 @@
+"""
+Popularity Middleware
+Counts requests per canonical destination so the cache warmer knows which
+destinations are hot
+"""
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from utils.popularity import record_destination
+
+# Routes whose `destination` query parameter is worth counting
+TRACKED_PREFIXES = ("/flights", "/hotels", "/tour", "/advice", "/plan")
+
+
+class PopularityMiddleware(BaseHTTPMiddleware):
+    """Record the destination of every tracked GET, including cache hits."""
+
+    async def dispatch(self, request, call_next):
+        destination = request.query_params.get("destination")
+        # Startup warm-up requests are not real demand
+        if request.headers.get("x-warmup"):
+            return await call_next(request)
+        if request.method == "GET" and destination and request.url.path.startswith(TRACKED_PREFIXES):
+            record_destination(destination)
+        return await call_next(request)
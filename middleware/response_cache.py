@@ -0,0 +1,116 @@
+"""
+Response Cache Middleware
+Caches GET responses per normalized route + query, with ETag/Cache-Control
+headers and 304 handling for conditional requests
+"""
+
+import hashlib
+import os
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from utils.cache import TTLCache
+from utils.normalize import normalize_path, normalize_query
+
+# Default TTL (seconds) per route prefix. Advice is stable for days,
+# attractions for hours, flight boards change within minutes.
+ROUTE_CACHE_TTLS = {
+    "/advice": int(os.getenv("CACHE_TTL_ADVICE", 3 * 24 * 3600)),
+    "/tour": int(os.getenv("CACHE_TTL_TOUR", 6 * 3600)),
+    "/hotels": int(os.getenv("CACHE_TTL_HOTELS", 30 * 60)),
+    "/flights": int(os.getenv("CACHE_TTL_FLIGHTS", 10 * 60)),
+    "/compare": int(os.getenv("CACHE_TTL_COMPARE", 10 * 60)),
+    "/plan": int(os.getenv("CACHE_TTL_PLAN", 10 * 60)),
+}
+
+response_cache = TTLCache(
+    "responses",
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 512)),
+)
+
+
+def route_ttl(path):
+    """TTL configured for the route prefix of path, or None if uncached."""
+    for prefix, ttl in ROUTE_CACHE_TTLS.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            return ttl if ttl > 0 else None
+    return None
+
+
+def cache_key(request):
+    """Cache key built from the normalized route path and query parameters."""
+    return (normalize_path(request.url.path), normalize_query(request.query_params))
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _cache_headers(etag, max_age):
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max(int(max_age), 0)}",
+    }
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serve repeat GET requests from memory instead of rerunning a crew."""
+
+    async def dispatch(self, request, call_next):
+        path = normalize_path(request.url.path)
+        ttl = route_ttl(path)
+        if request.method != "GET" or ttl is None:
+            return await call_next(request)
+
+        key = cache_key(request)
+        if_none_match = request.headers.get("if-none-match")
+        refresh = "no-cache" in request.headers.get("cache-control", "")
+
+        entry = None if refresh else response_cache.get(key)
+        if entry is not None:
+            max_age = response_cache.expires_in(key) or 0
+            headers = _cache_headers(entry["etag"], max_age)
+            if _etag_matches(if_none_match, entry["etag"]):
+                return Response(status_code=304, headers=headers)
+            headers["X-Cache"] = "HIT"
+            return Response(
+                content=entry["body"],
+                status_code=entry["status"],
+                headers=headers,
+                media_type=entry["media_type"],
+            )
+
+        response = await call_next(request)
+        # Routes mark error fallbacks (Gemini errors, failed upstreams) with
+        # Cache-Control: no-store so a transient failure isn't served for a TTL
+        if response.status_code != 200 or "no-store" in response.headers.get("cache-control", ""):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        media_type = response.headers.get("content-type")
+        response_cache.set(key, {
+            "body": body,
+            "status": response.status_code,
+            "media_type": media_type,
+            "etag": etag,
+        }, ttl=ttl)
+
+        headers = _cache_headers(etag, ttl)
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        headers["X-Cache"] = "MISS"
+        for name, value in response.headers.items():
+            if name.lower() not in ("content-length", "content-type", "etag", "cache-control"):
+                headers.setdefault(name, value)
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=headers,
+            media_type=media_type,
+        )
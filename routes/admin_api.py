@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+import gc
+import hmac
+import os
+import tracemalloc
+from utils.cache import all_cache_stats
+from utils.memory import memory_budget, process_rss_bytes, top_allocations
+
+# Admin endpoints expose process internals; they answer 404 until a token
+# is configured and then require it in the X-Admin-Token header
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+def require_admin(x_admin_token: str = Header(None)):
+    """Reject the request unless it carries the configured admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Missing or invalid admin token")
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/memory")
+def get_memory(
+    top: int = Query(15, ge=1, le=100),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    compare: bool = Query(False),
+    collect: bool = Query(False)
+):
+    """
+    Live memory report for the API process.
+    
+    Allocation sites need tracemalloc, which is started when the server
+    boots with TRACEMALLOC_FRAMES > 0.
+    
+    Args:
+        top: Number of allocation sites to report (default: 15)
+        group_by: Group sites by 'lineno', 'filename' or 'traceback'
+        compare: Report growth since the previous call instead of totals
+        collect: Run the garbage collector before measuring
+    
+    Returns:
+        Process RSS, memory budget usage, per-cache byte estimates and
+        top allocation sites
+    """
+    if collect:
+        gc.collect()
+    
+    traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+    return {
+        "process": {
+            "rss_bytes": process_rss_bytes(),
+            "gc_counts": gc.get_count(),
+        },
+        "budget": memory_budget.stats(),
+        "caches": {
+            name: {"entries": stats["entries"], "bytes": stats["bytes"], "evictions": stats["evictions"]}
+            for name, stats in all_cache_stats().items()
+        },
+        "tracemalloc": {
+            "tracing": traced is not None,
+            "traced_bytes": traced[0] if traced else None,
+            "peak_bytes": traced[1] if traced else None,
+            "top": top_allocations(top, group_by, compare),
+        },
+    }
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Query
-from crewai import Crew
-from agents.advice_agent import advice_agent
-from tasks.advice_task import task_advice
+from fastapi import APIRouter, Query, Response
+from crew.pool import get_crew_pool
+from tools.advice_store import advice_store
+from utils.responses import is_error_text, no_store
 
 router = APIRouter(prefix="/advice", tags=["Advice"])
 
 @router.get("/")
-def get_travel_advice(destination: str = Query(...)):
+def get_travel_advice(response: Response, destination: str = Query(...)):
     """
-    Get travel advice for a specific destination using CrewAI agent.
+    Get travel advice for a specific destination.
+    
+    Precomputed advice is served straight from the local advice store;
+    otherwise the CrewAI agent generates it (and it is stored for next time).
     
     Args:
         destination: City or destination name
@@ -16,19 +19,23 @@ def get_travel_advice(destination: str = Query(...)):
     Returns:
         Travel safety and cultural tips
     """
-    # Create a crew with just the advice agent and task
-    advice_crew = Crew(
-        agents=[advice_agent],
-        tasks=[task_advice],
-        verbose=True
-    )
+    advice = advice_store.get(destination)
+    if advice is not None:
+        return {
+            "destination": destination,
+            "data": advice,
+            "source": "store"
+        }
     
-    # Execute the crew
-    result = advice_crew.kickoff(inputs={
+    # Run an isolated copy of the prebuilt advice agent crew
+    result = get_crew_pool("advice").kickoff(inputs={
         "destination": destination
     })
+    if is_error_text(result):
+        no_store(response)
     
     return {
         "destination": destination, 
-        "data": str(result)
+        "data": str(result),
+        "source": "agent"
     }
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Query, Response
+from datetime import datetime, timedelta
+from services.compare import COMPARE_MAX_DESTINATIONS, compare_destinations
+from utils.responses import no_store
+
+router = APIRouter(prefix="/compare", tags=["Compare"])
+
+@router.get("/")
+def compare(
+    response: Response,
+    destinations: str = Query(..., description="Comma-separated destinations, e.g. Dubai,Paris,Rome"),
+    flight_date: str = Query(None),
+    checkin_date: str = Query(None),
+    checkout_date: str = Query(None),
+    w_price: float = Query(None, ge=0),
+    w_rating: float = Query(None, ge=0),
+    w_flights: float = Query(None, ge=0),
+    w_duration: float = Query(None, ge=0)
+):
+    """
+    Compare several destinations side by side without running any agent.
+    
+    Flight and hotel data for every destination are fetched concurrently and
+    ranked with one weighted score over hotel price, hotel rating, number of
+    flights and flight duration.
+    
+    Args:
+        destinations: Comma-separated destination names
+        flight_date: Flight date in YYYY-MM-DD format (optional, default: tomorrow)
+        checkin_date: Check-in date in YYYY-MM-DD format (optional, default: flight date)
+        checkout_date: Check-out date in YYYY-MM-DD format (optional, default: 2 days after check-in)
+        w_price, w_rating, w_flights, w_duration: Optional weight overrides
+    
+    Returns:
+        Comparison table, best destination first
+    """
+    names = [d.strip() for d in destinations.split(",") if d.strip()]
+    if len(names) < 2:
+        raise HTTPException(status_code=400, detail="Provide at least two destinations")
+    if len(names) > COMPARE_MAX_DESTINATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {COMPARE_MAX_DESTINATIONS} destinations can be compared")
+    
+    try:
+        # Set default dates if not provided
+        if not flight_date:
+            flight_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        if not checkin_date:
+            checkin_date = flight_date
+        if not checkout_date:
+            checkin_dt = datetime.strptime(checkin_date, "%Y-%m-%d")
+            checkout_date = (checkin_dt + timedelta(days=2)).strftime("%Y-%m-%d")
+        datetime.strptime(flight_date, "%Y-%m-%d")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e} (dates must be YYYY-MM-DD)")
+    
+    weights = {
+        metric: value for metric, value in (
+            ("hotel_price", w_price),
+            ("hotel_rating", w_rating),
+            ("flights", w_flights),
+            ("flight_minutes", w_duration),
+        ) if value is not None
+    }
+    
+    comparison = compare_destinations(names, flight_date, checkin_date, checkout_date, weights)
+    if any(row["errors"] for row in comparison["results"]):
+        # A source failed for some destination; don't keep the partial table
+        no_store(response)
+    return comparison
@@ -1,13 +1,14 @@
-﻿from fastapi import APIRouter, Query
-from crewai import Crew
+﻿from fastapi import APIRouter, HTTPException, Query, Response
 from datetime import datetime, timedelta
-from agents.flight_agent import flight_agent
-from tasks.flight_task import task_flights
+import requests
+from crew.pool import get_crew_pool
+from tools.check_flights import FLIGHT_WINDOW_MAX_DAYS, flights_unavailable, search_flight_window
+from utils.responses import is_error_text, no_store
 
 router = APIRouter(prefix="/flights", tags=["Flights"])
 
 @router.get("/")
-def get_flights(destination: str, flight_date: str = Query(None)):
+def get_flights(response: Response, destination: str, flight_date: str = Query(None)):
     """
     Get flight information for a specific destination and optional date using CrewAI agent.
     
@@ -22,21 +23,57 @@ def get_flights(destination: str, flight_date: str = Query(None)):
     if not flight_date:
         flight_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
     
-    # Create a crew with just the flight agent and task
-    flight_crew = Crew(
-        agents=[flight_agent],
-        tasks=[task_flights],
-        verbose=True
-    )
-    
-    # Execute the crew
-    result = flight_crew.kickoff(inputs={
+    # Run an isolated copy of the prebuilt flight agent crew
+    result = get_crew_pool("flights").kickoff(inputs={
         "destination": destination,
         "flight_date": flight_date
     })
+    if is_error_text(result):
+        no_store(response)
     
     return {
         "destination": destination, 
         "flight_date": flight_date, 
         "data": str(result)
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/window")
+def get_flight_window(
+    destination: str,
+    flight_date: str = Query(None),
+    window_days: int = Query(3, ge=0, le=FLIGHT_WINDOW_MAX_DAYS)
+):
+    """
+    Get flights for every day in flight_date ± window_days, grouped by day.
+    
+    Queries AviationStack directly (no agent run), one concurrent query per
+    day; on plan tiers without date filtering, the current flights are
+    grouped by scheduled departure date instead.
+    
+    Args:
+        destination: Airport IATA code or city name
+        flight_date: Center date in YYYY-MM-DD format (optional, default: tomorrow)
+        window_days: Days to search before and after flight_date (default: 3)
+    
+    Returns:
+        Flights de-duplicated by flight number and departure, grouped by day
+    """
+    if flights_unavailable():
+        raise HTTPException(status_code=503, detail="Flight search is temporarily unavailable")
+    
+    try:
+        window = search_flight_window(destination, flight_date, window_days)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="flight_date must be YYYY-MM-DD")
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+        raise HTTPException(status_code=503, detail="Flight search is temporarily unavailable")
+    except requests.exceptions.RequestException as e:
+        # Only the status: the request URL in the message carries the API key
+        status = e.response.status_code if e.response is not None else "error"
+        raise HTTPException(status_code=502, detail=f"Flight search failed upstream ({status})")
+    
+    if window is None:
+        raise HTTPException(status_code=404, detail=f"Could not find airport for destination: {destination}")
+    
+    return window
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Query
+import time
+from services.plan_store import PLAN_STORE_PAGE_SIZE, plan_store
+
+router = APIRouter(prefix="/history", tags=["History"])
+
+@router.get("/")
+def get_history(
+    destination: str = Query(None),
+    section: str = Query(None, description="flights, hotels, tour, advice or hotel_search"),
+    days: float = Query(None, gt=0),
+    limit: int = Query(PLAN_STORE_PAGE_SIZE, ge=1, le=100),
+    cursor: str = Query(None),
+    include_content: bool = Query(False)
+):
+    """
+    Browse stored plan sections and search results, newest first.
+    
+    Args:
+        destination: Only this destination (optional)
+        section: Only this section (optional)
+        days: Only results from the last N days (optional)
+        limit: Page size (default: 20)
+        cursor: next_cursor from the previous page (optional)
+        include_content: Include the full text and structured data (default: false)
+    
+    Returns:
+        Page of results and the cursor for the next page
+    """
+    since = time.time() - days * 86400 if days else None
+    try:
+        return plan_store.history(destination, section, since, limit, cursor, include_content)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/prices")
+def get_price_history(
+    destination: str = Query(...),
+    days: int = Query(7, ge=1, le=365)
+):
+    """
+    Daily hotel price history for a destination from past searches.
+    
+    Args:
+        destination: City name
+        days: How many days back to look (default: 7)
+    
+    Returns:
+        Per-day search count and min/avg/max cheapest price found (USD)
+    """
+    return {
+        "destination": destination,
+        "days": days,
+        "currency": "USD",
+        "history": plan_store.price_history(destination, days)
+    }
@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Query
-from crewai import Crew
+from fastapi import APIRouter, HTTPException, Query, Response
 from datetime import datetime, timedelta
-from agents.hotel_agent import hotel_agent
-from tasks.hotel_task import task_hotels
+import requests
+from crew.pool import get_crew_pool
+from tools.check_hotels import booking_unavailable
+from tools.hotel_calendar import HOTEL_CALENDAR_MAX_DAYS, price_calendar
+from utils.responses import is_error_text, no_store
 
 router = APIRouter(prefix="/hotels", tags=["Hotels"])
 
 @router.get("/")
-def get_hotels(destination: str, checkin_date: str = Query(None), checkout_date: str = Query(None)):
+def get_hotels(
+    response: Response,
+    destination: str,
+    checkin_date: str = Query(None),
+    checkout_date: str = Query(None),
+    max_price: float = Query(None, gt=0),
+    min_review_score: float = Query(None, ge=0, le=10)
+):
     """
     Get hotel recommendations for a specific destination and date range using CrewAI agent.
     
@@ -15,6 +24,8 @@ def get_hotels(destination: str, checkin_date: str = Query(None), checkout_date:
         destination: City name
         checkin_date: Check-in date in YYYY-MM-DD format (optional, default: tomorrow)
         checkout_date: Check-out date in YYYY-MM-DD format (optional, default: 2 days after check-in)
+        max_price: Maximum price per night in USD (optional)
+        min_review_score: Minimum review score out of 10 (optional)
     
     Returns:
         Hotel recommendations with ratings and prices
@@ -26,23 +37,69 @@ def get_hotels(destination: str, checkin_date: str = Query(None), checkout_date:
         checkin_dt = datetime.strptime(checkin_date, "%Y-%m-%d")
         checkout_date = (checkin_dt + timedelta(days=2)).strftime("%Y-%m-%d")
     
-    # Create a crew with just the hotel agent and task
-    hotel_crew = Crew(
-        agents=[hotel_agent],
-        tasks=[task_hotels],
-        verbose=True
-    )
-    
-    # Execute the crew
-    result = hotel_crew.kickoff(inputs={
+    # Run an isolated copy of the prebuilt hotel agent crew
+    result = get_crew_pool("hotels").kickoff(inputs={
         "destination": destination,
         "checkin_date": checkin_date,
-        "checkout_date": checkout_date
+        "checkout_date": checkout_date,
+        "max_price": max_price if max_price is not None else "",
+        "min_review_score": min_review_score if min_review_score is not None else ""
     })
+    if is_error_text(result):
+        no_store(response)
     
     return {
         "destination": destination, 
         "checkin_date": checkin_date,
         "checkout_date": checkout_date,
+        "max_price": max_price,
+        "min_review_score": min_review_score,
         "data": str(result)
     }
+
+
+@router.get("/calendar")
+def get_price_calendar(
+    destination: str,
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    nights: int = Query(3, ge=1, le=30)
+):
+    """
+    Get the cheapest and median hotel price for every check-in date in a range.
+    
+    Calls Booking.com directly (no agent run) for each date at bounded
+    concurrency; results are cached per destination and date.
+    
+    Args:
+        destination: City name
+        start_date: First check-in date in YYYY-MM-DD format (optional, default: tomorrow)
+        end_date: Last check-in date in YYYY-MM-DD format (optional, default: 29 days after start)
+        nights: Length of stay (default: 3)
+    
+    Returns:
+        Per-date min/median price matrix and the cheapest check-in date
+    """
+    if booking_unavailable(destination):
+        raise HTTPException(status_code=503, detail="Hotel search is temporarily unavailable")
+    
+    try:
+        # Set default dates if not provided
+        if not start_date:
+            start_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        if not end_date:
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+            end_date = (start_dt + timedelta(days=29)).strftime("%Y-%m-%d")
+        calendar = price_calendar(destination, start_date, end_date, nights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e} (dates must be YYYY-MM-DD, range up to {HOTEL_CALENDAR_MAX_DAYS} days)")
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+        raise HTTPException(status_code=503, detail="Hotel search is temporarily unavailable")
+    except requests.exceptions.RequestException as e:
+        status = e.response.status_code if e.response is not None else "error"
+        raise HTTPException(status_code=502, detail=f"Hotel search failed upstream ({status})")
+    
+    if calendar is None:
+        raise HTTPException(status_code=404, detail=f"Unknown destination: {destination}")
+    
+    return calendar
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException, Query, Response
+from datetime import datetime, timedelta
+from crew.planner import single_shot_plan
+from utils.responses import no_store
+
+router = APIRouter(prefix="/plan", tags=["Plan"])
+
+@router.get("/")
+def get_plan(
+    response: Response,
+    destination: str,
+    flight_date: str = Query(None),
+    checkin_date: str = Query(None),
+    checkout_date: str = Query(None),
+    max_price: float = Query(None, gt=0),
+    min_review_score: float = Query(None, ge=0, le=10),
+    synthesize: bool = Query(True, description="Write the plan with one Gemini call; false returns the template")
+):
+    """
+    Build a full travel plan with at most one LLM call.
+    
+    Flights, hotels, attractions and precomputed advice are fetched
+    concurrently, then a single Gemini call writes the plan from that data.
+    
+    Args:
+        destination: Destination city or airport code
+        flight_date: Flight date in YYYY-MM-DD format (optional, default: tomorrow)
+        checkin_date: Check-in date in YYYY-MM-DD format (optional, default: flight date)
+        checkout_date: Check-out date in YYYY-MM-DD format (optional, default: 2 days after check-in)
+        max_price: Maximum hotel price per night (optional)
+        min_review_score: Minimum hotel review score 0-10 (optional)
+        synthesize: Use Gemini to write the plan (default: true)
+    
+    Returns:
+        Plan text, the section data it was built from and the number of LLM calls
+    """
+    try:
+        # Set default dates if not provided
+        if not flight_date:
+            flight_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        if not checkin_date:
+            checkin_date = flight_date
+        if not checkout_date:
+            checkin_dt = datetime.strptime(checkin_date, "%Y-%m-%d")
+            checkout_date = (checkin_dt + timedelta(days=2)).strftime("%Y-%m-%d")
+        datetime.strptime(flight_date, "%Y-%m-%d")
+        datetime.strptime(checkout_date, "%Y-%m-%d")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e} (dates must be YYYY-MM-DD)")
+    
+    plan = single_shot_plan({
+        "destination": destination,
+        "flight_date": flight_date,
+        "checkin_date": checkin_date,
+        "checkout_date": checkout_date,
+        "max_price": max_price,
+        "min_review_score": min_review_score
+    }, synthesize=synthesize)
+    if synthesize and plan.engine != "single":
+        # Gemini failed and the template was served; retry on the next request
+        no_store(response)
+    
+    return {"destination": destination, **plan.to_dict()}
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Query
-from crewai import Crew
-from agents.tour_agent import tour_agent
-from tasks.tour_task import task_tour
+from fastapi import APIRouter, HTTPException, Query, Response
+import requests
+from crew.pool import get_crew_pool
+from tools.google_place import PlacesStatusError, search_attractions
+from tools.itinerary import build_itinerary
+from utils.responses import is_error_text, no_store
 
 router = APIRouter(prefix="/tour", tags=["Tourism"])
 
 @router.get("/")
-def get_tour(destination: str = Query(...)):
+def get_tour(response: Response, destination: str = Query(...)):
     """
     Get top tourist attractions for a destination using CrewAI agent.
     
@@ -16,19 +18,49 @@ def get_tour(destination: str = Query(...)):
     Returns:
         List of top tourist attractions with ratings and addresses
     """
-    # Create a crew with just the tour agent and task
-    tour_crew = Crew(
-        agents=[tour_agent],
-        tasks=[task_tour],
-        verbose=True
-    )
-    
-    # Execute the crew
-    result = tour_crew.kickoff(inputs={
+    # Run an isolated copy of the prebuilt tour agent crew
+    result = get_crew_pool("tour").kickoff(inputs={
         "destination": destination
     })
+    if is_error_text(result):
+        no_store(response)
     
     return {
         "destination": destination, 
         "data": str(result)
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/itinerary")
+def get_itinerary(
+    destination: str = Query(...),
+    days: int = Query(3, ge=1, le=14),
+    max_stops: int = Query(30, ge=1, le=200)
+):
+    """
+    Build a day-by-day sightseeing plan for a destination without an LLM call.
+    
+    The top attractions are split into geographic clusters (one per day) and
+    each day's stops are ordered to keep walking/driving distance short.
+    
+    Args:
+        destination: City or destination name
+        days: Number of sightseeing days (default: 3)
+        max_stops: Maximum number of attractions to include (default: 30)
+    
+    Returns:
+        Ordered stops per day with leg and total distances in km
+    """
+    try:
+        places = search_attractions(destination, top_n=max_stops)
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, PlacesStatusError):
+        raise HTTPException(status_code=503, detail="Attraction search is temporarily unavailable")
+    except requests.exceptions.RequestException as e:
+        # Only the status: the request URL in the message carries the API key
+        status = e.response.status_code if e.response is not None else "error"
+        raise HTTPException(status_code=502, detail=f"Attraction search failed upstream ({status})")
+    
+    if not places:
+        raise HTTPException(status_code=404, detail=f"No tourist attractions found for {destination}")
+    
+    return {"destination": destination, **build_itinerary(places, days)}
@@ -24,25 +24,30 @@ parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
-# Import crew setup
+# Import the memoized plan graph and the single-shot planner
 try:
-    from travel.crew.crew import travel_crew_setup
+    from travel.crew.plan_graph import plan_graph
+    from travel.crew.planner import PLAN_ENGINE, PLAN_ENGINES, single_shot_plan
 except ImportError:
-    from crew.crew import travel_crew_setup
+    from crew.plan_graph import plan_graph
+    from crew.planner import PLAN_ENGINE, PLAN_ENGINES, single_shot_plan
 
 # =========================
 # TRAVEL ASSISTANT RUNNER
 # =========================
 
-def run_travel_assistant(destination, flight_date=None, checkin_date=None, checkout_date=None):
+def run_travel_assistant(destination, flight_date=None, checkin_date=None, checkout_date=None,
+                         engine=PLAN_ENGINE):
     """
-    Run the complete travel assistant with CrewAI agents.
+    Run the complete travel assistant.
     
     Args:
         destination: Destination city or airport code
         flight_date: Flight date in YYYY-MM-DD format (default: tomorrow)
         checkin_date: Hotel check-in date in YYYY-MM-DD format (default: tomorrow)
         checkout_date: Hotel check-out date in YYYY-MM-DD format (default: 2 days after check-in)
+        engine: 'crew' (CrewAI agents per section), 'single' (one Gemini call over
+            concurrently fetched data) or 'template' (no LLM call)
     
     Returns:
         Complete travel plan with flights, hotels, attractions, and advice
@@ -63,24 +68,40 @@ def run_travel_assistant(destination, flight_date=None, checkin_date=None, check
     print(f"✈️  Flight Date: {flight_date}")
     print(f"🏨 Check-in: {checkin_date}")
     print(f"🏨 Check-out: {checkout_date}")
+    print(f"⚙️  Engine: {engine}")
     print(f"\n{'='*60}\n")
     
-    # Setup the crew
-    travel_crew = travel_crew_setup()
-    
-    # Run the crew
-    result = travel_crew.kickoff(inputs={
+    inputs = {
         "destination": destination,
         "flight_date": flight_date,
         "checkin_date": checkin_date,
-        "checkout_date": checkout_date
-    })
+        "checkout_date": checkout_date,
+        # No hotel filters in a full plan; the hotel task expects the keys
+        "max_price": "",
+        "min_review_score": ""
+    }
+    if engine not in PLAN_ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(PLAN_ENGINES)}")
+    
+    if engine == "crew":
+        # Compute the plan section by section; sections whose inputs haven't
+        # changed since an earlier plan are reused instead of rerun
+        result = plan_graph.compute(inputs)
+    else:
+        # Fetch all tool data concurrently, then at most one LLM call
+        result = single_shot_plan(inputs, synthesize=engine == "single")
     
     print(f"\n{'='*60}")
     print("✅ FINAL TRAVEL PLAN")
     print(f"{'='*60}\n")
     print(result)
-    print(f"\n{'='*60}\n")
+    print(f"\n{'='*60}")
+    if getattr(result, "reused", None):
+        print(f"♻️  Reused: {', '.join(result.reused)} | Recomputed: {', '.join(result.computed) or 'none'}")
+    if hasattr(result, "llm_calls"):
+        print(f"🧠 LLM calls: {result.llm_calls}")
+    print(f"⏱️  {result.elapsed:.1f}s")
+    print(f"{'='*60}\n")
     
     return result
 
@@ -161,12 +182,13 @@ def interactive_cli():
     print("Safe travels! 🌍✈️🏨\n")
 
 
-def batch_search(destinations):
+def batch_search(destinations, engine=PLAN_ENGINE):
     """
     Batch search for multiple destinations.
     
     Args:
         destinations: List of destination names/codes
+        engine: Planning engine passed to run_travel_assistant
     
     Returns:
         Dictionary of results for each destination
@@ -178,7 +200,7 @@ def batch_search(destinations):
     for i, dest in enumerate(destinations, 1):
         print(f"\n[{i}/{len(destinations)}] Processing {dest}...")
         try:
-            results[dest] = run_travel_assistant(dest)
+            results[dest] = run_travel_assistant(dest, engine=engine)
         except Exception as e:
             print(f"❌ Error processing {dest}: {e}")
             results[dest] = None
@@ -186,6 +208,80 @@ def batch_search(destinations):
     return results
 
 
+# =========================
+# DESTINATION COMPARISON
+# =========================
+
+def compare_search(destinations, flight_date=None, checkin_date=None, checkout_date=None):
+    """
+    Compare destinations on hotel price/rating and flight availability.
+    
+    Uses the flight and hotel APIs directly (no agent runs).
+    
+    Args:
+        destinations: List of destination names/codes
+        flight_date: Flight date in YYYY-MM-DD format (default: tomorrow)
+        checkin_date: Hotel check-in date in YYYY-MM-DD format (default: flight date)
+        checkout_date: Hotel check-out date in YYYY-MM-DD format (default: 2 days after check-in)
+    
+    Returns:
+        Comparison dictionary, best destination first
+    """
+    try:
+        from travel.services.compare import compare_destinations, format_comparison
+    except ImportError:
+        from services.compare import compare_destinations, format_comparison
+    
+    if not flight_date:
+        flight_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    if not checkin_date:
+        checkin_date = flight_date
+    if not checkout_date:
+        checkin_dt = datetime.strptime(checkin_date, "%Y-%m-%d")
+        checkout_date = (checkin_dt + timedelta(days=2)).strftime("%Y-%m-%d")
+    
+    print(f"\n⚖️  Comparing {len(destinations)} destinations ({checkin_date} to {checkout_date})...\n")
+    comparison = compare_destinations(destinations, flight_date, checkin_date, checkout_date)
+    print(format_comparison(comparison))
+    print(f"\n⏱️  {comparison['compute_ms']:.0f} ms\n")
+    
+    return comparison
+
+
+# =========================
+# ADVICE PRECOMPUTE
+# =========================
+
+def precompute_advice_store(destinations, concurrency=4, refresh=False):
+    """
+    Generate travel advice offline and store it for instant serving.
+    
+    Args:
+        destinations: List of destination names
+        concurrency: Parallel Gemini generations (default: 4)
+        refresh: Regenerate advice that is already stored (default: False)
+    
+    Returns:
+        Dictionary of status for each destination
+    """
+    try:
+        from travel.tools.advice import precompute_advice
+        from travel.tools.advice_store import advice_store
+    except ImportError:
+        from tools.advice import precompute_advice
+        from tools.advice_store import advice_store
+    
+    print(f"\n🧠 Precomputing advice for {len(destinations)} destinations (concurrency: {concurrency})...\n")
+    results = precompute_advice(destinations, concurrency=concurrency, refresh=refresh)
+    
+    for dest, status in results.items():
+        icon = "✅" if status in ("stored", "cached") else "❌"
+        print(f"{icon} {dest}: {status}")
+    print(f"\n📦 Advice store: {advice_store.path} ({advice_store.stats()['entries']} entries)\n")
+    
+    return results
+
+
 # =========================
 # API MODE
 # =========================
@@ -218,7 +314,10 @@ def start_api_server(host="0.0.0.0", port=8000, reload=True, log_level="info"):
     print(f"   GET /hotels/     - Search hotels")
     print(f"   GET /tours/      - Get tour recommendations")
     print(f"   GET /advice/     - Get travel advice")
+    print(f"   GET /compare/    - Compare destinations")
+    print(f"   GET /plan/       - Full plan with at most one LLM call")
     print(f"   GET /health      - Health check")
+    print(f"   GET /ready       - Ready once startup warm-up finished")
     print(f"\n💡 Frontend Connection:")
     print(f"   Configure Next.js API routes to proxy to: http://localhost:{port}")
     print(f"   CORS is enabled for all origins")
@@ -285,8 +384,17 @@ Examples:
   # Custom search with dates
   python run.py --destination Dubai --flight-date 2025-12-10 --checkin 2025-12-10 --checkout 2025-12-15
   
+  # Fast plan: fetch all data concurrently, then one LLM call (or none with 'template')
+  python run.py --destination Dubai --engine single
+  
   # Batch search
   python run.py --batch Dubai Paris London Tokyo
+  
+  # Compare destinations side by side (no agents)
+  python run.py --compare Dubai Paris Rome --checkin 2025-12-10 --checkout 2025-12-15
+  
+  # Precompute travel advice into the local advice store
+  python run.py --precompute-advice Dubai Paris London Tokyo --concurrency 8
 
 Frontend Integration:
   The API server runs on http://localhost:8000 by default.
@@ -319,6 +427,14 @@ Frontend Integration:
         help='Hotel check-out date (YYYY-MM-DD format)'
     )
     
+    parser.add_argument(
+        '--engine', '-e',
+        type=str,
+        default=PLAN_ENGINE,
+        choices=list(PLAN_ENGINES),
+        help=f'Planning engine: crew (agents), single (one LLM call) or template (no LLM) (default: {PLAN_ENGINE})'
+    )
+    
     parser.add_argument(
         '--api',
         action='store_true',
@@ -359,6 +475,33 @@ Frontend Integration:
         help='Batch search for multiple destinations'
     )
     
+    parser.add_argument(
+        '--compare', '-c',
+        nargs='+',
+        metavar='DESTINATION',
+        help='Compare destinations on hotel price/rating and flights (uses --flight-date/--checkin/--checkout)'
+    )
+    
+    parser.add_argument(
+        '--precompute-advice',
+        nargs='+',
+        metavar='DESTINATION',
+        help='Generate travel advice offline into the local advice store'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=4,
+        help='Parallel generations for --precompute-advice (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='With --precompute-advice, regenerate advice that is already stored'
+    )
+    
     args = parser.parse_args()
     
     # Start API server mode
@@ -371,9 +514,19 @@ Frontend Integration:
         )
         return
     
+    # Destination comparison mode
+    if args.compare:
+        compare_search(args.compare, args.flight_date, args.checkin, args.checkout)
+        return
+    
+    # Offline advice precompute mode
+    if args.precompute_advice:
+        precompute_advice_store(args.precompute_advice, args.concurrency, args.refresh)
+        return
+    
     # Batch search mode
     if args.batch:
-        batch_search(args.batch)
+        batch_search(args.batch, engine=args.engine)
         return
     
     # Single destination search
@@ -382,7 +535,8 @@ Frontend Integration:
             args.destination,
             args.flight_date,
             args.checkin,
-            args.checkout
+            args.checkout,
+            engine=args.engine
         )
         return
     
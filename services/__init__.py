@@ -0,0 +1 @@
+"""Background and composite services for travel assistant"""
@@ -0,0 +1,177 @@
+"""
+Destination Comparison
+Fetches flight and hotel data for several destinations concurrently and
+ranks them with one vectorized weighted score (no LLM call)
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime
+
+import numpy as np
+
+from tools.check_flights import _dedupe, fetch_current_flights, flights_unavailable, search_flight_window
+from tools.check_hotels import HOTEL_TOP_K, booking_unavailable, search_hotels
+from utils.responses import public_error
+
+COMPARE_MAX_DESTINATIONS = int(os.getenv("COMPARE_MAX_DESTINATIONS", 8))
+
+# Metric -> (default weight, True if higher is better)
+COMPARE_METRICS = {
+    "hotel_price": (float(os.getenv("COMPARE_WEIGHT_PRICE", 0.35)), False),
+    "hotel_rating": (float(os.getenv("COMPARE_WEIGHT_RATING", 0.35)), True),
+    "flights": (float(os.getenv("COMPARE_WEIGHT_FLIGHTS", 0.15)), True),
+    "flight_minutes": (float(os.getenv("COMPARE_WEIGHT_DURATION", 0.15)), False),
+}
+
+
+def _minutes_between(dep_time, arr_time):
+    try:
+        dep = datetime.fromisoformat(dep_time)
+        arr = datetime.fromisoformat(arr_time)
+    except (TypeError, ValueError):
+        return None
+    minutes = (arr - dep).total_seconds() / 60
+    return minutes if minutes > 0 else None
+
+
+def flight_metrics(destination, flight_date):
+    """Flight count and median scheduled duration (minutes) for one day.
+
+    Without date filtering on the plan tier, the whole current arrivals
+    board (already cached by the window search) is used as the supply
+    signal instead, since it rarely contains flights on the requested day.
+    flights_date_filtered in the result says which one was measured.
+    """
+    window = search_flight_window(destination, flight_date, 0)
+    if window is None:
+        raise LookupError(f"unknown airport for {destination}")
+    if window["date_filtered"]:
+        flights = [f for day in window["days"].values() for f in day]
+    else:
+        flights = [r._asdict() for r in _dedupe(fetch_current_flights(window["airport"]))]
+    durations = [m for m in (_minutes_between(f["dep_time"], f["arr_time"]) for f in flights) if m]
+    return {
+        "airport": window["airport"],
+        "flights": len(flights),
+        "flight_minutes": float(np.median(durations)) if durations else None,
+        "flights_date_filtered": window["date_filtered"],
+    }
+
+
+def hotel_metrics(destination, checkin_date, checkout_date):
+    """Cheapest price and mean review score among the top-ranked hotels."""
+    dest_name, records = search_hotels(destination, checkin_date, checkout_date, top_k=HOTEL_TOP_K)
+    if dest_name is None:
+        raise LookupError(f"unknown hotel destination {destination}")
+    prices = [r.price for r in records if r.price is not None]
+    ratings = [r.review_score for r in records if r.review_score is not None]
+    return {
+        "hotel_price": min(prices) if prices else None,
+        "hotel_rating": round(float(np.mean(ratings)), 2) if ratings else None,
+    }
+
+
+def _collect(destination, flight_date, checkin_date, checkout_date):
+    """Metrics for one destination; a failing source leaves its metrics empty."""
+    row = {"destination": destination, "airport": None, "errors": []}
+    row.update({metric: None for metric in COMPARE_METRICS})
+    sources = (
+        ("flights", flights_unavailable(), lambda: flight_metrics(destination, flight_date)),
+        ("hotels", booking_unavailable(destination), lambda: hotel_metrics(destination, checkin_date, checkout_date)),
+    )
+    for name, unavailable, fetch in sources:
+        if unavailable:
+            row["errors"].append(f"{name}: temporarily unavailable")
+            continue
+        try:
+            row.update(fetch())
+        except LookupError as e:
+            # Raised by this module with the destination only
+            row["errors"].append(f"{name}: {e}")
+        except Exception as e:
+            print(f"[DEBUG] Compare: {name} for {destination!r} failed: {e}")
+            row["errors"].append(f"{name}: upstream error ({public_error(e)})")
+    return row
+
+
+def score_matrix(values, weights, higher_is_better):
+    """Weighted score per row of a (destinations x metrics) matrix.
+
+    Each column is min-max normalized to [0, 1] (flipped where lower is
+    better); missing values score 0 and constant columns score 1.
+    """
+    values = np.asarray(values, dtype=float)
+    low = np.nanmin(np.where(np.isnan(values), np.inf, values), axis=0)
+    high = np.nanmax(np.where(np.isnan(values), -np.inf, values), axis=0)
+    span = high - low
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normalized = np.where(span > 0, (values - low) / span, 1.0)
+    normalized = np.where(higher_is_better, normalized, 1.0 - np.where(span > 0, normalized, 0.0))
+    normalized = np.where(np.isnan(values), 0.0, normalized)
+    weights = np.asarray(weights, dtype=float)
+    total = weights.sum()
+    return normalized @ (weights / total if total > 0 else weights)
+
+
+def compare_destinations(destinations, flight_date, checkin_date, checkout_date, weights=None):
+    """Rank destinations by hotel price/rating and flight supply/duration.
+
+    Args:
+        destinations: Destination names (at most COMPARE_MAX_DESTINATIONS)
+        flight_date: Flight date in YYYY-MM-DD format
+        checkin_date: Check-in date in YYYY-MM-DD format
+        checkout_date: Check-out date in YYYY-MM-DD format
+        weights: Optional {metric: weight} overrides
+
+    Returns:
+        Dict with the weights used and one row per destination, best first
+    """
+    start = time.perf_counter()
+    destinations = list(dict.fromkeys(d.strip() for d in destinations if d.strip()))[:COMPARE_MAX_DESTINATIONS]
+    metrics = list(COMPARE_METRICS)
+    weight_values = [(weights or {}).get(m, COMPARE_METRICS[m][0]) for m in metrics]
+    higher = np.array([COMPARE_METRICS[m][1] for m in metrics])
+
+    with ThreadPoolExecutor(max_workers=max(len(destinations), 1)) as pool:
+        futures = [
+            pool.submit(copy_context().run, _collect, d, flight_date, checkin_date, checkout_date)
+            for d in destinations
+        ]
+        rows = [future.result() for future in futures]
+
+    if rows:
+        matrix = [[np.nan if row[m] is None else row[m] for m in metrics] for row in rows]
+        scores = score_matrix(matrix, weight_values, higher)
+        for row, score in zip(rows, scores):
+            row["score"] = round(float(score), 4)
+        rows.sort(key=lambda row: row["score"], reverse=True)
+        for rank, row in enumerate(rows, 1):
+            row["rank"] = rank
+
+    return {
+        "flight_date": flight_date,
+        "checkin_date": checkin_date,
+        "checkout_date": checkout_date,
+        "weights": dict(zip(metrics, weight_values)),
+        "results": rows,
+        "compute_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def format_comparison(comparison):
+    """Plain-text comparison table for the CLI."""
+    header = f"{'#':>2}  {'Destination':<18}{'Score':>7}{'Hotel $':>10}{'Rating':>8}{'Flights':>9}{'Minutes':>9}"
+    lines = [header, "-" * len(header)]
+    for row in comparison["results"]:
+        cell = lambda value, fmt: format(value, fmt) if value is not None else "-"
+        lines.append(
+            f"{row['rank']:>2}  {row['destination'][:17]:<18}{row['score']:>7.3f}"
+            f"{cell(row['hotel_price'], '.0f'):>10}{cell(row['hotel_rating'], '.1f'):>8}"
+            f"{cell(row['flights'], 'd'):>9}{cell(row['flight_minutes'], '.0f'):>9}"
+        )
+        for error in row["errors"]:
+            lines.append(f"    ⚠️  {error}")
+    return "\n".join(lines)
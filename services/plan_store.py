@@ -0,0 +1,266 @@
+"""
+Plan Store
+Persistent SQLite (WAL) history of plan sections and structured search
+results, written off the request path and indexed for history queries and
+read-through reuse
+"""
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from tools.advice_store import PACKAGE_DIR
+from utils.normalize import canonical_destination
+from utils.responses import is_error_text
+
+# Same package-relative default as the advice store, so the CLI and the API
+# server share one history whatever directory they are started from
+PLAN_STORE_PATH = os.getenv("PLAN_STORE_PATH", os.path.join(PACKAGE_DIR, "data", "plans.sqlite3"))
+# Pending writes held in memory; beyond this, writes are dropped rather
+# than slowing requests down
+PLAN_STORE_QUEUE_SIZE = int(os.getenv("PLAN_STORE_QUEUE_SIZE", 10000))
+PLAN_STORE_BATCH_SIZE = int(os.getenv("PLAN_STORE_BATCH_SIZE", 200))
+PLAN_STORE_PAGE_SIZE = int(os.getenv("PLAN_STORE_PAGE_SIZE", 20))
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS plan_sections ("
+    " id INTEGER PRIMARY KEY,"
+    " destination_key TEXT NOT NULL,"
+    " destination TEXT NOT NULL,"
+    " section TEXT NOT NULL,"
+    " inputs_key TEXT NOT NULL,"
+    " flight_date TEXT,"
+    " checkin_date TEXT,"
+    " checkout_date TEXT,"
+    " content TEXT,"
+    " data TEXT,"
+    " min_price REAL,"
+    " created_at REAL NOT NULL"
+    ")",
+    "CREATE INDEX IF NOT EXISTS idx_sections_dest_time ON plan_sections (destination_key, section, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_sections_section_time ON plan_sections (section, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_sections_dest_dates ON plan_sections (destination_key, checkin_date, checkout_date)",
+    "CREATE INDEX IF NOT EXISTS idx_sections_inputs ON plan_sections (section, inputs_key, created_at)",
+)
+
+SUMMARY_COLUMNS = "id, destination, section, flight_date, checkin_date, checkout_date, min_price, created_at"
+
+
+def inputs_key(inputs, fields):
+    """Stable lookup key from the given input fields (destination canonicalized)."""
+    values = []
+    for name in fields:
+        value = inputs.get(name)
+        if name == "destination":
+            value = canonical_destination(value)
+        values.append("" if value is None else str(value).strip())
+    return "|".join(values)
+
+
+class PlanStore:
+    """Append-only store of section results.
+
+    record() only enqueues; a single writer thread drains the queue in
+    batched transactions. Reads use one connection per thread, which WAL
+    mode lets run alongside the writer.
+    """
+
+    def __init__(self, path=PLAN_STORE_PATH, queue_size=PLAN_STORE_QUEUE_SIZE):
+        self.path = path
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._writer = None
+        self._start_lock = threading.Lock()
+        self._initialized = False
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.read_hits = 0
+        self.read_misses = 0
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.row_factory = sqlite3.Row
+        return conn
+
+    # ----- writes -----
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._start_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="plan-store-writer", daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < PLAN_STORE_BATCH_SIZE:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO plan_sections (destination_key, destination, section, inputs_key,"
+                        " flight_date, checkin_date, checkout_date, content, data, min_price, created_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                self.written += len(rows)
+            except sqlite3.Error as e:
+                self.errors += 1
+                print(f"[DEBUG] Plan store write failed: {e}")
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    def record(self, section, inputs, key_fields, content=None, data=None, min_price=None):
+        """Queue one result for storage; never blocks the caller.
+
+        Args:
+            section: Section name, e.g. 'hotels' or 'hotel_search'
+            inputs: Dict with destination and any of flight_date,
+                checkin_date, checkout_date
+            key_fields: Input names that identify this result for read-through
+            content: Text output, if any
+            data: JSON-serializable structured output, if any
+            min_price: Cheapest price in the result, for price history
+        """
+        destination = inputs.get("destination") or ""
+        row = (
+            canonical_destination(destination), destination, section, inputs_key(inputs, key_fields),
+            inputs.get("flight_date") or None, inputs.get("checkin_date") or None,
+            inputs.get("checkout_date") or None, content,
+            json.dumps(data, default=str) if data is not None else None,
+            min_price, time.time()
+        )
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=5.0):
+        """Wait (up to timeout seconds) for queued writes to reach disk."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    # ----- reads -----
+
+    def latest(self, section, inputs, key_fields, max_age):
+        """Most recent (content, age in seconds) for the same section and
+        inputs, or None if there is none newer than max_age seconds.
+
+        Error fallbacks recorded before they were filtered out count as
+        missing, so they are recomputed rather than reused."""
+        row = self._reader().execute(
+            "SELECT content, created_at FROM plan_sections WHERE section = ? AND inputs_key = ? AND created_at >= ?"
+            " ORDER BY created_at DESC LIMIT 1",
+            (section, inputs_key(inputs, key_fields), time.time() - max_age)
+        ).fetchone()
+        if row is None or row["content"] is None or is_error_text(row["content"]):
+            self.read_misses += 1
+            return None
+        self.read_hits += 1
+        return row["content"], time.time() - row["created_at"]
+
+    def history(self, destination=None, section=None, since=None, limit=PLAN_STORE_PAGE_SIZE,
+                cursor=None, include_content=False):
+        """One page of results, newest first.
+
+        Args:
+            destination: Only this destination (canonicalized)
+            section: Only this section
+            since: Only results created at or after this UNIX time
+            limit: Page size
+            cursor: next_cursor from the previous page
+            include_content: Also return content and structured data
+
+        Returns:
+            Dict with items and next_cursor (None on the last page)
+        """
+        clauses, params = [], []
+        if destination:
+            clauses.append("destination_key = ?")
+            params.append(canonical_destination(destination))
+        if section:
+            clauses.append("section = ?")
+            params.append(section)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if cursor:
+            created_at, row_id = cursor.split(":", 1)
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend([float(created_at), int(row_id)])
+
+        columns = SUMMARY_COLUMNS + (", content, data" if include_content else "")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT {columns} FROM plan_sections{where} ORDER BY created_at DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        items = [dict(row) for row in rows[:limit]]
+        for item in items:
+            if item.get("data"):
+                item["data"] = json.loads(item["data"])
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = f"{last['created_at']!r}:{last['id']}"
+        return {"items": items, "next_cursor": next_cursor}
+
+    def price_history(self, destination, days=7, section="hotel_search"):
+        """Daily min/avg/max of the cheapest price found for a destination."""
+        rows = self._reader().execute(
+            "SELECT date(created_at, 'unixepoch') AS day, COUNT(*) AS searches,"
+            " MIN(min_price) AS min_price, AVG(min_price) AS avg_price, MAX(min_price) AS max_price"
+            " FROM plan_sections"
+            " WHERE destination_key = ? AND section = ? AND created_at >= ? AND min_price IS NOT NULL"
+            " GROUP BY day ORDER BY day",
+            (canonical_destination(destination), section, time.time() - days * 86400)
+        ).fetchall()
+        return [
+            {**dict(row), "avg_price": round(row["avg_price"], 2)} for row in rows
+        ]
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "read_hits": self.read_hits,
+            "read_misses": self.read_misses,
+        }
+
+
+plan_store = PlanStore()
+# Don't lose queued results when a CLI run exits
+atexit.register(plan_store.flush)
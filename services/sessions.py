@@ -0,0 +1,267 @@
+"""
+Conversation Sessions
+Per-connection travel context (destination, dates, fetched records, prior
+answers) so follow-up turns re-rank or re-use data instead of starting over
+"""
+
+import os
+import re
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+
+from tools.advice import get_advice
+from tools.check_flights import (
+    fetch_current_flights, flights_unavailable, format_current_flights, format_flight_window,
+    search_flight_window, synthetic_flights
+)
+from tools.check_hotels import (
+    HOTEL_PAGES, HOTEL_TOP_K, _page_records, booking_unavailable, format_hotels, nightly_price, rank_hotels,
+    resolve_destination, stay_nights, synthetic_hotels
+)
+from tools.gemini import gemini_stream
+from tools.google_place import TOUR_TOP_N, format_attractions, search_attractions
+from tools.itinerary import build_itinerary
+from utils.cache import TTLCache
+from utils.memory import estimate_size
+from utils.normalize import canonical_destination
+
+# Sessions expire after this long without a message (seconds)
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", 15 * 60))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", 500))
+# Context kept per session before older answers and records are dropped
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", 1024 * 1024))
+SESSION_MAX_ANSWERS = int(os.getenv("SESSION_MAX_ANSWERS", 10))
+# "Cheaper" keeps hotels below this fraction of the median price shown so far
+SESSION_CHEAPER_FACTOR = float(os.getenv("SESSION_CHEAPER_FACTOR", 0.85))
+
+_sessions = TTLCache("sessions", ttl=SESSION_IDLE_TIMEOUT, max_entries=SESSION_MAX_COUNT)
+
+# Follow-up intents, matched against the lowercased message
+INTENTS = {
+    "later": re.compile(r"\b(day|night) after\b|\bnext day\b|\bone day later\b"),
+    "earlier": re.compile(r"\b(day|night) before\b|\bprevious day\b|\bone day earlier\b"),
+    "cheaper": re.compile(r"\bcheaper\b|\bbudget\b|\bless expensive\b|\blower price"),
+    "better": re.compile(r"\bbetter\b|\bhigher[- ]rated\b|\bbest[- ]rated\b|\bnicer\b"),
+    "hotels": re.compile(r"\bhotels?\b|\bstay\b|\baccommodation"),
+    "flights": re.compile(r"\bflights?\b|\bfly\b|\bairlines?\b"),
+    "tour": re.compile(r"\battractions?\b|\bsights?\b|\btour\b|\bthings to do\b|\bvisit\b"),
+    "itinerary": re.compile(r"\bitinerary\b|\b(\d+)[- ]days?\b"),
+    "advice": re.compile(r"\badvice\b|\btips?\b|\bsafety\b|\bcultur"),
+}
+
+
+def _shift(date, days):
+    return (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+class Session:
+    """Context for one conversation about one destination."""
+
+    def __init__(self, destination, flight_date=None, checkin_date=None, checkout_date=None):
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        self.id = uuid.uuid4().hex
+        self.destination = destination
+        self.dest_key = canonical_destination(destination)
+        self.inputs = {
+            "flight_date": flight_date or tomorrow,
+            "checkin_date": checkin_date or flight_date or tomorrow,
+            "checkout_date": checkout_date or _shift(checkin_date or flight_date or tomorrow, 2),
+            "max_price": None,
+            "min_review_score": None,
+        }
+        for field in ("flight_date", "checkin_date", "checkout_date"):
+            datetime.strptime(self.inputs[field], "%Y-%m-%d")  # ValueError on bad dates
+        # Fetched records, each tagged with the inputs they were fetched for
+        self.hotel_pool = None      # (checkin, checkout, dest_name, [HotelRecord])
+        self.flight_window = None   # (flight_date, window dict)
+        self.attractions = None     # [PlaceRecord]
+        self.answers = deque(maxlen=SESSION_MAX_ANSWERS)
+        self.turns = 0
+        self.created_at = time.time()
+
+    # ----- memory cap -----
+
+    def size(self):
+        return estimate_size(self.__dict__)
+
+    def enforce_cap(self, max_bytes=SESSION_MAX_BYTES):
+        """Drop prior answers, then fetched records, until under max_bytes."""
+        while self.answers and self.size() > max_bytes:
+            self.answers.popleft()
+        for attribute in ("attractions", "flight_window", "hotel_pool"):
+            if self.size() <= max_bytes:
+                break
+            setattr(self, attribute, None)
+
+    # ----- sections -----
+
+    def _hotels_fetched(self):
+        pool = self.hotel_pool
+        return pool is not None and pool[:2] == (self.inputs["checkin_date"], self.inputs["checkout_date"])
+
+    def hotels(self):
+        checkin, checkout = self.inputs["checkin_date"], self.inputs["checkout_date"]
+        if not self._hotels_fetched():
+            if booking_unavailable(self.destination):
+                return synthetic_hotels(self.destination, checkin, checkout)
+            dest_id, dest_name = resolve_destination(self.destination)
+            if not dest_id:
+                return synthetic_hotels(self.destination, checkin, checkout)
+            records = list(_page_records(dest_id, checkin, checkout, HOTEL_PAGES))
+            self.hotel_pool = (checkin, checkout, dest_name, records)
+
+        _, _, dest_name, records = self.hotel_pool
+        ranked = rank_hotels(records, self.inputs["max_price"], self.inputs["min_review_score"], HOTEL_TOP_K,
+                             stay_nights(checkin, checkout))
+        if not ranked:
+            return f"No hotels in {dest_name} match max price {self.inputs['max_price'] or 'any'} per night and min review score {self.inputs['min_review_score'] or 'any'} for {checkin} to {checkout}."
+        return format_hotels(dest_name, ranked, checkin, checkout)
+
+    def _flights_fetched(self):
+        return self.flight_window is not None and self.flight_window[0] == self.inputs["flight_date"]
+
+    def flights(self):
+        flight_date = self.inputs["flight_date"]
+        if not self._flights_fetched():
+            if flights_unavailable():
+                return synthetic_flights(self.destination, flight_date)
+            window = search_flight_window(self.destination, flight_date, 0)
+            if window is None:
+                return f"Could not find airport for destination: {self.destination}."
+            self.flight_window = (flight_date, window)
+        window = self.flight_window[1]
+        if not window["date_filtered"]:
+            # Free tier: show the whole cached arrivals board rather than
+            # the (usually empty) slice departing on flight_date
+            records = fetch_current_flights(window["airport"])
+            if records:
+                return format_current_flights(self.destination, window["airport"], window["airport_name"],
+                                              records, flight_date)
+            return synthetic_flights(self.destination, flight_date, window["airport"])
+        if not any(window["days"].values()):
+            return synthetic_flights(self.destination, flight_date, window["airport"])
+        return format_flight_window(window)
+
+    def _places(self):
+        if self.attractions is None:
+            self.attractions = search_attractions(self.destination)
+        return self.attractions
+
+    def tour(self):
+        return format_attractions(self.destination, self._places()[:TOUR_TOP_N])
+
+    def itinerary(self, days):
+        plan = build_itinerary(self._places(), days)
+        lines = [f"{days}-day itinerary for {self.destination} ({plan['total_distance_km']} km total):"]
+        for day in plan["days"]:
+            stops = " → ".join(stop["name"] for stop in day["stops"])
+            lines.append(f"Day {day['day']} ({day['distance_km']} km): {stops}")
+        return "\n".join(lines)
+
+    def advice(self):
+        return get_advice(self.destination)
+
+    def chat(self, text):
+        """Free-form follow-up answered by Gemini with the session context, streamed."""
+        history = "\n".join(f"User: {q}\nAssistant: {a[:500]}" for q, a in self.answers)
+        prompt = (
+            f"You are a travel assistant helping plan a trip to {self.destination} "
+            f"(flight {self.inputs['flight_date']}, hotel {self.inputs['checkin_date']} to "
+            f"{self.inputs['checkout_date']}).\n{history}\nUser: {text}\nAssistant:"
+        )
+        return gemini_stream(prompt)
+
+    # ----- turns -----
+
+    def plan_turn(self, text):
+        """Update the context for a follow-up and list the sections to answer with.
+
+        Returns:
+            List of (section, callable, reused) where callable returns a
+            string or an iterator of string chunks, and reused says whether
+            the answer comes from records already in the session
+        """
+        self.turns += 1
+        message = (text or "").lower()
+        matched = {name for name, pattern in INTENTS.items() if pattern.search(message)}
+        sections = []
+
+        shift = 1 if "later" in matched else -1 if "earlier" in matched else 0
+        if shift:
+            for field in ("flight_date", "checkin_date", "checkout_date"):
+                self.inputs[field] = _shift(self.inputs[field], shift)
+            if not matched & {"hotels", "flights"}:
+                matched |= {"hotels", "flights"}
+
+        if "cheaper" in matched:
+            nights = stay_nights(self.inputs["checkin_date"], self.inputs["checkout_date"])
+            shown = [nightly_price(r, nights) for r in rank_hotels(
+                self.hotel_pool[3], self.inputs["max_price"], self.inputs["min_review_score"], HOTEL_TOP_K, nights
+            ) if r.price is not None] if self._hotels_fetched() else []
+            if shown:
+                shown.sort()
+                self.inputs["max_price"] = round(shown[len(shown) // 2] * SESSION_CHEAPER_FACTOR, 2)
+            matched.add("hotels")
+        if "better" in matched:
+            self.inputs["min_review_score"] = min((self.inputs["min_review_score"] or 7.5) + 0.5, 9.5)
+            matched.add("hotels")
+
+        if "hotels" in matched:
+            sections.append(("hotels", self.hotels, self._hotels_fetched()))
+        if "flights" in matched:
+            sections.append(("flights", self.flights, self._flights_fetched()))
+        if "itinerary" in matched:
+            days = re.search(r"(\d+)[- ]days?", message)
+            days = max(1, min(int(days.group(1)), 14)) if days else 3
+            sections.append(("itinerary", lambda: self.itinerary(days), self.attractions is not None))
+        elif "tour" in matched:
+            sections.append(("tour", self.tour, self.attractions is not None))
+        if "advice" in matched:
+            sections.append(("advice", self.advice, False))
+
+        if not sections:
+            sections.append(("chat", lambda: self.chat(text), False))
+        return sections
+
+    def opening_sections(self):
+        """Sections for the first answer of a new session."""
+        return [
+            ("flights", self.flights, False),
+            ("hotels", self.hotels, False),
+            ("tour", self.tour, False),
+            ("advice", self.advice, False),
+        ]
+
+    def remember(self, text, answer):
+        self.answers.append((text, answer))
+        self.enforce_cap()
+
+    def describe(self):
+        return {
+            "session_id": self.id,
+            "destination": self.destination,
+            "inputs": dict(self.inputs),
+            "turns": self.turns,
+        }
+
+
+def start_session(destination, flight_date=None, checkin_date=None, checkout_date=None):
+    session = Session(destination, flight_date, checkin_date, checkout_date)
+    _sessions.set(session.id, session)
+    return session
+
+
+def get_session(session_id):
+    """A live session by id, or None if unknown or idle for too long."""
+    return _sessions.get(session_id) if session_id else None
+
+
+def touch_session(session):
+    """Restart the idle timer (and re-account the session's size)."""
+    _sessions.set(session.id, session)
+
+
+def end_session(session_id):
+    _sessions.delete(session_id)
@@ -0,0 +1,210 @@
+"""
+Cache Warmer
+Background scheduler that refreshes flight, hotel, tour and advice data for
+the most requested destinations before their caches expire
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from tools.advice import generate_advice
+from tools.advice_store import advice_store
+from tools.check_flights import (
+    _airports, _flight_boards, fetch_current_flights, flights_unavailable, resolve_airport
+)
+from tools.check_hotels import (
+    HOTEL_PAGES, _destinations, _hotel_pages, booking_unavailable, fetch_hotel_page, resolve_destination
+)
+from tools.google_place import ATTRACTION_CATEGORIES, TOUR_MAX_PAGES, _attractions, fetch_category
+from utils.normalize import canonical_destination
+from utils.popularity import destination_popularity
+
+WARMER_ENABLED = os.getenv("WARMER_ENABLED", "1") not in ("0", "false", "no")
+WARMER_INTERVAL = float(os.getenv("WARMER_INTERVAL", 60))       # seconds between cycles
+WARMER_TOP_N = int(os.getenv("WARMER_TOP_N", 20))               # destinations kept warm
+WARMER_MIN_SCORE = float(os.getenv("WARMER_MIN_SCORE", 2.0))    # decayed requests to count as hot
+# Upstream calls (API requests + Gemini generations) allowed per cycle
+WARMER_UPSTREAM_BUDGET = int(os.getenv("WARMER_UPSTREAM_BUDGET", 40))
+# Refresh entries expiring within this many seconds (default: two cycles)
+WARMER_LEAD = float(os.getenv("WARMER_LEAD", 2 * WARMER_INTERVAL))
+
+
+def _due(cache, key, lead):
+    """True if key is missing from cache or expires within lead seconds."""
+    expires_in = cache.expires_in(key)
+    return expires_in is None or expires_in < lead
+
+
+def _lookup_cached(cache, destination):
+    """True if a day-long lookup cache (airport, dest_id) still holds destination."""
+    return cache.expires_in(canonical_destination(destination)) is not None
+
+
+def _default_stay():
+    """Check-in/check-out the /hotels/ route uses when no dates are given."""
+    checkin = datetime.now() + timedelta(days=1)
+    return checkin.strftime("%Y-%m-%d"), (checkin + timedelta(days=2)).strftime("%Y-%m-%d")
+
+
+class CacheWarmer:
+    """Refreshes tool caches for hot destinations on a fixed interval.
+
+    Each cycle walks the hottest destinations first and plans refresh jobs
+    (with their upstream-call cost) for every section that is missing or
+    about to expire, stopping once the cycle's budget is spent.
+    """
+
+    def __init__(self, interval=WARMER_INTERVAL, top_n=WARMER_TOP_N, budget=WARMER_UPSTREAM_BUDGET,
+                 lead=WARMER_LEAD, min_score=WARMER_MIN_SCORE):
+        self.interval = interval
+        self.top_n = top_n
+        self.budget = budget
+        self.lead = lead
+        self.min_score = min_score
+        self._stop = threading.Event()
+        self._thread = None
+        self.cycles = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.skipped_for_budget = 0
+        self.last_cycle = None
+
+    # ----- job planning -----
+    # Planning only reads caches. When a destination's airport or dest_id
+    # lookup has expired, the lookup becomes part of the refresh job and
+    # its upstream call is charged against the budget with it.
+
+    def _flight_jobs(self, destination):
+        is_iata = len(destination) == 3 and destination.isalpha()
+        if not is_iata and not _lookup_cached(_airports, destination):
+            if flights_unavailable():
+                return []
+
+            def lookup_and_refresh():
+                arr_iata, _ = resolve_airport(destination)
+                if arr_iata and not flights_unavailable(arr_iata):
+                    fetch_current_flights(arr_iata, refresh=True)
+            return [("flights", 2, lookup_and_refresh)]
+
+        arr_iata, _ = resolve_airport(destination)
+        if not arr_iata or flights_unavailable(arr_iata):
+            return []
+        if _due(_flight_boards, (arr_iata, None), self.lead):
+            return [("flights", 1, lambda: fetch_current_flights(arr_iata, refresh=True))]
+        return []
+
+    def _hotel_jobs(self, destination):
+        if booking_unavailable(destination):
+            return []
+        checkin, checkout = _default_stay()
+        if not _lookup_cached(_destinations, destination):
+            def lookup_and_refresh():
+                dest_id, _ = resolve_destination(destination)
+                if dest_id:
+                    for page in range(1, HOTEL_PAGES + 1):
+                        fetch_hotel_page(dest_id, checkin, checkout, page, refresh=True)
+            return [("hotels", 1 + HOTEL_PAGES, lookup_and_refresh)]
+
+        dest_id, _ = resolve_destination(destination)
+        if not dest_id:
+            return []
+        return [
+            ("hotels", 1, lambda page=page: fetch_hotel_page(dest_id, checkin, checkout, page, refresh=True))
+            for page in range(1, HOTEL_PAGES + 1)
+            if _due(_hotel_pages, (dest_id, checkin, checkout, page), self.lead)
+        ]
+
+    def _tour_jobs(self, destination):
+        dest_key = canonical_destination(destination)
+        return [
+            ("tour", TOUR_MAX_PAGES, lambda category=category: fetch_category(destination, category, refresh=True))
+            for category in ATTRACTION_CATEGORIES
+            if _due(_attractions, (dest_key, category), self.lead)
+        ]
+
+    def _advice_jobs(self, destination):
+        age = advice_store.age(destination)
+        if age is not None and age < advice_store.max_age - self.lead:
+            return []
+
+        def refresh():
+            advice = generate_advice(destination)
+            if advice.startswith("[Gemini Error]"):
+                raise RuntimeError(advice)
+            advice_store.put(destination, advice)
+        return [("advice", 1, refresh)]
+
+    def plan(self, destination):
+        """Refresh jobs (section, cost, callable) for one destination."""
+        jobs = []
+        for planner in (self._advice_jobs, self._tour_jobs, self._hotel_jobs, self._flight_jobs):
+            try:
+                jobs.extend(planner(destination))
+            except Exception as e:
+                print(f"[DEBUG] Warmer: planning {planner.__name__} for {destination!r} failed: {e}")
+        return jobs
+
+    # ----- scheduling -----
+
+    def run_cycle(self):
+        """Refresh due entries for the hottest destinations within the budget.
+
+        Returns:
+            Number of upstream calls spent
+        """
+        spent = 0
+        hot = destination_popularity.top(self.top_n, self.min_score)
+        for destination, _ in hot:
+            for section, cost, job in self.plan(destination):
+                if spent + cost > self.budget:
+                    self.skipped_for_budget += 1
+                    continue
+                spent += cost
+                try:
+                    job()
+                    self.refreshed += 1
+                except Exception as e:
+                    self.failed += 1
+                    print(f"[DEBUG] Warmer: refreshing {section} for {destination!r} failed: {e}")
+            if spent >= self.budget:
+                break
+        self.cycles += 1
+        self.last_cycle = {"at": time.time(), "destinations": len(hot), "spent": spent}
+        return spent
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_cycle()
+            except Exception as e:
+                print(f"[DEBUG] Warmer cycle failed: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self):
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval": self.interval,
+            "budget": self.budget,
+            "cycles": self.cycles,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "skipped_for_budget": self.skipped_for_budget,
+            "last_cycle": self.last_cycle,
+            "hot_destinations": destination_popularity.top(self.top_n, self.min_score),
+        }
+
+
+cache_warmer = CacheWarmer()
@@ -0,0 +1,204 @@
+"""
+Startup Warm-up
+Pays the one-off costs of a fresh worker (building crews, creating the
+Gemini client, opening upstream connections, loading local indexes and,
+optionally, one synthetic request per router) before it reports ready
+"""
+
+import asyncio
+import os
+import time
+from urllib.parse import urlencode
+
+from starlette.concurrency import run_in_threadpool
+
+from crew.pool import crew_pools
+from services.plan_store import plan_store
+from tools.advice_store import advice_store
+from tools.check_flights import AVIATIONSTACK_URL
+from tools.check_hotels import BOOKING_URL
+from tools.gemini import warm_gemini
+from tools.google_place import TEXT_SEARCH_URL
+from tools.itinerary import build_itinerary
+from utils.http_client import preconnect
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") not in ("0", "false", "False")
+# Ready copies parked in each crew pool before serving
+WARMUP_CREW_COPIES = int(os.getenv("WARMUP_CREW_COPIES", 1))
+WARMUP_PRECONNECT = os.getenv("WARMUP_PRECONNECT", "1") not in ("0", "false", "False")
+# Synthetic requests call real upstreams (and may call Gemini), so they are opt-in
+WARMUP_SYNTHETIC = os.getenv("WARMUP_SYNTHETIC", "0") not in ("0", "false", "False")
+WARMUP_DESTINATION = os.getenv("WARMUP_DESTINATION", "Dubai")
+# Deadline for each synthetic request (seconds, via X-Request-Timeout)
+WARMUP_REQUEST_TIMEOUT = float(os.getenv("WARMUP_REQUEST_TIMEOUT", 20))
+
+# One cheap request per router; /plan skips the LLM synthesis
+SYNTHETIC_REQUESTS = (
+    ("/flights/", {}),
+    ("/hotels/", {}),
+    ("/tour/", {}),
+    ("/advice/", {}),
+    ("/plan/", {"synthesize": "false"}),
+)
+
+
+def warm_crews():
+    for pool in crew_pools.values():
+        pool.prewarm(WARMUP_CREW_COPIES)
+
+
+def warm_connections():
+    if WARMUP_PRECONNECT:
+        preconnect([AVIATIONSTACK_URL, BOOKING_URL, TEXT_SEARCH_URL])
+
+
+def warm_indexes():
+    advice_store.load()
+    plan_store.history(WARMUP_DESTINATION, limit=1)
+    # First numpy call on each code path is much slower than the rest
+    build_itinerary([
+        {"name": "a", "lat": 25.19, "lng": 55.27},
+        {"name": "b", "lat": 25.14, "lng": 55.18},
+        {"name": "c", "lat": 25.26, "lng": 55.30},
+        {"name": "d", "lat": 25.08, "lng": 55.14},
+    ], 2)
+
+
+STEPS = (
+    ("crew_pools", warm_crews),
+    ("gemini", warm_gemini),
+    ("connections", warm_connections),
+    ("indexes", warm_indexes),
+)
+
+
+async def asgi_get(app, path, params, headers=()):
+    """Run one GET through the full ASGI app in-process and return its status."""
+    done = asyncio.Event()
+    sent = []
+
+    async def receive():
+        if not sent:
+            sent.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    status = {}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            done.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(params).encode(),
+        "headers": [(b"host", b"warmup")] + [(k.encode(), v.encode()) for k, v in headers],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+    }
+    try:
+        await app(scope, receive, send)
+    finally:
+        done.set()
+    return status.get("code")
+
+
+class Warmup:
+    """Runs the warm-up steps once and tracks whether the worker is ready.
+
+    Steps are best effort: a failing step is recorded but doesn't keep the
+    worker out of rotation, since a cold dependency is still better than
+    none.
+    """
+
+    def __init__(self):
+        self.state = "pending"
+        self.steps = {}
+        self.started_at = None
+        self.finished_at = None
+        self._task = None
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def _record(self, name, start, error=None, **extra):
+        self.steps[name] = {
+            "ok": error is None,
+            "ms": round((time.perf_counter() - start) * 1000, 1),
+            **({"error": error} if error else {}),
+            **extra,
+        }
+
+    def _run_step(self, name, step):
+        start = time.perf_counter()
+        try:
+            step()
+            self._record(name, start)
+        except Exception as e:
+            print(f"[DEBUG] Warm-up step {name} failed: {e}")
+            self._record(name, start, str(e))
+
+    async def run(self, app=None, synthetic=WARMUP_SYNTHETIC):
+        """Run every step, then mark the worker ready.
+
+        Args:
+            app: ASGI app for synthetic requests
+            synthetic: Send one request per router through the app
+        """
+        self.state = "warming"
+        self.started_at = time.time()
+        for name, step in STEPS:
+            await run_in_threadpool(self._run_step, name, step)
+
+        if synthetic and app is not None:
+            headers = (("x-warmup", "1"), ("x-request-timeout", str(WARMUP_REQUEST_TIMEOUT)))
+            for path, params in SYNTHETIC_REQUESTS:
+                start = time.perf_counter()
+                try:
+                    code = await asgi_get(app, path, {"destination": WARMUP_DESTINATION, **params}, headers)
+                    self._record(f"request {path}", start, None if code and code < 500 else f"status {code}", status=code)
+                except Exception as e:
+                    self._record(f"request {path}", start, str(e))
+
+        self.finished_at = time.time()
+        self.state = "ready"
+        print(f"[DEBUG] Warm-up finished in {self.finished_at - self.started_at:.1f}s")
+
+    def start(self, app=None):
+        """Run the warm-up as a background task on the running event loop."""
+        self._task = asyncio.create_task(self.run(app))
+        return self._task
+
+    def skip(self):
+        """Mark ready without warming (warm-up disabled)."""
+        self.state = "ready"
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "duration_s": round(self.finished_at - self.started_at, 2)
+            if self.finished_at and self.started_at else None,
+            "steps": self.steps,
+        }
+
+
+warmup = Warmup()
@@ -8,7 +8,9 @@ task_hotels = Task(
         "Find hotel recommendations in {destination} for check-in on {checkin_date} "
         "and check-out on {checkout_date}. "
         "Use the check_hotels tool with destination='{destination}', "
-        "checkin_date='{checkin_date}', and checkout_date='{checkout_date}'. "
+        "checkin_date='{checkin_date}', checkout_date='{checkout_date}', "
+        "max_price='{max_price}' and min_review_score='{min_review_score}' "
+        "(an empty value means no limit). "
         "Include ratings, prices, and amenities for each hotel."
     ),
     expected_output=(
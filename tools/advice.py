@@ -1,10 +1,55 @@
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from crewai.tools import tool
+from tools.advice_store import advice_store
 from tools.gemini import gemini_generate
 
+def generate_advice(destination: str):
+    """Live Gemini generation of travel advice (no store lookup)."""
+    prompt = f"Give 3 important travel safety and cultural tips for visiting {destination}."
+    return gemini_generate(prompt)
+
+def get_advice(destination: str):
+    """Advice from the local store, falling back to live generation.
+
+    Live results are written back so the next request is served locally.
+    """
+    advice = advice_store.get(destination)
+    if advice is not None:
+        return advice
+    advice = generate_advice(destination)
+    if not advice.startswith("[Gemini Error]"):
+        advice_store.put(destination, advice)
+    return advice
+
+def precompute_advice(destinations, concurrency: int = 4, refresh: bool = False):
+    """Generate and store advice for many destinations at bounded concurrency.
+
+    Args:
+        destinations: Destination names
+        concurrency: Parallel Gemini generations
+        refresh: Regenerate even if fresh advice is already stored
+
+    Returns:
+        Dict mapping each destination to 'stored', 'cached' or an error message
+    """
+    todo = [d for d in destinations if refresh or advice_store.get(d) is None]
+    results = {d: "cached" for d in destinations if d not in todo}
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        futures = {pool.submit(generate_advice, d): d for d in todo}
+        for future in as_completed(futures):
+            destination = futures[future]
+            advice = future.result()
+            if advice.startswith("[Gemini Error]"):
+                results[destination] = advice
+            else:
+                advice_store.put(destination, advice)
+                results[destination] = "stored"
+    return results
+
 @tool
 def give_advice(destination: str):
-    """Generate travel advice via Gemini."""
-    prompt = f"Give 3 important travel safety and cultural tips for visiting {destination}."
-    return gemini_generate(prompt)
\ No newline at end of file
+    """Generate travel advice via Gemini (served from the local advice store when available)."""
+    return get_advice(destination)
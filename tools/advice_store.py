@@ -0,0 +1,130 @@
+"""
+Advice Store
+Local SQLite store of precomputed travel advice, indexed by canonical
+destination and mirrored in memory for sub-millisecond lookups
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from utils.normalize import canonical_destination
+
+# Default lives next to the package, so the CLI and the API server share
+# one store whatever directory they are started from
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADVICE_STORE_PATH = os.getenv("ADVICE_STORE_PATH", os.path.join(PACKAGE_DIR, "data", "advice.sqlite3"))
+
+# Bump when the advice prompt changes so older entries are regenerated
+ADVICE_STORE_VERSION = 1
+
+# Entries older than this are treated as misses (seconds, default 30 days)
+ADVICE_MAX_AGE = float(os.getenv("ADVICE_MAX_AGE", 30 * 24 * 3600))
+
+
+class AdviceStore:
+    """Versioned, timestamped advice per destination.
+
+    SQLite keeps the data across restarts; every row is also held in a
+    dict so hits never touch the disk. A miss (or stale entry) checks the
+    table once more, picking up advice written by another process such as
+    `run.py --precompute-advice` or another server worker.
+    """
+
+    def __init__(self, path=ADVICE_STORE_PATH, version=ADVICE_STORE_VERSION, max_age=ADVICE_MAX_AGE):
+        self.path = path
+        self.version = version
+        self.max_age = max_age
+        self._conn = None
+        self._index = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS advice ("
+                " destination_key TEXT PRIMARY KEY,"
+                " destination TEXT NOT NULL,"
+                " advice TEXT NOT NULL,"
+                " version INTEGER NOT NULL,"
+                " created_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def load(self):
+        """Load every current-version row into the in-memory index."""
+        with self._lock:
+            if self._index is None:
+                rows = self._connect().execute(
+                    "SELECT destination_key, advice, created_at FROM advice WHERE version = ?",
+                    (self.version,)
+                ).fetchall()
+                self._index = {key: (advice, created_at) for key, advice, created_at in rows}
+        return self
+
+    def _entry(self, destination):
+        """(advice, created_at) from the index, refreshed from SQLite on a miss."""
+        if self._index is None:
+            self.load()
+        key = canonical_destination(destination)
+        entry = self._index.get(key)
+        if entry is None or time.time() - entry[1] > self.max_age:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT advice, created_at FROM advice WHERE destination_key = ? AND version = ?",
+                    (key, self.version)
+                ).fetchone()
+                if row is not None:
+                    entry = self._index[key] = (row[0], row[1])
+        return entry
+
+    def get(self, destination):
+        """Stored advice for a destination, or None if missing or stale."""
+        entry = self._entry(destination)
+        if entry is None or time.time() - entry[1] > self.max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def age(self, destination):
+        """Seconds since the advice for destination was generated, or None."""
+        entry = self._entry(destination)
+        return time.time() - entry[1] if entry else None
+
+    def put(self, destination, advice):
+        key = canonical_destination(destination)
+        created_at = time.time()
+        if self._index is None:
+            self.load()
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO advice (destination_key, destination, advice, version, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, destination, advice, self.version, created_at)
+            )
+            self._conn.commit()
+            self._index[key] = (advice, created_at)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "path": self.path,
+            "version": self.version,
+            "entries": len(self._index) if self._index is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+advice_store = AdviceStore()
@@ -1,129 +1,290 @@
 import requests
-import os   
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime, timedelta
 from crewai.tools import tool
 from tools.gemini import gemini_generate
+from utils.cache import TTLCache
+from utils.http_client import http_get
+from utils.json_stream import extract_response
+from utils.negative_cache import ANY, error_class_for, known_failure, record_failure
+from utils.normalize import canonical_destination
+from utils.rate_limit import rate_limiters
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 AVIATIONSTACK_KEY = os.getenv("AVIATIONSTACK_KEY")
+AVIATIONSTACK_URL = "http://api.aviationstack.com/v1"
+
+# Flights returned per upstream query
+FLIGHT_LIMIT = int(os.getenv("FLIGHT_LIMIT", 10))
+# Largest ± window accepted by the date-window search
+FLIGHT_WINDOW_MAX_DAYS = int(os.getenv("FLIGHT_WINDOW_MAX_DAYS", 7))
+
+# Airport codes barely change; flight boards change within minutes
+_airports = TTLCache("airports", ttl=24 * 3600, max_entries=2048)
+_flight_boards = TTLCache("flight_boards", ttl=int(os.getenv("FLIGHTS_CACHE_TTL", 300)), max_entries=1024)
+
+FlightRecord = namedtuple("FlightRecord", "airline number departure arrival dep_time arr_time status")
+
+# The only parts of a /flights item that parse_flight reads
+FLIGHT_FIELDS = (
+    "airline.name",
+    "flight.iata",
+    "departure.airport",
+    "departure.scheduled",
+    "arrival.airport",
+    "arrival.scheduled",
+    "flight_status",
+)
+
+
+def synthetic_flights(destination: str, flight_date: str = None, arr_iata: str = None):
+    """Fallback: ask Gemini for sample flights when AviationStack can't help."""
+    airport = f"{destination} airport (IATA: {arr_iata})" if arr_iata else f"{destination} airport"
+    prompt = f"Generate a realistic list of 3 sample flights to {airport} on {flight_date if flight_date else 'today'}. Include airline names, flight numbers, departure airports, and approximate times. Format it clearly."
+    return gemini_generate(prompt, family="synthetic_flights", scope=destination, batch=True)
+
+def _aviationstack_get(endpoint: str, params: dict, fields, failure_subject: str = ANY, limit: int = None):
+    """GET an AviationStack endpoint under the shared rate limit.
+
+    The response is parsed as a stream, keeping only `fields` of each item
+    in "data" and stopping after `limit` items.
+
+    Failures are remembered in the negative cache under failure_subject, so
+    a rejected premium parameter doesn't mark the whole endpoint as bad.
+    """
+    rate_limiters["aviationstack"].acquire()
+    params = {"access_key": AVIATIONSTACK_KEY, **params}
+    try:
+        res = http_get("aviationstack", f"{AVIATIONSTACK_URL}/{endpoint}", params=params, timeout=10, stream=True)
+        print(f"[DEBUG] AviationStack /{endpoint} status code: {res.status_code}")
+        res.raise_for_status()
+        items, _ = extract_response(res, "data", fields, limit=limit)
+        return items
+    except requests.exceptions.RequestException as e:
+        record_failure("aviationstack", endpoint, error_class_for(e), failure_subject)
+        raise
 
 def get_airport_iata(location: str):
     """Get airport IATA code from location name or city using AviationStack Airports API.
-    
+
     Args:
         location: City name, airport name, or country (e.g., 'Beirut', 'Lebanon', 'Dubai')
-    
+
     Returns:
         IATA code (e.g., 'BEY') or None if not found
     """
-    url = "http://api.aviationstack.com/v1/airports"
-    params = {
-        "access_key": AVIATIONSTACK_KEY,
-        "search": location,
-        "limit": 1
-    }
-    
+    location_key = canonical_destination(location)
+    cached = _airports.get(location_key)
+    if cached:
+        return cached
+    if known_failure("aviationstack", "airports", "not_found", location_key):
+        return None, None
+
     try:
-        res = requests.get(url, params=params, timeout=10)
-        res.raise_for_status()
-        data = res.json().get("data", [])
-        
+        data = _aviationstack_get("airports", {"search": location, "limit": 1},
+                                  ("iata_code", "airport_name"), limit=1)
+
         if data and len(data) > 0:
             iata_code = data[0].get("iata_code")
             airport_name = data[0].get("airport_name", "")
+            _airports.set(location_key, (iata_code, airport_name))
             return iata_code, airport_name
+        record_failure("aviationstack", "airports", "not_found", location_key)
         return None, None
     except Exception as e:
         print(f"Error getting airport IATA code: {e}")
         return None, None
 
+def resolve_airport(destination: str):
+    """(IATA code, airport name) for a city, country or IATA code."""
+    # If destination is already a 3-letter IATA code, use it as is
+    if len(destination) == 3 and destination.isalpha():
+        return destination.upper(), None
+    return get_airport_iata(destination)
+
+def flights_unavailable(arr_iata: str = None):
+    """True if the plan tier is known to reject /flights or the airport has no flights."""
+    return known_failure("aviationstack", "flights", "forbidden") or \
+        (arr_iata is not None and known_failure("aviationstack", "flights", "empty", arr_iata))
+
+def parse_flight(f: dict):
+    """Compact record with just the fields we display."""
+    return FlightRecord(
+        airline=(f.get("airline") or {}).get("name") or "Unknown Airline",
+        number=(f.get("flight") or {}).get("iata") or "Unknown Flight",
+        departure=(f.get("departure") or {}).get("airport") or "Unknown Departure",
+        arrival=(f.get("arrival") or {}).get("airport") or "Unknown Arrival",
+        dep_time=(f.get("departure") or {}).get("scheduled") or "N/A",
+        arr_time=(f.get("arrival") or {}).get("scheduled") or "N/A",
+        status=f.get("flight_status") or "Unknown"
+    )
+
+def format_flight(r: FlightRecord):
+    return f"{r.airline} ({r.number}) - Status: {r.status}\nFrom {r.departure} → {r.arrival}\nDepart {r.dep_time}, Arrive {r.arr_time}\n"
+
+def fetch_current_flights(arr_iata: str, refresh: bool = False):
+    """Current flights arriving at arr_iata (cached for FLIGHTS_CACHE_TTL seconds).
+
+    Free tier: only basic parameters are used (flight_date is a premium feature).
+    refresh=True skips the cache and refetches.
+    """
+    cached = None if refresh else _flight_boards.get((arr_iata, None))
+    if cached is not None:
+        return cached
+
+    print(f"[DEBUG] Calling AviationStack API for arrivals at {arr_iata}")
+    data = _aviationstack_get("flights", {"arr_iata": arr_iata, "limit": FLIGHT_LIMIT},
+                              FLIGHT_FIELDS, limit=FLIGHT_LIMIT)
+    if not data:
+        record_failure("aviationstack", "flights", "empty", arr_iata)
+    records = [parse_flight(f) for f in data]
+    _flight_boards.set((arr_iata, None), records)
+    return records
+
+def fetch_flights_on(arr_iata: str, flight_date: str):
+    """Flights arriving at arr_iata on flight_date (needs a plan that filters by date)."""
+    cached = _flight_boards.get((arr_iata, flight_date))
+    if cached is not None:
+        return cached
+
+    params = {"arr_iata": arr_iata, "flight_date": flight_date, "limit": FLIGHT_LIMIT}
+    data = _aviationstack_get("flights", params, FLIGHT_FIELDS, failure_subject="flight_date", limit=FLIGHT_LIMIT)
+    records = [parse_flight(f) for f in data]
+    _flight_boards.set((arr_iata, flight_date), records)
+    return records
+
+def _dedupe(records):
+    """Drop flights seen twice (overlapping queries) by number and departure time.
+
+    Keying on the departure too keeps distinct flights that share the
+    "Unknown Flight" placeholder number.
+    """
+    seen = {}
+    for r in records:
+        seen.setdefault((r.number, r.dep_time), r)
+    return list(seen.values())
+
+def search_flight_window(destination: str, flight_date: str = None, window_days: int = 1):
+    """Flights arriving at the destination on each day of flight_date ± window_days.
+
+    Per-day queries run concurrently under the AviationStack rate limit. If
+    the plan tier can't filter by date, the single (cached) current-flights
+    response is grouped by scheduled departure date instead.
+
+    Returns:
+        Dict with the airport and flights grouped by day, or None if the
+        airport is unknown
+    """
+    arr_iata, airport_name = resolve_airport(destination)
+    if not arr_iata:
+        return None
+
+    center = datetime.strptime(flight_date, "%Y-%m-%d") if flight_date else datetime.now() + timedelta(days=1)
+    window_days = max(0, min(int(window_days), FLIGHT_WINDOW_MAX_DAYS))
+    days = [(center + timedelta(days=k)).strftime("%Y-%m-%d") for k in range(-window_days, window_days + 1)]
+
+    by_day = None
+    if not known_failure("aviationstack", "flights", "forbidden", "flight_date"):
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(days), 8)) as pool:
+                futures = [pool.submit(copy_context().run, fetch_flights_on, arr_iata, day) for day in days]
+                by_day = {day: future.result() for day, future in zip(days, futures)}
+        except requests.exceptions.HTTPError as e:
+            if error_class_for(e) != "forbidden":
+                raise
+            print("[DEBUG] Plan tier can't filter flights by date, using current flights")
+
+    date_filtered = by_day is not None
+    if not date_filtered:
+        by_day = {day: [] for day in days}
+        for r in fetch_current_flights(arr_iata):
+            day = r.dep_time[:10]
+            if day in by_day:
+                by_day[day].append(r)
+
+    return {
+        "destination": destination,
+        "airport": arr_iata,
+        "airport_name": airport_name,
+        "date_filtered": date_filtered,
+        "days": {day: [r._asdict() for r in _dedupe(records)] for day, records in by_day.items()}
+    }
+
+def format_current_flights(destination: str, arr_iata: str, airport_name: str, records, flight_date: str = None):
+    """Current arrivals board, noting the requested date the free tier can't filter by."""
+    date_note = f" (Note: Showing current flights as free API tier doesn't support date filtering. Requested date was: {flight_date})" if flight_date else ""
+    airport_info = f" - {airport_name} ({arr_iata})" if airport_name else f" ({arr_iata})"
+    flights = [format_flight(r) for r in records]
+    return f"Flights to {destination}{airport_info}{date_note}:\n\n" + "\n---\n".join(flights)
+
+def format_flight_window(window: dict):
+    airport_info = f" - {window['airport_name']} ({window['airport']})" if window["airport_name"] else f" ({window['airport']})"
+    note = "" if window["date_filtered"] else " (Note: free API tier doesn't support date filtering; showing current flights grouped by departure date)"
+    sections = []
+    for day, flights in window["days"].items():
+        listing = "\n---\n".join(format_flight(FlightRecord(**f)) for f in flights) or "No flights found.\n"
+        sections.append(f"== {day} ==\n{listing}")
+    return f"Flights to {window['destination']}{airport_info}{note}:\n\n" + "\n".join(sections)
+
 @tool
-def check_flights(destination: str, flight_date: str = None):
+def check_flights(destination: str, flight_date: str = None, window_days: int = 0):
     """Fetch real flight data using AviationStack API for flights arriving at a destination.
-    
+
     This function automatically converts location names to airport IATA codes.
     You can provide:
         - City names: 'Beirut', 'Dubai', 'Paris', 'New York'
         - Country names: 'Lebanon', 'UAE', 'France'
         - Airport codes: 'BEY', 'DXB', 'CDG', 'JFK'
-    
+
     Args:
         destination: City name, country, or airport IATA code
         flight_date: Flight date in YYYY-MM-DD format (Note: free tier only shows current flights)
-    
+        window_days: Also search this many days before and after flight_date, grouped by day (default: 0)
+
     Returns:
         String containing flight information for flights arriving at the destination
     """
-    # If destination is not already a 3-letter IATA code, look it up
-    arr_iata = destination.upper()
-    airport_name = None
-    
-    if len(destination) != 3 or not destination.isalpha():
-        # Try to get IATA code from location name
-        arr_iata, airport_name = get_airport_iata(destination)
-        if not arr_iata:
-            return f"Could not find airport for destination: {destination}. Please provide a valid city name, country, or airport IATA code."
-    
-    url = "http://api.aviationstack.com/v1/flights"
-    # Free tier: only use basic parameters (flight_date is a premium feature)
-    params = {
-        "access_key": AVIATIONSTACK_KEY, 
-        "arr_iata": arr_iata,  # arr_iata = arrival airport IATA code
-        "limit": 10
-    }
-    
+    arr_iata, airport_name = resolve_airport(destination)
+    if not arr_iata:
+        return f"Could not find airport for destination: {destination}. Please provide a valid city name, country, or airport IATA code."
+
+    # Skip the round-trip when the plan tier is known to reject this endpoint
+    # or the airport is known to have no flights right now
+    if flights_unavailable(arr_iata):
+        print("[DEBUG] Known AviationStack failure, going straight to Gemini")
+        return synthetic_flights(destination, flight_date, arr_iata)
+
     try:
-        print(f"[DEBUG] Calling AviationStack API with params: {params}")
-        res = requests.get(url, params=params, timeout=10)
-        print(f"[DEBUG] Response status code: {res.status_code}")
-        print(f"[DEBUG] Response content: {res.text[:500]}")  # Print first 500 chars
-        
-        # Check if we got a 403 (forbidden - usually means using premium features on free tier)
-        if res.status_code == 403:
-            print("[DEBUG] Got 403 error, falling back to Gemini")
-            # Fallback to Gemini to generate flight information
-            prompt = f"Generate a realistic list of 3 sample flights to {destination} airport (IATA: {arr_iata}) on {flight_date if flight_date else 'today'}. Include airline names, flight numbers, departure airports, and approximate times. Format it clearly."
-            return gemini_generate(prompt)
-        
-        res.raise_for_status()
-        response_json = res.json()
-        print(f"[DEBUG] Full JSON response: {response_json}")
-        data = response_json.get("data", [])
-        
-        if not data:
+        if window_days and int(window_days) > 0:
+            window = search_flight_window(destination, flight_date, int(window_days))
+            if window and any(window["days"].values()):
+                return format_flight_window(window)
+            return synthetic_flights(destination, flight_date, arr_iata)
+
+        records = fetch_current_flights(arr_iata)
+
+        if not records:
             print(f"[DEBUG] No flight data returned from API")
             # If no data, use Gemini as fallback
-            prompt = f"Generate a realistic list of 3 sample flights to {destination} airport (IATA: {arr_iata}) on {flight_date if flight_date else 'today'}. Include airline names, flight numbers, departure airports, and times."
-            return gemini_generate(prompt)
-        
-        print(f"[DEBUG] Found {len(data)} flights")
-        flights = []
-        date_note = f" (Note: Showing current flights as free API tier doesn't support date filtering. Requested date was: {flight_date})" if flight_date else ""
-        airport_info = f" - {airport_name} ({arr_iata})" if airport_name else f" ({arr_iata})"
-        
-        for f in data:
-            airline = f.get("airline", {}).get("name", "Unknown Airline")
-            num = f.get("flight", {}).get("iata", "Unknown Flight")
-            dep = f.get("departure", {}).get("airport", "Unknown Departure")
-            arr = f.get("arrival", {}).get("airport", "Unknown Arrival")
-            dep_time = f.get("departure", {}).get("scheduled", "N/A")
-            arr_time = f.get("arrival", {}).get("scheduled", "N/A")
-            status = f.get("flight_status", "Unknown")
-            flights.append(f"{airline} ({num}) - Status: {status}\nFrom {dep} → {arr}\nDepart {dep_time}, Arrive {arr_time}\n")
-        
-        return f"Flights to {destination}{airport_info}{date_note}:\n\n" + "\n---\n".join(flights)
+            return synthetic_flights(destination, flight_date, arr_iata)
+
+        print(f"[DEBUG] Found {len(records)} flights")
+        return format_current_flights(destination, arr_iata, airport_name, records, flight_date)
     except requests.exceptions.HTTPError as e:
-        if "403" in str(e):
-            # Use Gemini as fallback for 403 errors
-            prompt = f"Generate a realistic list of 3 sample flights to {destination} airport on {flight_date if flight_date else 'today'}. Include airline names, flight numbers, departure airports, and times."
-            return gemini_generate(prompt)
+        if error_class_for(e) == "forbidden":
+            # Check if we got a 403 (usually means using premium features on free tier)
+            print("[DEBUG] Got 403 error, falling back to Gemini")
+            return synthetic_flights(destination, flight_date, arr_iata)
         return f"Error fetching flights: {e}"
     except Exception as e:
         # General fallback to Gemini
         try:
-            prompt = f"Generate a realistic list of 3 sample flights to {destination} airport on {flight_date if flight_date else 'today'}. Include airline names, flight numbers, departure airports, and times."
-            return gemini_generate(prompt)
+            return synthetic_flights(destination, flight_date, arr_iata)
         except:
             return f"Error fetching flights: {e}"
@@ -1,105 +1,355 @@
 import requests
+import heapq
 import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from crewai.tools import tool
+from services.plan_store import plan_store
 from tools.gemini import gemini_generate
+from utils.cache import TTLCache
+from utils.http_client import http_get
+from utils.json_stream import extract_response
+from utils.negative_cache import error_class_for, known_failure, record_failure
+from utils.normalize import canonical_destination
+from utils.rate_limit import rate_limiters
 
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
 
+BOOKING_HOST = "booking-com15.p.rapidapi.com"
+BOOKING_URL = f"https://{BOOKING_HOST}/api/v1/hotels"
+
+# Result pages fetched concurrently per search (Booking returns ~20 per page)
+HOTEL_PAGES = int(os.getenv("HOTEL_PAGES", 3))
+HOTEL_TOP_K = int(os.getenv("HOTEL_TOP_K", 5))
+
+# Ranking weights: review score vs. cheapness. Nightly prices are normalized
+# against max_price when given, otherwise against HOTEL_PRICE_REFERENCE
+# (USD per night).
+HOTEL_RATING_WEIGHT = float(os.getenv("HOTEL_RATING_WEIGHT", 0.7))
+HOTEL_PRICE_WEIGHT = float(os.getenv("HOTEL_PRICE_WEIGHT", 0.3))
+HOTEL_PRICE_REFERENCE = float(os.getenv("HOTEL_PRICE_REFERENCE", 300))
+
+# dest_id lookups rarely change, so keep them for a day
+_destinations = TTLCache("booking_destinations", ttl=24 * 3600, max_entries=2048)
+# One entry per (dest_id, checkin, checkout, page)
+_hotel_pages = TTLCache("hotel_pages", ttl=int(os.getenv("HOTELS_CACHE_TTL", 30 * 60)), max_entries=2048)
+
+HotelRecord = namedtuple("HotelRecord", "name review_score review_word price currency")
+
+# The only parts of a searchHotels item that parse_hotel reads; photos,
+# badges and the rest of the price breakdown are never materialized
+HOTEL_FIELDS = (
+    "property.name",
+    "property.reviewScore",
+    "property.reviewScoreWord",
+    "property.priceBreakdown.grossPrice.value",
+    "property.priceBreakdown.grossPrice.currency",
+)
+
+
+def synthetic_hotels(destination: str, checkin_date: str, checkout_date: str):
+    """Fallback: ask Gemini for hotel suggestions when Booking.com can't help."""
+    prompt = f"List 5 recommended hotels in {destination} with ratings and approximate prices for dates {checkin_date} to {checkout_date}. Format nicely."
+    return gemini_generate(prompt, family="synthetic_hotels", scope=destination, batch=True)
+
+
+def _booking_get(endpoint: str, params: dict, items_path: str, fields, timeout: float = 10, limit: int = None):
+    """GET a Booking.com endpoint, remembering failures in the negative cache.
+
+    The body is read with extract_response inside the same error handling,
+    so a stalled or broken body counts as a failure too.
+
+    Returns:
+        List of pruned items found at items_path
+    """
+    headers = {
+        "x-rapidapi-key": RAPIDAPI_KEY,
+        "x-rapidapi-host": BOOKING_HOST
+    }
+    rate_limiters["rapidapi"].acquire()
+    try:
+        response = http_get("booking", f"{BOOKING_URL}/{endpoint}", headers=headers, params=params,
+                            timeout=timeout, stream=True)
+        response.raise_for_status()
+        items, _ = extract_response(response, items_path, fields, limit=limit)
+        return items
+    except requests.exceptions.RequestException as e:
+        record_failure("booking", endpoint, error_class_for(e))
+        raise
+
+
+def booking_unavailable(destination: str):
+    """True if Booking.com is known to reject us or not know this destination."""
+    return known_failure("booking", "searchDestination", "forbidden") or \
+        known_failure("booking", "searchHotels", "forbidden") or \
+        known_failure("booking", "searchDestination", "empty", canonical_destination(destination))
+
+
+def resolve_destination(destination: str):
+    """Look up (and cache) the Booking.com dest_id for a destination.
+
+    Returns:
+        Tuple of (dest_id, display name), or (None, None) if not found
+    """
+    dest_key = canonical_destination(destination)
+    cached = _destinations.get(dest_key)
+    if cached:
+        return cached
+
+    # Only the first destination result is used
+    matches = _booking_get("searchDestination", {"query": destination}, "data", ("dest_id", "name"), limit=1)
+    if not matches:
+        record_failure("booking", "searchDestination", "empty", dest_key)
+        return None, None
+
+    first = matches[0]
+    resolved = (first.get("dest_id"), first.get("name") or destination)
+    _destinations.set(dest_key, resolved)
+    return resolved
+
+
+def parse_hotel(h: dict):
+    """Compact record with just the fields we rank and display."""
+    prop = h.get("property", {})
+    gross = prop.get("priceBreakdown", {}).get("grossPrice", {})
+    return HotelRecord(
+        name=prop.get("name", "Unknown Hotel"),
+        review_score=prop.get("reviewScore"),
+        review_word=prop.get("reviewScoreWord", ""),
+        price=gross.get("value"),
+        currency=gross.get("currency", "USD")
+    )
+
+
+def fetch_hotel_page(dest_id: str, checkin_date: str, checkout_date: str, page: int = 1,
+                     refresh: bool = False):
+    """Fetch one searchHotels result page as a list of HotelRecords.
+
+    Pages are cached for HOTELS_CACHE_TTL seconds; refresh=True refetches.
+    """
+    cache_key = (dest_id, checkin_date, checkout_date, page)
+    cached = None if refresh else _hotel_pages.get(cache_key)
+    if cached is not None:
+        return cached
+
+    params = {
+        "dest_id": dest_id,
+        "search_type": "CITY",
+        "arrival_date": checkin_date,
+        "departure_date": checkout_date,
+        "adults": "1",
+        "room_qty": "1",
+        "page_number": str(page),
+        "units": "metric",
+        "temperature_unit": "c",
+        "languagecode": "en-us",
+        "currency_code": "USD"
+    }
+    hotels = _booking_get("searchHotels", params, "data.hotels", HOTEL_FIELDS, timeout=15)
+    records = [parse_hotel(h) for h in hotels]
+    _hotel_pages.set(cache_key, records)
+    return records
+
+
+def stay_nights(checkin_date: str, checkout_date: str):
+    """Nights between two YYYY-MM-DD dates, at least 1."""
+    checkin = datetime.strptime(checkin_date, "%Y-%m-%d")
+    checkout = datetime.strptime(checkout_date, "%Y-%m-%d")
+    return max((checkout - checkin).days, 1)
+
+
+def nightly_price(record: HotelRecord, nights: int = 1):
+    """Price per night; Booking's grossPrice is the total for the whole stay."""
+    return None if record.price is None else record.price / max(nights, 1)
+
+
+def hotel_score(record: HotelRecord, price_reference: float = HOTEL_PRICE_REFERENCE, nights: int = 1):
+    """Weighted score in [0, 1]: higher review score and lower nightly price win."""
+    rating = (record.review_score or 0) / 10
+    cheapness = 0.0
+    price = nightly_price(record, nights)
+    if price is not None and price_reference > 0:
+        cheapness = 1 - min(price / price_reference, 1)
+    return HOTEL_RATING_WEIGHT * rating + HOTEL_PRICE_WEIGHT * cheapness
+
+
+def passes_filters(record: HotelRecord, max_price: float = None, min_review_score: float = None,
+                   nights: int = 1):
+    """True if the record is within max_price per night and min_review_score."""
+    price = nightly_price(record, nights)
+    if max_price is not None and (price is None or price > max_price):
+        return False
+    if min_review_score is not None and (record.review_score is None or record.review_score < min_review_score):
+        return False
+    return True
+
+
+def rank_hotels(records, max_price: float = None, min_review_score: float = None, top_k: int = HOTEL_TOP_K,
+                nights: int = 1):
+    """Filter records and keep the top_k by hotel_score.
+
+    Uses a bounded min-heap, so memory stays O(top_k) however many
+    records stream through.
+
+    Args:
+        records: HotelRecords whose price is the total for the stay
+        max_price: Maximum price per night in USD (None for no limit)
+        min_review_score: Minimum review score out of 10 (None for no limit)
+        top_k: Number of hotels to keep
+        nights: Length of the stay the prices cover
+    """
+    price_reference = max_price or HOTEL_PRICE_REFERENCE
+    heap = []
+    for seq, record in enumerate(records):
+        if not passes_filters(record, max_price, min_review_score, nights):
+            continue
+        # seq breaks ties so records themselves are never compared
+        item = (hotel_score(record, price_reference, nights), -seq, record)
+        if len(heap) < top_k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return [record for _, _, record in sorted(heap, reverse=True)]
+
+
+def _page_records(dest_id, checkin_date, checkout_date, pages):
+    """Yield records from `pages` result pages fetched concurrently.
+
+    Pages are consumed as they arrive so only in-flight pages are held in
+    memory. A failure is only fatal if every page failed.
+    """
+    errors = []
+    with ThreadPoolExecutor(max_workers=pages) as pool:
+        futures = [
+            pool.submit(copy_context().run, fetch_hotel_page, dest_id, checkin_date, checkout_date, page)
+            for page in range(1, pages + 1)
+        ]
+        for future in as_completed(futures):
+            try:
+                page_records = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            yield from page_records
+    if errors and len(errors) == pages:
+        raise errors[0]
+
+
+def search_hotels(destination: str, checkin_date: str, checkout_date: str,
+                  max_price: float = None, min_review_score: float = None,
+                  top_k: int = HOTEL_TOP_K, pages: int = HOTEL_PAGES):
+    """Search several result pages and return the best matching hotels.
+
+    max_price is per night; it is compared with each stay's total price
+    divided by the number of nights.
+
+    Returns:
+        Tuple of (destination display name, ranked list of HotelRecords);
+        the name is None if Booking.com doesn't know the destination
+    """
+    dest_id, dest_name = resolve_destination(destination)
+    if not dest_id:
+        return None, []
+    cheapest = []
+
+    def tracked(records):
+        # Cheapest price across every page, before filtering, for price history
+        for record in records:
+            if record.price is not None and (not cheapest or record.price < cheapest[0]):
+                cheapest[:] = [record.price]
+            yield record
+
+    ranked = rank_hotels(tracked(_page_records(dest_id, checkin_date, checkout_date, max(pages, 1))),
+                         max_price, min_review_score, top_k, stay_nights(checkin_date, checkout_date))
+    plan_store.record(
+        "hotel_search",
+        {"destination": destination, "checkin_date": checkin_date, "checkout_date": checkout_date},
+        ("destination", "checkin_date", "checkout_date"),
+        data=[record._asdict() for record in ranked],
+        min_price=cheapest[0] if cheapest else None
+    )
+    return dest_name, ranked
+
+
+def format_hotels(dest_name: str, records, checkin_date: str, checkout_date: str):
+    hotels = []
+    for record in records:
+        hotel_info = f"{record.name}"
+        if record.review_score is not None:
+            hotel_info += f" - {record.review_score}/10 ({record.review_word})"
+        price = record.price if record.price is not None else "N/A"
+        hotel_info += f"\nPrice: {price} {record.currency}"
+        hotels.append(hotel_info)
+
+    return f"Top hotels in {dest_name} (Check-in: {checkin_date}, Check-out: {checkout_date}):\n\n" + "\n---\n".join(hotels)
+
+
+def parse_limit(value):
+    """Parse an optional numeric limit ('150', '', 'any', None) into a float or None."""
+    if value is None:
+        return None
+    try:
+        return float(str(value).strip().lstrip("$"))
+    except ValueError:
+        return None
+
+
 @tool
-def check_hotels(destination: str, checkin_date: str = None, checkout_date: str = None):
+def check_hotels(destination: str, checkin_date: str = None, checkout_date: str = None,
+                 max_price: str = None, min_review_score: str = None):
     """Fetch hotel data using Booking.com API (via RapidAPI - booking-com15).
+    Several result pages are searched and the best-rated, best-value hotels
+    matching the filters are returned.
     Args:
         destination: City name
         checkin_date: Check-in date in YYYY-MM-DD format
         checkout_date: Check-out date in YYYY-MM-DD format
+        max_price: Optional maximum price per night in USD (empty for no limit)
+        min_review_score: Optional minimum review score out of 10 (empty for no limit)
     """
     # Set default dates if not provided
     if not checkin_date:
         checkin_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
     if not checkout_date:
         checkout_date = (datetime.now() + timedelta(days=3)).strftime("%Y-%m-%d")
-    
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": "booking-com15.p.rapidapi.com"
-    }
-    
+    max_price = parse_limit(max_price)
+    min_review_score = parse_limit(min_review_score)
+
+    # Known-bad paths (plan rejected, destination unknown) skip the round-trip
+    if booking_unavailable(destination):
+        print("[DEBUG] Known Booking.com failure, going straight to Gemini")
+        return synthetic_hotels(destination, checkin_date, checkout_date)
+
     try:
-        # Step 1: Search for destination
-        search_url = "https://booking-com15.p.rapidapi.com/api/v1/hotels/searchDestination"
-        search_params = {"query": destination}
-        
-        search_response = requests.get(search_url, headers=headers, params=search_params, timeout=10)
-        search_response.raise_for_status()
-        search_data = search_response.json()
-        
-        if not search_data.get("data") or len(search_data["data"]) == 0:
+        dest_name, records = search_hotels(
+            destination, checkin_date, checkout_date,
+            max_price=max_price, min_review_score=min_review_score
+        )
+
+        if dest_name is None:
             # Fallback to Gemini if no destination found
-            prompt = f"List 5 recommended hotels in {destination} with ratings and approximate prices for dates {checkin_date} to {checkout_date}."
-            return gemini_generate(prompt)
-        
-        # Get the first destination result
-        dest_id = search_data["data"][0].get("dest_id")
-        dest_name = search_data["data"][0].get("search_type", destination)
-        
-        # Step 2: Search for hotels
-        hotels_url = "https://booking-com15.p.rapidapi.com/api/v1/hotels/searchHotels"
-        hotels_params = {
-            "dest_id": dest_id,
-            "search_type": "CITY",
-            "arrival_date": checkin_date,
-            "departure_date": checkout_date,
-            "adults": "1",
-            "room_qty": "1",
-            "page_number": "1",
-            "units": "metric",
-            "temperature_unit": "c",
-            "languagecode": "en-us",
-            "currency_code": "USD"
-        }
-        
-        hotels_response = requests.get(hotels_url, headers=headers, params=hotels_params, timeout=15)
-        hotels_response.raise_for_status()
-        hotels_data = hotels_response.json()
-        
-        if not hotels_data.get("data") or not hotels_data["data"].get("hotels"):
+            return synthetic_hotels(destination, checkin_date, checkout_date)
+
+        if not records:
+            if max_price is not None or min_review_score is not None:
+                return f"No hotels in {dest_name} match the filters (max price per night: {max_price or 'any'}, min review score: {min_review_score or 'any'}) for {checkin_date} to {checkout_date}."
             # Fallback to Gemini if no hotels found
-            prompt = f"List 5 recommended hotels in {destination} with ratings and approximate prices for dates {checkin_date} to {checkout_date}."
-            return gemini_generate(prompt)
-        
-        hotels = []
-        hotel_list = hotels_data["data"]["hotels"][:5]  # Get top 5 hotels
-        
-        for h in hotel_list:
-            name = h.get("property", {}).get("name", "Unknown Hotel")
-            rating = h.get("property", {}).get("reviewScore", "N/A")
-            review_word = h.get("property", {}).get("reviewScoreWord", "")
-            price_info = h.get("property", {}).get("priceBreakdown", {})
-            gross_price = price_info.get("grossPrice", {}).get("value", "N/A")
-            currency = price_info.get("grossPrice", {}).get("currency", "USD")
-            
-            hotel_info = f"{name}"
-            if rating != "N/A":
-                hotel_info += f" - {rating}/10 ({review_word})"
-            hotel_info += f"\nPrice: {gross_price} {currency}"
-            
-            hotels.append(hotel_info)
-        
-        return f"Top hotels in {dest_name} (Check-in: {checkin_date}, Check-out: {checkout_date}):\n\n" + "\n---\n".join(hotels)
-        
+            return synthetic_hotels(destination, checkin_date, checkout_date)
+
+        return format_hotels(dest_name, records, checkin_date, checkout_date)
+
     except requests.exceptions.RequestException as e:
         # Fallback to Gemini on any API error
         try:
-            prompt = f"List 5 recommended hotels in {destination} with ratings and approximate prices for dates {checkin_date} to {checkout_date}. Format nicely."
-            return gemini_generate(prompt)
+            return synthetic_hotels(destination, checkin_date, checkout_date)
         except:
             return f"Error fetching hotels: {e}"
     except Exception as e:
         # Fallback to Gemini on any error
         try:
-            prompt = f"List 5 recommended hotels in {destination} with ratings and approximate prices for dates {checkin_date} to {checkout_date}."
-            return gemini_generate(prompt)
+            return synthetic_hotels(destination, checkin_date, checkout_date)
         except:
             return f"Error fetching hotels: {e}"
@@ -1,18 +1,76 @@
 import os
 import google.generativeai as genai
 from dotenv import load_dotenv
+from tools.gemini_batch import GEMINI_BATCH_ENABLED, GeminiBatcher
+from tools.prompt_cache import PROMPT_CACHE_ENABLED, prompt_cache
+from utils.deadline import timeout_for
 
 # Load environment and configure Gemini
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 genai.configure(api_key=GEMINI_API_KEY)
 
-def gemini_generate(prompt: str) -> str:
-    """Generate a response using free Gemini 2.0 Flash model."""
+# Upper bound for one generation; shortened to the request deadline
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", 30))
+
+def gemini_generate(prompt: str, family: str = None, scope: str = None, batch: bool = False) -> str:
+    """Generate a response using free Gemini 2.0 Flash model.
+
+    Args:
+        prompt: The prompt text
+        family: Prompt family for the prompt cache; None skips caching
+        scope: Value a cached answer must share to be reused (e.g. destination)
+        batch: Allow sending this prompt together with others that arrive
+            within the batch window (for short, independent fallbacks)
+    """
+    cache = PROMPT_CACHE_ENABLED and family is not None
+    if cache:
+        cached = prompt_cache.get(prompt, family, scope)
+        if cached is not None:
+            return cached
+    text = fallback_batcher.submit(prompt) if batch and GEMINI_BATCH_ENABLED else _generate(prompt)
+    if cache and not text.startswith("[Gemini Error]"):
+        prompt_cache.put(prompt, text, family, scope)
+    return text
+
+
+def _generate(prompt: str) -> str:
     try:
         # use the free-tier Gemini model available in AI Studio
         model = genai.GenerativeModel("models/gemini-2.5-flash")
-        result = model.generate_content(prompt)
+        result = model.generate_content(
+            prompt,
+            request_options={"timeout": timeout_for(GEMINI_TIMEOUT)}
+        )
         return result.text.strip()
     except Exception as e:
         return f"[Gemini Error] {e}"
+
+
+# Fallback prompts from the flight, hotel and tour tools tend to arrive
+# together during an upstream outage; batching keeps us under Gemini limits
+fallback_batcher = GeminiBatcher(_generate, timeout=GEMINI_TIMEOUT)
+
+
+def warm_gemini():
+    """Build the model and its API client now, so the first request doesn't."""
+    model = genai.GenerativeModel("models/gemini-2.5-flash")
+    from google.generativeai import client
+    client.get_default_generative_client()
+    return model
+
+
+def gemini_stream(prompt: str):
+    """Yield a Gemini response in chunks as they are generated."""
+    try:
+        model = genai.GenerativeModel("models/gemini-2.5-flash")
+        response = model.generate_content(
+            prompt,
+            stream=True,
+            request_options={"timeout": timeout_for(GEMINI_TIMEOUT)}
+        )
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+    except Exception as e:
+        yield f"[Gemini Error] {e}"
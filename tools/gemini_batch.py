@@ -0,0 +1,189 @@
+"""
+Gemini Micro-Batching
+Collects prompts that arrive within a short window and sends them as one
+multi-part generation, then splits the answer back to each caller
+"""
+
+import contextvars
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from utils.deadline import DeadlineExceeded, deadline_scope, remaining, timeout_for
+
+GEMINI_BATCH_ENABLED = os.getenv("GEMINI_BATCH_ENABLED", "1") not in ("0", "false", "False")
+# Longest the first prompt of a batch waits for company (milliseconds)
+GEMINI_BATCH_WINDOW_MS = float(os.getenv("GEMINI_BATCH_WINDOW_MS", 100))
+GEMINI_BATCH_MAX_SIZE = int(os.getenv("GEMINI_BATCH_MAX_SIZE", 4))
+
+_ANSWER_MARKER = re.compile(r"^\s*<<<ANSWER (\d+)>>>\s*$", re.MULTILINE)
+
+
+def combine_prompts(prompts):
+    """One prompt asking for a delimited answer to each of prompts."""
+    parts = [
+        f"You will receive {len(prompts)} separate requests. Answer each one independently "
+        f"and completely, as if it were the only request. Start the answer to request N with "
+        f"a line containing exactly <<<ANSWER N>>> and write nothing before the first marker."
+    ]
+    for number, prompt in enumerate(prompts, 1):
+        parts.append(f"<<<REQUEST {number}>>>\n{prompt}\n<<<END REQUEST {number}>>>")
+    return "\n\n".join(parts)
+
+
+def split_answers(text, count):
+    """Answers 1..count from a combined response, or None if any is missing."""
+    pieces = _ANSWER_MARKER.split(text)
+    answers = {}
+    # pieces = [preamble, number, answer, number, answer, ...]
+    for number, answer in zip(pieces[1::2], pieces[2::2]):
+        answer = answer.strip()
+        if answer:
+            answers[int(number)] = answer
+    if any(number not in answers for number in range(1, count + 1)):
+        return None
+    return [answers[number] for number in range(1, count + 1)]
+
+
+class _Batch:
+    def __init__(self):
+        self.items = []             # (prompt, Future, submitted_at, deadline or None)
+        self.full = threading.Event()
+
+
+class GeminiBatcher:
+    """Leader/follower micro-batcher around a generate(prompt) callable.
+
+    The first caller of a batch becomes its leader: it waits until the
+    batch is full or the window passes, then sends every collected prompt
+    in one request. Other callers just wait for their slice of the answer.
+
+    Each caller's request deadline is captured when it submits; the shared
+    call runs under the earliest of them, and a caller whose own deadline
+    passes stops waiting and gets an error answer.
+    """
+
+    def __init__(self, generate, window_ms=GEMINI_BATCH_WINDOW_MS, max_size=GEMINI_BATCH_MAX_SIZE, timeout=30):
+        """
+        Args:
+            generate: Callable taking a prompt and returning the answer text
+            window_ms: Longest the leader waits for more prompts
+            max_size: Prompts per batch; a full batch is sent at once
+            timeout: Upper bound for one generate call (seconds), used to
+                cap how long followers wait
+        """
+        self.generate = generate
+        self.window = window_ms / 1000
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._open = None
+        self.batches = 0
+        self.prompts = 0
+        self.split_failures = 0
+        self.size_counts = {}
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def submit(self, prompt):
+        """Generate an answer for prompt, possibly batched with others.
+
+        Returns:
+            The answer text (or a "[Gemini Error] ..." string)
+        """
+        future = Future()
+        left = remaining()
+        deadline = None if left is None else time.monotonic() + left
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.items.append((prompt, future, time.monotonic(), deadline))
+            if len(batch.items) >= self.max_size:
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._dispatch(batch.items)
+            return future.result()
+        try:
+            return future.result(timeout=timeout_for(self.window + self.timeout))
+        except (FutureTimeout, DeadlineExceeded):
+            return "[Gemini Error] request deadline exceeded while waiting for a batched answer"
+
+    def _generate_by(self, prompt, deadline):
+        """generate(prompt), finishing by deadline (a monotonic time) if given."""
+        if deadline is None:
+            return self.generate(prompt)
+        with deadline_scope(deadline - time.monotonic()):
+            return self.generate(prompt)
+
+    def _dispatch(self, items):
+        dispatched = time.monotonic()
+        prompts = [prompt for prompt, _, _, _ in items]
+        deadlines = [deadline for _, _, _, deadline in items]
+        # The shared call must be done in time for the most hurried caller
+        earliest = min((d for d in deadlines if d is not None), default=None)
+        try:
+            if len(prompts) == 1:
+                answers = [self._generate_by(prompts[0], earliest)]
+            else:
+                text = self._generate_by(combine_prompts(prompts), earliest)
+                if text.startswith("[Gemini Error]"):
+                    answers = [text] * len(prompts)
+                else:
+                    answers = split_answers(text, len(prompts))
+                    if answers is None:
+                        # The model ignored the format: answer one by one
+                        print(f"[DEBUG] Could not split batched answer for {len(prompts)} prompts; retrying individually")
+                        with self._lock:
+                            self.split_failures += 1
+                        answers = self._generate_each(prompts, deadlines)
+        except Exception as e:
+            answers = [f"[Gemini Error] {e}"] * len(prompts)
+
+        with self._lock:
+            self.batches += 1
+            self.prompts += len(prompts)
+            self.size_counts[len(prompts)] = self.size_counts.get(len(prompts), 0) + 1
+            for _, _, submitted_at, _ in items:
+                waited = dispatched - submitted_at
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+        for (_, future, _, _), answer in zip(items, answers):
+            future.set_result(answer)
+
+    def _generate_each(self, prompts, deadlines):
+        """Answer prompts with one generate call each, in parallel, each under its caller's deadline."""
+        with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._generate_by, prompt, deadline)
+                for prompt, deadline in zip(prompts, deadlines)
+            ]
+        return [future.result() for future in futures]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": GEMINI_BATCH_ENABLED,
+                "window_ms": round(self.window * 1000, 1),
+                "max_size": self.max_size,
+                "batches": self.batches,
+                "prompts": self.prompts,
+                "calls_saved": self.prompts - self.batches,
+                "mean_fill": round(self.prompts / (self.batches * self.max_size), 3) if self.batches else 0.0,
+                "batch_sizes": dict(sorted(self.size_counts.items())),
+                "split_failures": self.split_failures,
+                "added_latency_ms": {
+                    "mean": round(self.wait_total / self.prompts * 1000, 2) if self.prompts else 0.0,
+                    "max": round(self.wait_max * 1000, 2),
+                },
+            }
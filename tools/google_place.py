@@ -1,48 +1,199 @@
 import os
+import math
+import time
 import requests
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from crewai.tools import tool
 from tools.gemini import gemini_generate
+from utils.cache import TTLCache
+from utils.deadline import remaining
+from utils.http_client import http_get
+from utils.json_stream import extract_response
+from utils.negative_cache import error_class_for, known_failure, record_failure
+from utils.normalize import canonical_destination
 
 GOOGLE_MAPS_KEY = os.getenv("GOOGLE_MAPS_KEY")
+TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+
+# Category name -> Text Search phrase ("<phrase> in <destination>")
+ATTRACTION_CATEGORIES = {
+    "landmarks": "famous landmarks",
+    "museums": "museums",
+    "parks": "parks and gardens",
+    "food": "popular local food spots",
+}
+
+# Text Search returns up to 20 results per page and at most 3 pages
+TOUR_MAX_PAGES = int(os.getenv("TOUR_MAX_PAGES", 2))
+TOUR_TOP_N = int(os.getenv("TOUR_TOP_N", 10))
+# A next_page_token only becomes valid a moment after it is issued
+PLACES_PAGE_TOKEN_DELAY = float(os.getenv("PLACES_PAGE_TOKEN_DELAY", 2.0))
+
+# One entry per (destination, category)
+_attractions = TTLCache("attractions", ttl=int(os.getenv("ATTRACTIONS_CACHE_TTL", 6 * 3600)), max_entries=2048)
+
+# Statuses that are about our key/quota rather than the query, so they
+# apply to every query until they expire
+ACCOUNT_LEVEL_STATUSES = ("REQUEST_DENIED", "OVER_QUERY_LIMIT", "OVER_DAILY_LIMIT")
+
+class PlacesStatusError(Exception):
+    """Google Places answered with a non-OK status."""
+
+PlaceRecord = namedtuple("PlaceRecord", "place_id name rating reviews address lat lng category")
+
+# The only parts of a Text Search result that parse_place reads (photos,
+# opening hours, viewports, ... are skipped while parsing)
+PLACE_FIELDS = (
+    "place_id",
+    "name",
+    "rating",
+    "user_ratings_total",
+    "formatted_address",
+    "geometry.location.lat",
+    "geometry.location.lng",
+)
+
+def synthetic_tour(destination: str):
+    """Fallback: ask Gemini for attractions when Google Places can't help."""
+    prompt = f"List 5 top must-see tourist attractions in {destination} with brief descriptions."
+    return gemini_generate(prompt, family="synthetic_tour", scope=destination, batch=True)
+
+def parse_place(place: dict, category: str):
+    location = (place.get("geometry") or {}).get("location") or {}
+    return PlaceRecord(
+        place_id=place.get("place_id") or place.get("name"),
+        name=place.get("name", "Unknown"),
+        rating=place.get("rating"),
+        reviews=place.get("user_ratings_total") or 0,
+        address=place.get("formatted_address", "No address"),
+        lat=location.get("lat"),
+        lng=location.get("lng"),
+        category=category
+    )
+
+def fetch_category(destination: str, category: str, max_pages: int = TOUR_MAX_PAGES,
+                   refresh: bool = False):
+    """Text Search one attraction category, following next_page_token.
+
+    Results are cached per (destination, category); refresh=True refetches.
+
+    Raises:
+        PlacesStatusError: if Places answers with a non-OK status
+    """
+    dest_key = canonical_destination(destination)
+    cache_key = (dest_key, category)
+    cached = None if refresh else _attractions.get(cache_key)
+    if cached is not None:
+        return cached
+
+    query_key = f"{dest_key}|{category}"
+    if known_failure("google_places", "textsearch", "status", query_key):
+        raise PlacesStatusError(f"known non-OK status for {query_key}")
+
+    params = {
+        "query": f"{ATTRACTION_CATEGORIES.get(category, category)} in {destination}",
+        "key": GOOGLE_MAPS_KEY
+    }
+    places = []
+    for page in range(max_pages):
+        response = http_get("google_places", TEXT_SEARCH_URL, params=params, timeout=10, stream=True)
+        response.raise_for_status()
+        results, data = extract_response(response, "results", PLACE_FIELDS, ("status", "next_page_token"))
+
+        status = data.get("status")
+        if status == "ZERO_RESULTS":
+            break
+        if status != "OK":
+            if status in ACCOUNT_LEVEL_STATUSES:
+                record_failure("google_places", "textsearch", "forbidden")
+            else:
+                record_failure("google_places", "textsearch", "status", query_key)
+            if not places:
+                raise PlacesStatusError(f"Places status {status} for {query_key}")
+            break
+
+        places.extend(parse_place(p, category) for p in results)
+
+        token = data.get("next_page_token")
+        left = remaining()
+        if not token or (left is not None and left < PLACES_PAGE_TOKEN_DELAY + 1):
+            break
+        time.sleep(PLACES_PAGE_TOKEN_DELAY)
+        params = {"pagetoken": token, "key": GOOGLE_MAPS_KEY}
+
+    _attractions.set(cache_key, places)
+    return places
+
+def attraction_score(place: PlaceRecord):
+    """Rating weighted by (log-damped) review count, so a 4.9 with 12 reviews
+    doesn't outrank a 4.6 with 80,000."""
+    return (place.rating or 0) * math.log10(1 + place.reviews)
+
+def search_attractions(destination: str, categories=None, max_pages: int = TOUR_MAX_PAGES, top_n: int = None):
+    """Attractions across several categories, de-duplicated and ranked.
+
+    Categories are searched concurrently. A category that fails is skipped;
+    the search only raises if every category failed.
+
+    Returns:
+        List of PlaceRecords, best first (all of them if top_n is None)
+    """
+    categories = list(categories or ATTRACTION_CATEGORIES)
+    errors = []
+    places = {}
+    with ThreadPoolExecutor(max_workers=len(categories)) as pool:
+        futures = [
+            pool.submit(copy_context().run, fetch_category, destination, category, max_pages)
+            for category in categories
+        ]
+        for future in futures:
+            try:
+                results = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            for place in results:
+                places.setdefault(place.place_id, place)
+
+    if errors and len(errors) == len(categories):
+        raise errors[0]
+
+    ranked = sorted(places.values(), key=attraction_score, reverse=True)
+    return ranked[:top_n] if top_n else ranked
+
+def format_attractions(destination: str, places):
+    attractions = []
+    for place in places:
+        rating = place.rating if place.rating is not None else "N/A"
+        attractions.append(f"{place.name} (Rating: {rating}, {place.reviews} reviews) [{place.category}]\n{place.address}")
+    return "Top attractions in " + destination + ":\n\n" + "\n---\n".join(attractions)
 
 @tool
 def prepare_tour(destination: str):
-    """List top attractions using Google Places API - Find Place endpoint."""
+    """List top attractions using Google Places API - Text Search across
+    landmarks, museums, parks and food, ranked by rating and review count."""
+    dest_key = canonical_destination(destination)
+    if known_failure("google_places", "textsearch", "empty", dest_key):
+        return f"No tourist attractions found for {destination}."
+    if known_failure("google_places", "textsearch", "forbidden"):
+        print("[DEBUG] Known Google Places failure, going straight to Gemini")
+        return synthetic_tour(destination)
+
     try:
-        # Use the Find Place API endpoint (not the legacy places method)
-        url = "https://maps.googleapis.com/maps/api/place/findplacefromtext/json"
-        params = {
-            "input": f"tourist attractions in {destination}",
-            "inputtype": "textquery",
-            "fields": "name,formatted_address,rating",
-            "key": GOOGLE_MAPS_KEY
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get("status") != "OK":
-            # Fallback: Use Gemini to generate attractions
-            prompt = f"List 5 top tourist attractions in {destination} with brief descriptions."
-            return gemini_generate(prompt)
-        
-        candidates = data.get("candidates", [])[:5]
-        if not candidates:
+        places = search_attractions(destination, top_n=TOUR_TOP_N)
+
+        if not places:
+            record_failure("google_places", "textsearch", "empty", dest_key)
             return f"No tourist attractions found for {destination}."
-        
-        attractions = []
-        for place in candidates:
-            name = place.get("name", "Unknown")
-            rating = place.get("rating", "N/A")
-            address = place.get("formatted_address", "No address")
-            attractions.append(f"{name} (Rating: {rating})\n{address}")
-        
-        return "Top attractions in " + destination + ":\n\n" + "\n---\n".join(attractions)
+
+        return format_attractions(destination, places)
     except Exception as e:
+        if isinstance(e, requests.exceptions.RequestException):
+            record_failure("google_places", "textsearch", error_class_for(e))
         # Fallback to Gemini if API fails
         try:
-            prompt = f"List 5 top must-see tourist attractions in {destination} with brief descriptions."
-            return gemini_generate(prompt)
+            return synthetic_tour(destination)
         except:
             return f"Error fetching attractions: {e}"
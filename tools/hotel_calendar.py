@@ -0,0 +1,136 @@
+"""
+Hotel price calendar
+Min/median hotel price per check-in date across a date range, built on
+the Booking.com searchHotels call used by check_hotels
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from tools.check_hotels import fetch_hotel_page, resolve_destination
+from utils.cache import TTLCache
+from utils.normalize import canonical_destination
+
+# Parallel searchHotels calls; the shared RapidAPI token bucket still caps
+# the overall request rate
+HOTEL_CALENDAR_CONCURRENCY = int(os.getenv("HOTEL_CALENDAR_CONCURRENCY", 4))
+HOTEL_CALENDAR_MAX_DAYS = int(os.getenv("HOTEL_CALENDAR_MAX_DAYS", 62))
+
+# One entry per (destination, check-in date, nights)
+_calendar_cells = TTLCache(
+    "hotel_calendar",
+    ttl=int(os.getenv("HOTEL_CALENDAR_TTL", 6 * 3600)),
+    max_entries=8192,
+)
+
+
+def _date_range(start_date: str, end_date: str):
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    days = min((end - start).days + 1, HOTEL_CALENDAR_MAX_DAYS)
+    return [start + timedelta(days=i) for i in range(days)]
+
+
+def _page_prices(dest_id: str, checkin: datetime, nights: int):
+    checkout = checkin + timedelta(days=nights)
+    records = fetch_hotel_page(dest_id, checkin.strftime("%Y-%m-%d"), checkout.strftime("%Y-%m-%d"))
+    return [r.price for r in records if r.price is not None]
+
+
+def _aggregate(price_lists):
+    """Vectorized min/median per row over non-empty, ragged price lists.
+
+    Rows are padded with NaN into one matrix so all dates are reduced in a
+    single NumPy pass.
+    """
+    width = max(len(prices) for prices in price_lists)
+    matrix = np.full((len(price_lists), width), np.nan)
+    for row, prices in enumerate(price_lists):
+        matrix[row, :len(prices)] = prices
+    return np.nanmin(matrix, axis=1), np.nanmedian(matrix, axis=1)
+
+
+def price_calendar(destination: str, start_date: str, end_date: str, nights: int = 3,
+                   concurrency: int = HOTEL_CALENDAR_CONCURRENCY):
+    """Cheapest and median hotel price for each check-in date in a range.
+
+    Args:
+        destination: City name
+        start_date: First check-in date (YYYY-MM-DD)
+        end_date: Last check-in date (YYYY-MM-DD), at most HOTEL_CALENDAR_MAX_DAYS after start
+        nights: Length of stay for every check-in date
+        concurrency: Parallel searchHotels calls
+
+    Returns:
+        Dict with one row per check-in date, or None if the destination is unknown
+    """
+    dest_id, dest_name = resolve_destination(destination)
+    if not dest_id:
+        return None
+
+    dest_key = canonical_destination(destination)
+    dates = _date_range(start_date, end_date)
+    cells = {}
+    missing = []
+    for checkin in dates:
+        cell = _calendar_cells.get((dest_key, checkin.date(), nights))
+        if cell is None:
+            missing.append(checkin)
+        else:
+            cells[checkin] = cell
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            futures = [
+                pool.submit(copy_context().run, _page_prices, dest_id, checkin, nights)
+                for checkin in missing
+            ]
+            price_lists = []
+            for future in futures:
+                try:
+                    price_lists.append(future.result())
+                except Exception as e:
+                    print(f"[DEBUG] Price calendar fetch failed: {e}")
+                    price_lists.append(None)
+
+        # Failed fetches stay uncached so the next request retries them
+        fetched = [(d, p) for d, p in zip(missing, price_lists) if p is not None]
+        priced = [(d, p) for d, p in fetched if p]
+        for checkin, prices in fetched:
+            if not prices:
+                cells[checkin] = {"min_price": None, "median_price": None, "hotels": 0}
+        if priced:
+            minimum, median = _aggregate([p for _, p in priced])
+            for (checkin, prices), lo, mid in zip(priced, minimum, median):
+                cells[checkin] = {
+                    "min_price": round(float(lo), 2),
+                    "median_price": round(float(mid), 2),
+                    "hotels": len(prices),
+                }
+        for checkin, _ in fetched:
+            _calendar_cells.set((dest_key, checkin.date(), nights), cells[checkin])
+
+    rows = []
+    for checkin in dates:
+        cell = cells.get(checkin, {"min_price": None, "median_price": None, "hotels": 0})
+        rows.append({
+            "checkin_date": checkin.strftime("%Y-%m-%d"),
+            "checkout_date": (checkin + timedelta(days=nights)).strftime("%Y-%m-%d"),
+            **cell,
+        })
+
+    priced = [row for row in rows if row["min_price"] is not None]
+    cheapest = min(priced, key=lambda row: row["min_price"]) if priced else None
+    return {
+        "destination": dest_name,
+        "nights": nights,
+        "currency": "USD",
+        "calendar": rows,
+        "cheapest": cheapest,
+    }
@@ -0,0 +1,169 @@
+"""
+Itinerary builder
+Splits attractions into N days and orders each day's stops, using a
+vectorized haversine distance matrix, balanced k-means and
+nearest-neighbour + 2-opt routing (no model call)
+"""
+
+import math
+import time
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_matrix(lat, lng):
+    """Pairwise great-circle distances (km) between all points, in one pass."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lng = np.radians(np.asarray(lng, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _unit_vectors(lat, lng):
+    """3D unit vectors, so k-means centroids behave across the antimeridian."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lng = np.radians(np.asarray(lng, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)])
+
+
+def cluster_days(lat, lng, days, iterations=25):
+    """Assign each stop to one of `days` geographic clusters of similar size.
+
+    Runs k-means on unit vectors (seeded by farthest-point sampling), then a
+    capacity-constrained greedy assignment so no day gets more than
+    ceil(n / days) stops.
+
+    Returns:
+        Array of day indices, one per stop
+    """
+    points = _unit_vectors(lat, lng)
+    n = len(points)
+    days = max(1, min(days, n))
+
+    # Farthest-point seeding: deterministic and well spread
+    centers = [points[0]]
+    nearest = np.full(n, np.inf)
+    for _ in range(1, days):
+        nearest = np.minimum(nearest, np.linalg.norm(points - centers[-1], axis=1))
+        centers.append(points[int(np.argmax(nearest))])
+    centers = np.array(centers)
+
+    labels = np.zeros(n, dtype=int)
+    for iteration in range(iterations):
+        distances = np.linalg.norm(points[:, None, :] - centers[None, :, :], axis=2)
+        new_labels = np.argmin(distances, axis=1)
+        if iteration and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for k in range(days):
+            members = points[labels == k]
+            if len(members):
+                centers[k] = members.mean(axis=0)
+
+    # Balance: hand out (stop, day) pairs closest-first while days have room
+    capacity = math.ceil(n / days)
+    distances = np.linalg.norm(points[:, None, :] - centers[None, :, :], axis=2)
+    balanced = np.full(n, -1)
+    load = np.zeros(days, dtype=int)
+    for flat in np.argsort(distances, axis=None):
+        stop, day = divmod(int(flat), days)
+        if balanced[stop] == -1 and load[day] < capacity:
+            balanced[stop] = day
+            load[day] += 1
+    return balanced
+
+
+def nearest_neighbour_route(distances, stops):
+    """Greedy route through `stops`, starting from the stop farthest from the rest."""
+    stops = list(stops)
+    if len(stops) <= 2:
+        return stops
+    sub = distances[np.ix_(stops, stops)]
+    current = int(np.argmax(sub.sum(axis=1)))
+    route = [current]
+    unvisited = np.ones(len(stops), dtype=bool)
+    unvisited[current] = False
+    while unvisited.any():
+        candidates = np.where(unvisited, sub[current], np.inf)
+        current = int(np.argmin(candidates))
+        route.append(current)
+        unvisited[current] = False
+    return [stops[i] for i in route]
+
+
+def two_opt(distances, route, max_rounds=200):
+    """Improve an open path with 2-opt moves, scoring every move per round at once.
+
+    A dummy end node at zero distance from everything turns the open path
+    into a tour, so reversing a suffix is also considered.
+    """
+    m = len(route)
+    if m < 4:
+        return list(route)
+    padded = np.zeros((distances.shape[0] + 1, distances.shape[1] + 1))
+    padded[:-1, :-1] = distances
+    dummy = distances.shape[0]
+    path = np.array(list(route) + [dummy])
+
+    i_idx, j_idx = np.triu_indices(m, k=1)
+    keep = i_idx >= 1
+    i_idx, j_idx = i_idx[keep], j_idx[keep]
+
+    for _ in range(max_rounds):
+        before = padded[path[i_idx - 1], path[i_idx]] + padded[path[j_idx], path[j_idx + 1]]
+        after = padded[path[i_idx - 1], path[j_idx]] + padded[path[i_idx], path[j_idx + 1]]
+        delta = after - before
+        best = int(np.argmin(delta))
+        if delta[best] >= -1e-9:
+            break
+        i, j = i_idx[best], j_idx[best]
+        path[i:j + 1] = path[i:j + 1][::-1]
+    return [int(node) for node in path[:-1]]
+
+
+def build_itinerary(places, days):
+    """Group places into `days` days and order each day's visits.
+
+    Args:
+        places: Sequence of dicts (or namedtuples) with name, lat and lng
+        days: Number of days
+
+    Returns:
+        Dict with per-day ordered stops, leg distances and totals
+    """
+    start = time.perf_counter()
+    places = [p if isinstance(p, dict) else p._asdict() for p in places]
+    places = [p for p in places if p.get("lat") is not None and p.get("lng") is not None]
+    if not places:
+        return {"days": [], "total_distance_km": 0.0, "stops": 0, "compute_ms": 0.0}
+
+    lat = [p["lat"] for p in places]
+    lng = [p["lng"] for p in places]
+    distances = haversine_matrix(lat, lng)
+    labels = cluster_days(lat, lng, days)
+
+    itinerary = []
+    for day in range(labels.max() + 1):
+        stops = np.flatnonzero(labels == day)
+        if not len(stops):
+            continue
+        route = two_opt(distances, nearest_neighbour_route(distances, stops))
+        legs = [0.0] + [float(distances[a, b]) for a, b in zip(route, route[1:])]
+        itinerary.append({
+            "day": len(itinerary) + 1,
+            "distance_km": round(sum(legs), 2),
+            "stops": [
+                {**places[stop], "leg_km": round(leg, 2)} for stop, leg in zip(route, legs)
+            ],
+        })
+
+    return {
+        "days": itinerary,
+        "stops": len(places),
+        "total_distance_km": round(sum(d["distance_km"] for d in itinerary), 2),
+        "compute_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
@@ -0,0 +1,225 @@
+"""
+Prompt Cache
+Exact and near-duplicate caching of Gemini answers. Prompts are normalized
+and indexed with MinHash signatures in a local LSH table, so prompts that
+differ only trivially (a date, casing, punctuation) can share an answer
+when their prompt family is marked as tolerant
+"""
+
+import hashlib
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from utils.cache import TTLCache
+from utils.normalize import canonical_destination
+
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "1") not in ("0", "false", "False")
+PROMPT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", 6 * 3600))
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", 2048))
+# Families whose answers may be reused for a similar (not identical) prompt
+PROMPT_CACHE_TOLERANT = tuple(
+    family.strip() for family in
+    os.getenv("PROMPT_CACHE_TOLERANT", "synthetic_flights,synthetic_hotels,synthetic_tour").split(",")
+    if family.strip()
+)
+# Estimated Jaccard similarity of character shingles needed for a near hit
+PROMPT_CACHE_THRESHOLD = float(os.getenv("PROMPT_CACHE_THRESHOLD", 0.75))
+# Signature length = bands * rows; more bands find lower-similarity candidates
+PROMPT_CACHE_BANDS = int(os.getenv("PROMPT_CACHE_BANDS", 16))
+PROMPT_CACHE_ROWS = int(os.getenv("PROMPT_CACHE_ROWS", 4))
+# Characters per shingle
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_prompt(prompt):
+    """Casefolded prompt with punctuation and repeated whitespace collapsed."""
+    return _NON_WORD.sub(" ", prompt.casefold()).strip()
+
+
+class MinHasher:
+    """MinHash signatures over character shingles with fixed random permutations."""
+
+    def __init__(self, num_perm, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        if len(text) <= SHINGLE_SIZE:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) & _MERSENNE_PRIME for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # (a * x + b) mod p for every permutation and shingle at once; a and
+        # x are below 2**31, so the product fits in 64 bits
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class PromptCache:
+    """Gemini answers keyed by prompt family, scope and normalized prompt.
+
+    Every family gets exact-match reuse. Families listed as tolerant also
+    get a near-duplicate lookup: candidates come from LSH buckets of the
+    same family and scope, and the most similar one is returned if its
+    estimated similarity reaches the threshold. The scope (usually the
+    destination) keeps similar prompts about different places apart.
+    """
+
+    def __init__(self, ttl=PROMPT_CACHE_TTL, max_entries=PROMPT_CACHE_MAX_ENTRIES,
+                 tolerant=PROMPT_CACHE_TOLERANT, threshold=PROMPT_CACHE_THRESHOLD,
+                 bands=PROMPT_CACHE_BANDS, rows=PROMPT_CACHE_ROWS):
+        self.tolerant = set(tolerant)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self._hasher = MinHasher(bands * rows)
+        self._answers = TTLCache("prompts", ttl=ttl, max_entries=max_entries)
+        self._buckets = {}   # (family, scope, band, band bytes) -> set of keys
+        self._members = {}   # key -> (signature, bucket ids)
+        self._lock = threading.Lock()
+        self._families = {}
+
+    def _key(self, family, scope, normalized):
+        return (family, scope, hashlib.sha1(normalized.encode()).hexdigest())
+
+    def _family_stats(self, family):
+        stats = self._families.get(family)
+        if stats is None:
+            stats = self._families[family] = {
+                "exact_hits": 0, "near_hits": 0, "misses": 0,
+                "near_similarity_total": 0.0,
+                # Best candidate similarity per near lookup, in tenths
+                "similarity_histogram": [0] * 10,
+            }
+        return stats
+
+    def _bucket_ids(self, family, scope, signature):
+        rows = signature.reshape(self.bands, self.rows)
+        return [(family, scope, band, rows[band].tobytes()) for band in range(self.bands)]
+
+    def get(self, prompt, family, scope=None):
+        """Cached answer for prompt, or None.
+
+        Args:
+            prompt: The prompt about to be sent
+            family: Prompt family name (which template produced it)
+            scope: Value that must match exactly for reuse, e.g. a destination
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        scope = canonical_destination(scope)
+        normalized = normalize_prompt(prompt)
+        answer = self._answers.get(self._key(family, scope, normalized))
+        with self._lock:
+            stats = self._family_stats(family)
+            if answer is not None:
+                stats["exact_hits"] += 1
+                return answer
+            if family not in self.tolerant:
+                stats["misses"] += 1
+                return None
+
+        signature = self._hasher.signature(normalized)
+        best_key, best_similarity = None, 0.0
+        with self._lock:
+            candidates = set()
+            for bucket_id in self._bucket_ids(family, scope, signature):
+                candidates |= self._buckets.get(bucket_id, set())
+            for key in candidates:
+                similarity = float(np.mean(self._members[key][0] == signature))
+                if similarity > best_similarity:
+                    best_key, best_similarity = key, similarity
+
+        answer = None
+        if best_key is not None and best_similarity >= self.threshold:
+            answer = self._answers.get(best_key)
+            if answer is None:
+                self._forget(best_key)
+        with self._lock:
+            stats = self._family_stats(family)
+            stats["similarity_histogram"][min(int(best_similarity * 10), 9)] += 1
+            if answer is None:
+                stats["misses"] += 1
+            else:
+                stats["near_hits"] += 1
+                stats["near_similarity_total"] += best_similarity
+        return answer
+
+    def put(self, prompt, answer, family, scope=None):
+        """Store answer for prompt (and index it if the family is tolerant)."""
+        scope = canonical_destination(scope)
+        normalized = normalize_prompt(prompt)
+        key = self._key(family, scope, normalized)
+        self._answers.set(key, answer)
+        if family not in self.tolerant:
+            return
+        signature = self._hasher.signature(normalized)
+        bucket_ids = self._bucket_ids(family, scope, signature)
+        with self._lock:
+            self._members[key] = (signature, bucket_ids)
+            for bucket_id in bucket_ids:
+                self._buckets.setdefault(bucket_id, set()).add(key)
+        if len(self._members) > 2 * self._answers.max_entries:
+            self._sweep()
+
+    def _forget(self, key):
+        with self._lock:
+            member = self._members.pop(key, None)
+            if member is None:
+                return
+            for bucket_id in member[1]:
+                bucket = self._buckets.get(bucket_id)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[bucket_id]
+
+    def _sweep(self):
+        """Drop index entries whose answers have expired or been evicted."""
+        with self._lock:
+            keys = list(self._members)
+        for key in keys:
+            if self._answers.expires_in(key) is None:
+                self._forget(key)
+
+    def stats(self):
+        with self._lock:
+            families = {}
+            for family, stats in self._families.items():
+                lookups = stats["exact_hits"] + stats["near_hits"] + stats["misses"]
+                families[family] = {
+                    "tolerant": family in self.tolerant,
+                    "exact_hits": stats["exact_hits"],
+                    "near_hits": stats["near_hits"],
+                    "misses": stats["misses"],
+                    "hit_rate": round((stats["exact_hits"] + stats["near_hits"]) / lookups, 3) if lookups else 0.0,
+                    "near_hit_similarity_mean": round(stats["near_similarity_total"] / stats["near_hits"], 3)
+                    if stats["near_hits"] else None,
+                    "similarity_histogram": {
+                        f"{i / 10:.1f}-{(i + 1) / 10:.1f}": count
+                        for i, count in enumerate(stats["similarity_histogram"]) if count
+                    },
+                }
+            return {
+                "enabled": PROMPT_CACHE_ENABLED,
+                "threshold": self.threshold,
+                "signature_size": self.bands * self.rows,
+                "indexed_prompts": len(self._members),
+                "lsh_buckets": len(self._buckets),
+                "families": families,
+            }
+
+
+prompt_cache = PromptCache()
@@ -0,0 +1,141 @@
+"""
+TTL Cache
+Thread-safe in-process LRU cache with per-entry expiry and byte accounting
+against the global memory budget
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from utils.memory import estimate_size, memory_budget, next_tick
+
+# Every cache registers itself here so the API can report on all of them
+_registry = {}
+
+# Entry layout: [value, expires_at, size_bytes, last_access_tick]
+_VALUE, _EXPIRES, _SIZE, _TICK = range(4)
+
+
+class TTLCache:
+    """LRU cache whose entries expire after a time-to-live (in seconds).
+
+    Entry sizes are estimated on write. Caches registered with a memory
+    budget (the default) may also lose their least recently used entries
+    when the budget as a whole is exceeded.
+    """
+
+    def __init__(self, name, ttl=300, max_entries=1024, budget=memory_budget):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self._budget = budget
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _registry[name] = self
+        if budget is not None:
+            budget.register(self)
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[_SIZE]
+        return entry
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing/expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[_EXPIRES] <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            entry[_TICK] = next_tick()
+            self.hits += 1
+            return entry[_VALUE]
+
+    def set(self, key, value, ttl=None):
+        """Store value under key for ttl seconds (default: the cache TTL)."""
+        ttl = self.ttl if ttl is None else ttl
+        size = estimate_size(key) + estimate_size(value)
+        with self._lock:
+            self._remove(key)
+            self._data[key] = [value, time.monotonic() + ttl, size, next_tick()]
+            self.bytes += size
+            while len(self._data) > self.max_entries:
+                self.evict_lru()
+        if self._budget is not None:
+            self._budget.enforce()
+
+    def get_or_set(self, key, compute, ttl=None):
+        """Return the cached value for key, computing and storing it on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def expires_in(self, key):
+        """Seconds until key expires, or None if it is not cached."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            remaining = entry[_EXPIRES] - time.monotonic()
+            return remaining if remaining > 0 else None
+
+    def oldest_tick(self):
+        """Access tick of the least recently used entry, or None if empty."""
+        with self._lock:
+            for entry in self._data.values():
+                return entry[_TICK]
+            return None
+
+    def evict_lru(self):
+        """Drop the least recently used entry. Returns the bytes freed."""
+        with self._lock:
+            if not self._data:
+                return 0
+            _, entry = self._data.popitem(last=False)
+            self.bytes -= entry[_SIZE]
+            self.evictions += 1
+            return entry[_SIZE]
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Hit/miss counters for monitoring."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def all_cache_stats():
+    """Stats for every registered cache, keyed by cache name."""
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -0,0 +1,68 @@
+"""
+Request deadlines
+Carries a per-request deadline through context variables so every tool,
+HTTP call and Gemini call can size its timeout to the remaining budget
+"""
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+# Default end-to-end budget for one API request, in seconds
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", 60))
+
+# Slack kept back from each timeout so the caller can still build a reply
+DEADLINE_MARGIN = float(os.getenv("DEADLINE_MARGIN", 0.5))
+
+_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the request's time budget has run out."""
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """Run the enclosed block under a deadline `seconds` from now.
+
+    Nested scopes can only shorten the deadline, never extend it.
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left before the current deadline, or None if there is none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline(*_):
+    """Raise DeadlineExceeded if the current deadline has passed.
+
+    Accepts and ignores arguments so it can be used as a CrewAI step callback.
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+
+
+def timeout_for(default):
+    """Timeout to use for the next blocking call: default, capped by the deadline."""
+    left = remaining()
+    if left is None:
+        return default
+    left -= DEADLINE_MARGIN
+    if left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    return min(default, left)
@@ -0,0 +1,154 @@
+"""
+HTTP client for upstream APIs
+Pooled requests session with deadline-aware timeouts, per-upstream latency
+tracking and optional hedged requests
+"""
+
+import contextvars
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.deadline import DeadlineExceeded, timeout_for
+
+# Upstreams for which a duplicate request is sent once the first one has
+# been outstanding longer than that upstream's p95 latency,
+# e.g. HEDGED_UPSTREAMS=aviationstack,booking
+HEDGED_UPSTREAMS = {
+    name.strip() for name in os.getenv("HEDGED_UPSTREAMS", "").split(",") if name.strip()
+}
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))
+
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+_latencies = {}
+_hedges = {"sent": 0, "won": 0}
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+def _record_latency(upstream, seconds):
+    _latencies.setdefault(upstream, deque(maxlen=200)).append(seconds)
+
+
+def p95_latency(upstream):
+    """p95 latency in seconds for an upstream, or None without enough samples."""
+    samples = _latencies.get(upstream)
+    if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[int(len(ordered) * 0.95) - 1]
+
+
+def _timed_get(upstream, url, **kwargs):
+    start = time.monotonic()
+    response = _session.get(url, **kwargs)
+    _record_latency(upstream, time.monotonic() - start)
+    return response
+
+
+def _discard(future):
+    """Close a losing hedge's response so a streamed body frees its connection."""
+    try:
+        future.result().close()
+    except Exception:
+        pass
+
+
+def _hedged_get(upstream, url, hedge_after, timeout, **kwargs):
+    """Send the request, then a duplicate if the first is slower than hedge_after."""
+    primary = _hedge_pool.submit(
+        contextvars.copy_context().run, _timed_get, upstream, url, timeout=timeout, **kwargs
+    )
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    start = time.monotonic()
+    _hedges["sent"] += 1
+    backup = _hedge_pool.submit(
+        contextvars.copy_context().run, _timed_get, upstream, url,
+        timeout=max(timeout - hedge_after, 0.1), **kwargs
+    )
+    pending = {primary, backup}
+    error = None
+    while pending:
+        budget = timeout - hedge_after - (time.monotonic() - start)
+        done, pending = wait(pending, timeout=max(budget, 0), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            try:
+                response = future.result()
+            except requests.exceptions.RequestException as e:
+                error = e
+                continue
+            if future is backup:
+                _hedges["won"] += 1
+            for loser in pending:
+                loser.add_done_callback(_discard)
+            return response
+    raise error or requests.exceptions.Timeout(f"{upstream} request timed out")
+
+
+def http_get(upstream, url, timeout=10, hedge=None, **kwargs):
+    """GET url through the shared session.
+
+    Args:
+        upstream: Short upstream name used for metrics ('aviationstack', 'booking', ...)
+        url: Request URL
+        timeout: Default timeout in seconds, shortened to the request deadline
+        hedge: Force hedging on/off (default: on for HEDGED_UPSTREAMS)
+        **kwargs: Passed through to requests (params, headers, stream, ...)
+
+    Raises:
+        DeadlineExceeded: if the request deadline has already passed
+    """
+    timeout = timeout_for(timeout)
+    if hedge is None:
+        hedge = upstream in HEDGED_UPSTREAMS
+    hedge_after = p95_latency(upstream) if hedge else None
+    if hedge_after is not None and hedge_after < timeout:
+        return _hedged_get(upstream, url, hedge_after, timeout, **kwargs)
+    return _timed_get(upstream, url, timeout=timeout, **kwargs)
+
+
+def preconnect(urls, timeout=5):
+    """Open pooled connections (DNS, TCP, TLS) to each URL's host ahead of use.
+
+    Sends one HEAD request per URL; the status is irrelevant, only the
+    connection left in the pool matters.
+
+    Returns:
+        Number of hosts that answered
+    """
+    connected = 0
+    for url in urls:
+        try:
+            _session.head(url, timeout=timeout, allow_redirects=False)
+            connected += 1
+        except requests.exceptions.RequestException as e:
+            print(f"[DEBUG] Preconnect to {url} failed: {e}")
+    return connected
+
+
+def http_stats():
+    """Latency percentiles per upstream plus hedging counters."""
+    upstreams = {}
+    for upstream, samples in _latencies.items():
+        ordered = sorted(samples)
+        upstreams[upstream] = {
+            "samples": len(ordered),
+            "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+            "p95_ms": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)] * 1000, 1),
+        }
+    return {"upstreams": upstreams, "hedged": dict(_hedges), "hedged_upstreams": sorted(HEDGED_UPSTREAMS)}
+
+
+__all__ = ["http_get", "http_stats", "p95_latency", "preconnect", "DeadlineExceeded"]
@@ -0,0 +1,160 @@
+"""
+Streaming JSON extraction
+Pulls only the needed fields out of large upstream JSON payloads, parsing
+the body incrementally (with ijson when installed) instead of building the
+whole document, and stops reading once enough items have been seen
+"""
+
+import json
+import os
+
+import requests
+import urllib3
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# json.JSONDecodeError is a ValueError; ijson.JSONError is not
+_JSON_ERRORS = (ValueError,) if ijson is None else (ValueError, ijson.JSONError)
+
+# Smaller bodies parse faster (and with less overhead) in one json.loads;
+# streaming pays off for large pages. Compressed bodies are always streamed.
+JSON_STREAM_MIN_BYTES = int(os.getenv("JSON_STREAM_MIN_BYTES", 128 * 1024))
+
+_SCALAR_EVENTS = ("string", "number", "boolean", "null")
+_DEPTH_CHANGE = {"start_map": 1, "start_array": 1, "end_map": -1, "end_array": -1}
+_MISSING = object()
+
+
+def _set_path(target, keys, value):
+    for key in keys[:-1]:
+        target = target.setdefault(key, {})
+    target[keys[-1]] = value
+
+
+def _get_path(source, keys):
+    for key in keys:
+        if not isinstance(source, dict) or key not in source:
+            return _MISSING
+        source = source[key]
+    return source
+
+
+def extract_document(document, items_path, fields, top_fields=(), limit=None):
+    """Same result as extract_stream, from an already parsed document."""
+    items_source = _get_path(document, items_path.split(".")) if items_path else document
+    items = []
+    if isinstance(items_source, list):
+        for item in items_source[:limit] if limit is not None else items_source:
+            pruned = {}
+            for path in fields:
+                keys = path.split(".")
+                value = _get_path(item, keys)
+                if value is not _MISSING:
+                    _set_path(pruned, keys, value)
+            items.append(pruned)
+    top = {}
+    for path in top_fields:
+        value = _get_path(document, path.split("."))
+        if value is not _MISSING:
+            top[path] = value
+    return items, top
+
+
+def extract_stream(source, items_path, fields, top_fields=(), limit=None):
+    """Parse a JSON byte stream, keeping only the listed fields.
+
+    Items are rebuilt as nested dicts holding just the selected paths, so
+    code written against the full payload (item.get("property", {}).get(...))
+    keeps working.
+
+    Args:
+        source: File-like object yielding the JSON bytes
+        items_path: Dotted path to the array of items, e.g. "data.hotels"
+        fields: Dotted paths inside each item to keep, e.g. "property.name"
+        top_fields: Dotted paths outside the array to return as well
+        limit: Stop reading after this many items (top fields that come
+            after the array are then not seen)
+
+    Returns:
+        Tuple of (list of pruned item dicts, dict of top field path -> value)
+    """
+    items_prefix = f"{items_path}.item" if items_path else "item"
+    wanted = {f"{items_prefix}.{path}": path.split(".") for path in fields}
+    top_wanted = set(top_fields)
+    items, top = [], {}
+    current = None
+    builder = None  # (keys, ObjectBuilder, depth) while capturing a container
+
+    for prefix, event, value in ijson.parse(source, use_float=True):
+        if builder is not None:
+            keys, object_builder, depth = builder
+            object_builder.event(event, value)
+            depth += _DEPTH_CHANGE.get(event, 0)
+            if depth:
+                builder = (keys, object_builder, depth)
+            else:
+                _set_path(current, keys, object_builder.value)
+                builder = None
+            continue
+
+        if prefix == items_prefix:
+            if event == "start_map":
+                current = {}
+            elif event == "end_map":
+                items.append(current)
+                current = None
+                if limit is not None and len(items) >= limit:
+                    break
+        elif current is not None and prefix in wanted:
+            if event in _SCALAR_EVENTS:
+                _set_path(current, wanted[prefix], value)
+            elif event in ("start_map", "start_array"):
+                object_builder = ijson.ObjectBuilder()
+                object_builder.event(event, value)
+                builder = (wanted[prefix], object_builder, 1)
+        elif prefix in top_wanted and event in _SCALAR_EVENTS:
+            top[prefix] = value
+    return items, top
+
+
+def should_stream(response):
+    """Stream-parse unless ijson is missing or the body is known to be small."""
+    if ijson is None:
+        return False
+    if response.headers.get("Content-Encoding"):
+        return True
+    length = response.headers.get("Content-Length")
+    return not (length and length.isdigit() and int(length) < JSON_STREAM_MIN_BYTES)
+
+
+def extract_response(response, items_path, fields, top_fields=(), limit=None):
+    """Field-selective extraction from a requests response fetched with stream=True.
+
+    Large bodies go through extract_stream; small ones (or all of them
+    when ijson isn't installed) are parsed whole and then pruned. The
+    response is always closed, so an early stop drops the rest of the body.
+
+    Errors are raised as requests exceptions, like response.json() would,
+    so callers' negative-cache and fallback handling keeps working.
+
+    Raises:
+        requests.exceptions.Timeout: if the body stalls past the read timeout
+        requests.exceptions.ConnectionError: if the connection breaks mid-body
+        requests.exceptions.InvalidJSONError: if the body is not valid JSON
+    """
+    try:
+        if not should_stream(response):
+            return extract_document(json.loads(response.content), items_path, fields, top_fields, limit)
+        response.raw.decode_content = True
+        return extract_stream(response.raw, items_path, fields, top_fields, limit)
+    except urllib3.exceptions.ReadTimeoutError as e:
+        raise requests.exceptions.ReadTimeout(e, response=response) from e
+    except urllib3.exceptions.HTTPError as e:
+        raise requests.exceptions.ConnectionError(e, response=response) from e
+    except _JSON_ERRORS as e:
+        raise requests.exceptions.InvalidJSONError(f"Invalid JSON from {response.url}: {e}", response=response) from e
+    finally:
+        response.close()
@@ -0,0 +1,163 @@
+"""
+Memory Budget
+Global byte budget shared by every in-process cache, with LRU eviction
+across caches and helpers for live memory introspection
+"""
+
+import itertools
+import os
+import sys
+import threading
+import tracemalloc
+
+# Total bytes all registered caches may hold together
+MEMORY_BUDGET_MB = float(os.getenv("MEMORY_BUDGET_MB", 256))
+# Frames kept per allocation when tracemalloc is on (0 = off; tracing
+# costs CPU and memory, so enable it only while investigating)
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", 0))
+
+# Global access clock: a smaller tick means less recently used, across caches
+_ticks = itertools.count()
+
+
+def next_tick():
+    return next(_ticks)
+
+
+def estimate_size(obj, _seen=None, _depth=0):
+    """Approximate deep size of obj in bytes.
+
+    Follows containers, namedtuples and plain objects a few levels deep;
+    shared objects are counted once.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj, 64)
+    if _depth >= 8 or isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _seen, _depth + 1) + estimate_size(v, _seen, _depth + 1)
+                    for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen, _depth + 1) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += estimate_size(vars(obj), _seen, _depth + 1)
+    return size
+
+
+class MemoryBudget:
+    """Keeps the combined size of registered caches under a byte limit.
+
+    Caches report their own byte totals. When the sum exceeds the limit,
+    the globally least recently used entry is evicted: each cache's oldest
+    entry is compared by access tick and the oldest of those goes first.
+    """
+
+    def __init__(self, limit_bytes):
+        self.limit_bytes = int(limit_bytes)
+        self._caches = []
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def register(self, cache):
+        with self._lock:
+            self._caches.append(cache)
+
+    def used_bytes(self):
+        return sum(cache.bytes for cache in self._caches)
+
+    def enforce(self):
+        """Evict across caches until usage is back under the limit.
+
+        Must be called without holding any cache lock.
+        """
+        if self.used_bytes() <= self.limit_bytes:
+            return
+        with self._lock:
+            while self.used_bytes() > self.limit_bytes:
+                candidates = [(cache.oldest_tick(), cache) for cache in self._caches]
+                candidates = [(tick, cache) for tick, cache in candidates if tick is not None]
+                if not candidates:
+                    break
+                _, victim = min(candidates, key=lambda candidate: candidate[0])
+                if victim.evict_lru():
+                    self.evictions += 1
+
+    def stats(self):
+        used = self.used_bytes()
+        return {
+            "limit_bytes": self.limit_bytes,
+            "used_bytes": used,
+            "utilization": round(used / self.limit_bytes, 3) if self.limit_bytes else None,
+            "evictions": self.evictions,
+            "caches": {cache.name: cache.bytes for cache in self._caches},
+        }
+
+
+memory_budget = MemoryBudget(MEMORY_BUDGET_MB * 1024 * 1024)
+
+
+def process_rss_bytes():
+    """Current resident set size of this process, or None if unknown."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def start_tracing(frames=TRACEMALLOC_FRAMES):
+    """Start tracemalloc if configured and not already running."""
+    if frames > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+_last_snapshot = None
+
+
+def top_allocations(limit=15, group_by="lineno", compare=False):
+    """Top allocation sites from a fresh tracemalloc snapshot.
+
+    Args:
+        limit: Number of sites to return
+        group_by: 'lineno', 'filename' or 'traceback'
+        compare: Report growth since the previous snapshot instead of totals
+
+    Returns:
+        List of dicts (site, size_bytes, count and, with compare, deltas),
+        or None if tracemalloc is not running
+    """
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    previous, _last_snapshot = _last_snapshot, snapshot
+
+    if compare and previous is not None:
+        stats = snapshot.compare_to(previous, group_by)[:limit]
+        return [{
+            "site": str(stat.traceback),
+            "size_bytes": stat.size,
+            "size_diff_bytes": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        } for stat in stats]
+
+    return [{
+        "site": str(stat.traceback),
+        "size_bytes": stat.size,
+        "count": stat.count,
+    } for stat in snapshot.statistics(group_by)[:limit]]
@@ -0,0 +1,79 @@
+"""
+Negative Cache
+Remembers upstream failures (403 plan-tier rejections, empty results,
+non-OK statuses) so known-bad calls skip straight to the fallback
+"""
+
+import os
+
+from utils.cache import TTLCache
+
+# (base TTL, max TTL) in seconds per error class. Each repeat failure
+# doubles the TTL up to the max, so a path that keeps failing is retried
+# less and less often.
+ERROR_CLASS_TTLS = {
+    "forbidden": (3600, 24 * 3600),    # plan tier / premium feature rejections
+    "not_found": (1800, 12 * 3600),    # unknown destination or airport
+    "empty": (900, 6 * 3600),          # upstream answered with no results
+    "status": (300, 3600),             # non-OK API status (e.g. Places)
+    "rate_limited": (60, 900),
+    "error": (30, 600),                # timeouts, 5xx, connection errors
+}
+
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", 4096))
+
+# Any subject: a failure recorded for "*" applies to every query
+ANY = "*"
+
+# Kept out of the memory budget: entries are tiny, and evicting one would
+# just send traffic back to an upstream known to be failing
+_failures = TTLCache("negative", max_entries=NEGATIVE_CACHE_MAX_ENTRIES, budget=None)
+# Strike counts outlive the failures themselves so backoff can keep growing
+_strikes = TTLCache("negative_strikes", max_entries=NEGATIVE_CACHE_MAX_ENTRIES, budget=None)
+
+
+def error_class_for(exc):
+    """Map an exception from requests (or anything else) to an error class."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status in (401, 403):
+        return "forbidden"
+    if status == 404:
+        return "not_found"
+    if status == 429:
+        return "rate_limited"
+    return "error"
+
+
+def record_failure(upstream, endpoint, error_class, subject=ANY):
+    """Remember that (upstream, endpoint) failed with error_class for subject.
+
+    Returns:
+        The TTL in seconds the failure will be remembered for
+    """
+    base, cap = ERROR_CLASS_TTLS.get(error_class, ERROR_CLASS_TTLS["error"])
+    key = (upstream, endpoint, error_class, subject)
+    # Concurrent callers hitting the same failure count as one strike
+    active = _failures.expires_in(key)
+    if active is not None:
+        return active
+    strikes = _strikes.get(key, 0) + 1
+    ttl = min(base * 2 ** (strikes - 1), cap)
+    _strikes.set(key, strikes, ttl=cap * 2)
+    _failures.set(key, True, ttl=ttl)
+    print(f"[DEBUG] Negative cache: {upstream}/{endpoint} {error_class} for {subject!r} ({ttl}s)")
+    return ttl
+
+
+def known_failure(upstream, endpoint, error_class, subject=ANY):
+    """True if this failure was recently recorded for subject or for any subject."""
+    if _failures.get((upstream, endpoint, error_class, ANY)):
+        return True
+    return subject != ANY and bool(_failures.get((upstream, endpoint, error_class, subject)))
+
+
+def clear_failure(upstream, endpoint, error_class, subject=ANY):
+    """Forget a failure and its backoff, e.g. after the upstream recovers."""
+    key = (upstream, endpoint, error_class, subject)
+    _failures.delete(key)
+    _strikes.delete(key)
@@ -0,0 +1,40 @@
+"""
+Normalization helpers
+Canonical forms for destinations and query strings used as cache keys
+"""
+
+import re
+
+_WHITESPACE = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"[^\w\s-]")
+
+
+def canonical_destination(destination):
+    """Canonical form of a destination name ('  Dubai, ' -> 'dubai')."""
+    if not destination:
+        return ""
+    text = _PUNCTUATION.sub(" ", str(destination)).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def normalize_path(path):
+    """Normalize a route path so '/tour', '/tour/' and '/Tour/' match."""
+    return "/" + path.strip("/").lower() if path.strip("/") else "/"
+
+
+def normalize_query(params):
+    """Sorted, canonical (key, value) pairs from a query-param mapping.
+
+    Empty values are dropped and destinations are canonicalized, so
+    '?destination=Dubai' and '?destination=dubai%20' share a cache entry.
+    """
+    items = []
+    for key, value in params.items():
+        key = key.strip().lower()
+        value = value.strip()
+        if not value:
+            continue
+        if key == "destination":
+            value = canonical_destination(value)
+        items.append((key, value))
+    return tuple(sorted(items))
@@ -0,0 +1,78 @@
+"""
+Popularity
+Exponentially decayed request counters per canonical destination, used to
+decide which destinations are worth keeping warm
+"""
+
+import heapq
+import math
+import os
+import threading
+import time
+
+from utils.normalize import canonical_destination
+
+# A request's weight halves every POPULARITY_HALF_LIFE seconds
+POPULARITY_HALF_LIFE = float(os.getenv("POPULARITY_HALF_LIFE", 3600))
+POPULARITY_MAX_KEYS = int(os.getenv("POPULARITY_MAX_KEYS", 10000))
+
+
+class DecayedCounter:
+    """Thread-safe counters whose values decay exponentially over time.
+
+    Scores are stored relative to a fixed epoch in log space, so a hit is
+    O(1) and no background decay pass is needed.
+    """
+
+    def __init__(self, half_life=POPULARITY_HALF_LIFE, max_keys=POPULARITY_MAX_KEYS):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self._rate = math.log(2) / half_life
+        self._epoch = time.time()
+        self._log_scores = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, weight=1.0):
+        now = time.time() - self._epoch
+        with self._lock:
+            current = self._log_scores.get(key)
+            boost = math.log(weight) + self._rate * now
+            if current is None:
+                self._log_scores[key] = boost
+            else:
+                high, low = max(current, boost), min(current, boost)
+                self._log_scores[key] = high + math.log1p(math.exp(low - high))
+            if len(self._log_scores) > self.max_keys:
+                self._prune()
+
+    def _prune(self):
+        # Keep the hottest half when the key space overflows
+        keep = heapq.nlargest(self.max_keys // 2, self._log_scores.items(), key=lambda item: item[1])
+        self._log_scores = dict(keep)
+
+    def score(self, key):
+        with self._lock:
+            log_score = self._log_scores.get(key)
+        if log_score is None:
+            return 0.0
+        return math.exp(log_score - self._rate * (time.time() - self._epoch))
+
+    def top(self, n, min_score=0.0):
+        """The n highest-scoring keys as (key, score) pairs, best first."""
+        decay = self._rate * (time.time() - self._epoch)
+        with self._lock:
+            best = heapq.nlargest(n, self._log_scores.items(), key=lambda item: item[1])
+        return [(key, round(math.exp(s - decay), 3)) for key, s in best if math.exp(s - decay) >= min_score]
+
+    def __len__(self):
+        return len(self._log_scores)
+
+
+destination_popularity = DecayedCounter()
+
+
+def record_destination(destination):
+    """Count one request for destination (canonicalized)."""
+    key = canonical_destination(destination)
+    if key:
+        destination_popularity.hit(key)
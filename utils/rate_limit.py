@@ -0,0 +1,70 @@
+"""
+Rate limiting
+Thread-safe token buckets shared by every caller of an upstream API
+"""
+
+import os
+import threading
+import time
+
+from utils.deadline import DeadlineExceeded, remaining
+
+
+class TokenBucket:
+    """Allow `rate` calls per second on average, with bursts up to `burst`."""
+
+    def __init__(self, name, rate, burst=None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst or max(int(rate), 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.waited = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available.
+
+        Raises:
+            DeadlineExceeded: if the wait would outlast the request deadline
+        """
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+                self.throttled += 1
+            left = remaining()
+            if left is not None and wait > left:
+                raise DeadlineExceeded(f"{self.name} rate limit wait exceeds deadline")
+            self.waited += wait
+            time.sleep(wait)
+
+    def stats(self):
+        return {
+            "rate_per_s": self.rate,
+            "burst": self.burst,
+            "throttled": self.throttled,
+            "waited_s": round(self.waited, 3),
+        }
+
+
+# Requests per second allowed by each upstream plan (0 disables limiting)
+rate_limiters = {
+    "rapidapi": TokenBucket("rapidapi", float(os.getenv("RAPIDAPI_RATE_LIMIT", 5))),
+    "aviationstack": TokenBucket("aviationstack", float(os.getenv("AVIATIONSTACK_RATE_LIMIT", 2))),
+}
+
+
+def rate_limit_stats():
+    return {name: bucket.stats() for name, bucket in rate_limiters.items()}
@@ -0,0 +1,38 @@
+"""
+JSON response class
+Uses orjson when it is installed, falling back to the stdlib encoder, plus
+helpers for keeping error fallbacks out of the response cache
+"""
+
+try:
+    import orjson  # noqa: F401  (required by ORJSONResponse)
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as FastJSONResponse
+
+__all__ = ["FastJSONResponse", "is_error_text", "no_store", "public_error"]
+
+
+def is_error_text(text):
+    """True if tool or agent output is an error fallback rather than data.
+
+    Matches "[Gemini Error] ..." anywhere (agents quote tool output) and
+    text starting with "Error" ("Error: ...", "Error fetching hotels: ...").
+    """
+    text = str(text).lstrip()
+    return "[Gemini Error]" in text or text.startswith("Error")
+
+
+def public_error(exc):
+    """Client-safe description of a failure: exception type and HTTP status only.
+
+    Exception text from requests includes the request URL, and with it any
+    API key sent as a query parameter, so it is never passed on.
+    """
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return f"{type(exc).__name__} ({status})" if status else type(exc).__name__
+
+
+def no_store(response):
+    """Mark a route's response as not cacheable by ResponseCacheMiddleware or clients."""
+    response.headers["Cache-Control"] = "no-store"